@@ -1,15 +1,121 @@
-import random
+import time
 import tkinter as tk
-from tkinter import simpledialog, messagebox, filedialog
+from tkinter import simpledialog, messagebox, filedialog, ttk
+
+import matrix_cache
+import matrix_core
+import matrix_exact
+import matrix_history
+import matrix_io
+import matrix_parallel
+import matrix_sparse
+
+# Intervalo de sondeo de la operación en segundo plano (~60 fps)
+INTERVALO_SONDEO_MS = 16
+TIPOS_ARCHIVO = [("Text files","*.txt"), ("Matriz binaria", "*" + matrix_io.EXTENSION_BINARIA),
+                 ("Tripletes (dispersa)", " ".join("*" + e for e in matrix_io.EXTENSIONES_TRIPLETES))]
+TIPOS_ESPACIO = [("Espacio de trabajo", "*" + matrix_io.EXTENSION_ESPACIO)]
+
+
+class VistaMatriz(tk.Frame):
+    """
+    Vista virtualizada de una matriz sobre un único Canvas.
+    Solo existen los elementos de texto de la ventana visible (como máximo
+    FILAS_VISIBLES x COLUMNAS_VISIBLES); al desplazarse se reutilizan cambiando su texto,
+    así que el coste de dibujo no depende del tamaño de la matriz.
+    """
+
+    ANCHO_CELDA = 60
+    ALTO_CELDA = 22
+    FILAS_VISIBLES = 10
+    COLUMNAS_VISIBLES = 10
+
+    def __init__(self, padre, matriz, bg="#0f3460", fg="#ffd369"):
+        super().__init__(padre, bg=bg)
+        self.matriz = matriz
+        self.fila0 = 0
+        self.col0 = 0
+        self.filas_vis = min(matriz.filas, self.FILAS_VISIBLES)
+        self.cols_vis = min(matriz.columnas, self.COLUMNAS_VISIBLES)
+
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0,
+                                width=self.cols_vis * self.ANCHO_CELDA, height=self.filas_vis * self.ALTO_CELDA)
+        self.canvas.grid(row=0, column=0)
+        self.scroll_y = self.scroll_x = None
+        if matriz.filas > self.filas_vis:
+            self.scroll_y = tk.Scrollbar(self, orient="vertical", command=self._desplazar_filas)
+            self.scroll_y.grid(row=0, column=1, sticky="ns")
+            self.canvas.bind("<MouseWheel>", self._rueda)
+            self.canvas.bind("<Button-4>", lambda e: self._desplazar_filas("scroll", -1, "units"))
+            self.canvas.bind("<Button-5>", lambda e: self._desplazar_filas("scroll", 1, "units"))
+        if matriz.columnas > self.cols_vis:
+            self.scroll_x = tk.Scrollbar(self, orient="horizontal", command=self._desplazar_columnas)
+            self.scroll_x.grid(row=1, column=0, sticky="ew")
+
+        self.textos = []
+        for i in range(self.filas_vis):
+            fila = []
+            for j in range(self.cols_vis):
+                x, y = j * self.ANCHO_CELDA, i * self.ALTO_CELDA
+                self.canvas.create_rectangle(x + 1, y + 1, x + self.ANCHO_CELDA - 1, y + self.ALTO_CELDA - 1,
+                                             outline="#1b1b2f")
+                fila.append(self.canvas.create_text(x + self.ANCHO_CELDA / 2, y + self.ALTO_CELDA / 2,
+                                                    text="", fill=fg, font=("Consolas", 9)))
+            self.textos.append(fila)
+        self.dibujar()
+
+    def dibujar(self):
+        """Actualiza el texto de las celdas visibles y la posición de las barras."""
+        M = self.matriz
+        for i, fila in enumerate(self.textos):
+            for j, item in enumerate(fila):
+                self.canvas.itemconfigure(item, text=matrix_exact.formatear(M[self.fila0 + i, self.col0 + j]))
+        if self.scroll_y:
+            self.scroll_y.set(self.fila0 / M.filas, (self.fila0 + self.filas_vis) / M.filas)
+        if self.scroll_x:
+            self.scroll_x.set(self.col0 / M.columnas, (self.col0 + self.cols_vis) / M.columnas)
+
+    @staticmethod
+    def _nuevo_inicio(args, inicio, total, visibles):
+        """Interpreta los argumentos de una Scrollbar ("moveto", f) / ("scroll", n, "units"|"pages")."""
+        if args[0] == "moveto":
+            inicio = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            inicio += int(args[1]) * (visibles if args[2] == "pages" else 1)
+        return max(0, min(inicio, total - visibles))
+
+    def _desplazar_filas(self, *args):
+        inicio = self._nuevo_inicio(args, self.fila0, self.matriz.filas, self.filas_vis)
+        if inicio != self.fila0:
+            self.fila0 = inicio
+            self.dibujar()
+
+    def _desplazar_columnas(self, *args):
+        inicio = self._nuevo_inicio(args, self.col0, self.matriz.columnas, self.cols_vis)
+        if inicio != self.col0:
+            self.col0 = inicio
+            self.dibujar()
+
+    def _rueda(self, evento):
+        self._desplazar_filas("scroll", -1 if evento.delta > 0 else 1, "units")
+
 
 class MatrixCalculatorGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("🕹️ Calculadora de Matrices - Modo Gamer 🕹️")
         self.root.state('zoomed')  # Maximizada
-        self.matrices = {}
-        self.historial = []
+        self.cache = matrix_cache.CacheDerivados()
+        self.exacto = False  # modo exacto: matrices de racionales (MatrizExacta)
+        self.matrices = matrix_cache.AlmacenMatrices(self.cache, formato=self._formato)
+        self.historial = matrix_history.Historial()
+        self.medicion = None  # medición de la última operación terminada (para el historial)
         self.current_matrix_name = None
+        self.tarea = None  # operación en segundo plano en curso (TareaCancelable)
+        self._al_terminar = None
+        self._descripcion_tarea = ""
+        self._sondeo = None  # id de root.after de la próxima comprobación de la tarea
+        self.paneles = {}  # nombre -> Frame con la vista de la matriz
 
         # ================= FRAMES =================
         self.frame_lateral = tk.Frame(root, width=250, bg="#1b1b2f")
@@ -37,6 +143,20 @@ class MatrixCalculatorGUI:
 
         tk.Label(self.frame_principal, text="🕹️ Calculadora de Matrices 🕹️",
                  font=("Arial", 24, "bold"), fg="#e94560", bg="#0f3460").pack(pady=20)
+        tk.Label(self.frame_principal, text=f"⚙️ Backend: {matrix_core.backend_activo()}",
+                 font=("Arial", 10), fg="#ffd369", bg="#0f3460").pack()
+
+        # Estado de la operación en segundo plano
+        self.frame_tarea = tk.Frame(self.frame_principal, bg="#0f3460")
+        self.frame_tarea.pack(pady=5)
+        self.estado_tarea = tk.Label(self.frame_tarea, text="", font=("Arial", 10),
+                                     fg="#ffd369", bg="#0f3460", width=40, anchor="w")
+        self.estado_tarea.pack(side="left")
+        self.barra_progreso = ttk.Progressbar(self.frame_tarea, mode="indeterminate", length=200)
+        self.barra_progreso.pack(side="left", padx=10)
+        self.boton_cancelar = tk.Button(self.frame_tarea, text="Cancelar", bg="#e94560", fg="white",
+                                        state="disabled", command=self.cancelar_tarea)
+        self.boton_cancelar.pack(side="left")
 
         # Canvas y scroll para matrices
         self.canvas = tk.Canvas(self.frame_principal, bg="#0f3460")
@@ -67,8 +187,13 @@ class MatrixCalculatorGUI:
             ("Eliminar matriz", self.eliminar_matriz),
             ("Guardar matriz", self.guardar_matriz),
             ("Cargar matriz", self.cargar_matriz),
+            ("Guardar espacio de trabajo", self.guardar_espacio),
+            ("Abrir espacio de trabajo", self.abrir_espacio),
             ("Historial", self.mostrar_historial),
             ("Exportar historial", self.exportar_historial),
+            ("Caché de resultados", self.mostrar_cache),
+            ("Modo exacto (fracciones)", self.configurar_modo_exacto),
+            ("Perfilado de operaciones", self.configurar_perfilado),
             ("Suma", lambda: self.op_binaria("suma")),
             ("Resta", lambda: self.op_binaria("resta")),
             ("Multiplicación", lambda: self.op_binaria("producto_matriz")),
@@ -79,6 +204,7 @@ class MatrixCalculatorGUI:
             ("Adjunta", self.op_adjunta),
             ("Inversa", self.op_inversa),
             ("Escalar", self.op_escalar),
+            ("Resolver sistema A·X = B", self.op_resolver),
             ("Salir", self.root.quit)
         ]
         for text, cmd in botones:
@@ -87,31 +213,46 @@ class MatrixCalculatorGUI:
             b.pack(pady=4)
 
     # ================= LISTA DE MATRICES =================
-    def actualizar_lista_matrices(self):
+    def actualizar_lista_matrices(self, nombre=None):
+        """
+        Sin nombre reconstruye el panel completo. Con nombre solo añade, redibuja o quita
+        el panel de esa matriz, de modo que el coste no depende del número de matrices.
+        """
+        if nombre is not None:
+            self._actualizar_panel(nombre)
+            return
         for widget in self.content_frame.winfo_children():
             widget.destroy()
+        self.paneles = {}
         tk.Label(self.content_frame, text="Matrices Disponibles:",
                  font=("Arial", 16, "bold"), fg="#ffd369", bg="#0f3460").pack(pady=10)
-
-        for nombre, matriz in self.matrices.items():
-            frame = tk.Frame(self.content_frame, bg="#1b1b2f", bd=2, relief="ridge")
+        for n in self.matrices:
+            self.paneles[n] = self._crear_panel(n)
+
+    def _actualizar_panel(self, nombre):
+        anterior = self.paneles.pop(nombre, None)
+        if nombre in self.matrices:
+            panel = self._crear_panel(nombre, despues_de=anterior)
+            self.paneles[nombre] = panel
+        if anterior is not None:
+            anterior.destroy()
+
+    def _crear_panel(self, nombre, despues_de=None):
+        matriz = self.matrices[nombre]
+        frame = tk.Frame(self.content_frame, bg="#1b1b2f", bd=2, relief="ridge")
+        if despues_de is not None:
+            frame.pack(pady=5, padx=10, fill="x", after=despues_de)
+        else:
             frame.pack(pady=5, padx=10, fill="x")
 
-            tk.Label(frame, text=nombre, font=("Arial", 14, "bold"),
-                     fg="#ffd369", bg="#1b1b2f").pack(side="top", anchor="w")
-
-            table_frame = tk.Frame(frame, bg="#0f3460")
-            table_frame.pack(pady=5)
-            rows, cols = len(matriz), len(matriz[0])
-            for i in range(rows):
-                for j in range(cols):
-                    val = tk.Text(table_frame, width=6, height=1, bg="#0f3460", fg="#ffd369")
-                    val.insert("1.0", f"{matriz[i][j]:.2f}")
-                    val.configure(state="disabled")  # 🔒 bloqueado
-                    val.grid(row=i, column=j, padx=1, pady=1)
+        filas, columnas = matriz.forma
+        tk.Label(frame, text=f"{nombre}  ({filas}x{columnas})", font=("Arial", 14, "bold"),
+                 fg="#ffd369", bg="#1b1b2f").pack(side="top", anchor="w")
+        VistaMatriz(frame, matriz).pack(pady=5)
 
-            tk.Button(frame, text="Seleccionar", bg="#e94560", fg="white",
-                      command=lambda n=nombre: self.seleccionar_matriz_actual(n)).pack(pady=5)
+        tk.Button(frame, text="Seleccionar", bg="#e94560", fg="white",
+                  command=lambda n=nombre: self.seleccionar_matriz_actual(n)).pack(pady=5)
+        return frame
 
     def seleccionar_matriz_actual(self, nombre):
         self.current_matrix_name = nombre
@@ -127,8 +268,14 @@ class MatrixCalculatorGUI:
             if filas <=0 or columnas <=0:
                 messagebox.showerror("⚠️ Error", "Filas y columnas deben ser mayores que 0.", parent=self.root)
                 return
-            if filas>50 or columnas>50:
-                messagebox.showwarning("⚠️ Atención", "Matriz muy grande. Máximo recomendado: 50x50", parent=self.root)
+            if filas>matrix_core.LIMITE_GRANDE or columnas>matrix_core.LIMITE_GRANDE:
+                messagebox.showerror("⚠️ Error", f"Matriz demasiado grande. Máximo: {matrix_core.LIMITE_GRANDE}x{matrix_core.LIMITE_GRANDE}", parent=self.root)
+                return
+            if filas>matrix_core.LIMITE_NORMAL or columnas>matrix_core.LIMITE_NORMAL:
+                costo = matrix_core.describir_costo(filas, columnas)
+                if not messagebox.askyesno("⚠️ Matriz grande",
+                                           f"Matriz de {filas}x{columnas}: {costo}.\n¿Desea continuar?", parent=self.root):
+                    return
         except:
             messagebox.showerror("⚠️ Error", "Valores inválidos.", parent=self.root)
             return
@@ -145,7 +292,7 @@ class MatrixCalculatorGUI:
                 for j in range(columnas):
                     while True:
                         try:
-                            val = simpledialog.askfloat("Elemento", f"Elemento ({i},{j}):", parent=self.root)
+                            val = self._leer_numero(simpledialog.askstring("Elemento", f"Elemento ({i},{j}):", parent=self.root))
                             if val != val or val in (float("inf"), float("-inf")):
                                 messagebox.showerror("⚠️ Error", "Valor inválido (NaN o Inf)", parent=self.root)
                                 continue
@@ -154,6 +301,10 @@ class MatrixCalculatorGUI:
                         except:
                             continue
                 matriz.append(fila)
+            if self.exacto:
+                matriz = matrix_exact.MatrizExacta(matriz)
+            else:
+                matriz = matrix_core.Matrix.desde_listas(matriz)
         elif tipo == "A":
             while True:
                 try:
@@ -165,7 +316,7 @@ class MatrixCalculatorGUI:
                     break
                 except:
                     continue
-            matriz = [[random.randint(minimo, maximo) for _ in range(columnas)] for _ in range(filas)]
+            matriz = matrix_core.Matrix.aleatoria(filas, columnas, minimo, maximo)
         else:
             messagebox.showerror("⚠️ Error", "Opción inválida", parent=self.root)
             return
@@ -174,7 +325,7 @@ class MatrixCalculatorGUI:
         self.historial.append(f"Matriz '{nombre}' creada")
         self.current_matrix_name = nombre
         messagebox.showinfo("✅ Éxito", f"Matriz '{nombre}' creada.", parent=self.root)
-        self.actualizar_lista_matrices()
+        self.actualizar_lista_matrices(nombre)
 
     # ================= MODIFICAR MATRIZ =================
     def modificar_matriz_desde_pantalla(self):
@@ -183,7 +334,10 @@ class MatrixCalculatorGUI:
             return
 
         matriz = self.matrices[self.current_matrix_name]
-        filas, columnas = len(matriz), len(matriz[0])
+        filas, columnas = matriz.forma
+        if filas>matrix_core.LIMITE_NORMAL or columnas>matrix_core.LIMITE_NORMAL:
+            messagebox.showwarning("⚠️ Atención", f"Solo se pueden editar en pantalla matrices de hasta {matrix_core.LIMITE_NORMAL}x{matrix_core.LIMITE_NORMAL}.", parent=self.root)
+            return
 
         ventana = tk.Toplevel(self.root)
         ventana.title(f"Modificar matriz '{self.current_matrix_name}'")
@@ -194,18 +348,27 @@ class MatrixCalculatorGUI:
             for j in range(columnas):
                 e = tk.Entry(ventana, width=6)
                 e.grid(row=i, column=j, padx=2, pady=2)
-                e.insert(0, str(matriz[i][j]))
+                e.insert(0, str(matriz[i, j]))
                 fila_entries.append(e)
             entries.append(fila_entries)
 
         def guardar_cambios():
             try:
-                nueva = [[float(entries[i][j].get()) for j in range(columnas)] for i in range(filas)]
-                self.matrices[self.current_matrix_name] = nueva
+                valores = [[self._leer_numero(entries[i][j].get()) for j in range(columnas)] for i in range(filas)]
+                nueva = matrix_exact.MatrizExacta(valores) if self.exacto else matrix_core.Matrix.desde_listas(valores)
+                cambios = [(i, j) for i in range(filas) for j in range(columnas) if nueva[i, j] != matriz[i, j]]
+                if len(cambios) == 1:
+                    # Un solo elemento: se edita en el sitio y la caché se actualiza en O(n²)
+                    i, j = cambios[0]
+                    delta = nueva[i, j] - matriz[i, j]
+                    matriz[i, j] = nueva[i, j]
+                    self.cache.actualizar_elemento(self.current_matrix_name, i, j, delta)
+                elif cambios:
+                    self.matrices[self.current_matrix_name] = nueva
                 self.historial.append(f"Matriz '{self.current_matrix_name}' modificada")
                 messagebox.showinfo("✅ Guardado", f"Matriz '{self.current_matrix_name}' modificada.", parent=ventana)
                 ventana.destroy()
-                self.actualizar_lista_matrices()
+                self.actualizar_lista_matrices(self.current_matrix_name)
             except:
                 messagebox.showerror("⚠️ Error", "Valores inválidos.", parent=ventana)
 
@@ -226,7 +389,7 @@ class MatrixCalculatorGUI:
             self.current_matrix_name = None
         self.historial.append(f"Matriz '{nombre}' eliminada")
         messagebox.showinfo("✅ Eliminada", f"Matriz '{nombre}' eliminada.", parent=self.root)
-        self.actualizar_lista_matrices()
+        self.actualizar_lista_matrices(nombre)
 
     # ================= FUNCIONES AUXILIARES =================
     def pedir_nombre_matriz(self, prompt="Nombre de la matriz"):
@@ -249,8 +412,106 @@ class MatrixCalculatorGUI:
             return None
         return self.matrices[nombre], nombre
 
+    # ================= TAREAS EN SEGUNDO PLANO =================
+    def ejecutar_en_segundo_plano(self, descripcion, operacion, args, al_terminar, entradas=None):
+        """
+        Lanza matrix_core.<operacion>(*args) en otro proceso para no bloquear la ventana.
+        Al terminar se llama a al_terminar(resultado) desde el hilo de Tk, con la medición
+        del cálculo sobre `entradas` (nombre → matriz) en self.medicion.
+        """
+        if self.tarea is not None:
+            messagebox.showwarning("⚠️ Atención", "Ya hay una operación en curso.", parent=self.root)
+            return
+        medicion = self.historial.medir(operacion, entradas)
+        self.tarea = matrix_parallel.TareaCancelable(operacion, *args, medicion=medicion)
+        self._al_terminar = al_terminar
+        self._descripcion_tarea = descripcion
+        self._inicio_tarea = time.perf_counter()
+        self.barra_progreso.start(15)
+        self.boton_cancelar.config(state="normal")
+        self._sondeo = self.root.after(INTERVALO_SONDEO_MS, self._comprobar_tarea)
+
+    def _comprobar_tarea(self):
+        self._sondeo = None
+        if self.tarea is None:  # cancelada
+            return
+        if not self.tarea.terminada():
+            transcurrido = time.perf_counter() - self._inicio_tarea
+            self.estado_tarea.config(text=f"⏳ {self._descripcion_tarea}... {transcurrido:.1f} s")
+            self._sondeo = self.root.after(INTERVALO_SONDEO_MS, self._comprobar_tarea)
+            return
+        tarea, al_terminar = self.tarea, self._al_terminar
+        self._finalizar_tarea("")
+        self.medicion = tarea.medicion
+        try:
+            resultado = tarea.resultado()
+        except ValueError as e:
+            messagebox.showerror("⚠️ Error", str(e), parent=self.root)
+            return
+        except Exception as e:
+            messagebox.showerror("⚠️ Error", f"Ocurrió un error: {e}", parent=self.root)
+            return
+        al_terminar(resultado)
+
+    def cancelar_tarea(self):
+        if self.tarea is None:
+            return
+        self.tarea.cancelar()
+        self._finalizar_tarea(f"⛔ {self._descripcion_tarea} cancelada")
+
+    def _finalizar_tarea(self, texto):
+        # Sin esto, una comprobación pendiente de la tarea cancelada vería la siguiente
+        # tarea y habría dos cadenas de sondeo para ella
+        if self._sondeo is not None:
+            self.root.after_cancel(self._sondeo)
+            self._sondeo = None
+        self.tarea = None
+        self._al_terminar = None
+        self.barra_progreso.stop()
+        self.boton_cancelar.config(state="disabled")
+        self.estado_tarea.config(text=texto)
+
+    def calcular_derivado(self, nombre_matriz, operacion, descripcion, al_terminar):
+        """
+        Obtiene matrix_core.<operacion> de la matriz `nombre_matriz` desde la caché o,
+        si no está, en segundo plano; el resultado se guarda en la caché si la matriz
+        no se ha modificado mientras tanto.
+        """
+        encontrado, valor = self.cache.buscar(nombre_matriz, operacion)
+        if encontrado:
+            if isinstance(valor, ValueError):
+                messagebox.showerror("⚠️ Error", str(valor), parent=self.root)
+            else:
+                self.estado_tarea.config(text=f"🗂️ {descripcion}: resultado en caché")
+                # Sin cálculo: el registro anota la operación y la entrada, sin tiempos
+                self.medicion = self.historial.medir(operacion, {nombre_matriz: self.matrices[nombre_matriz]})
+                al_terminar(valor)
+            return
+        version = self.cache.version(nombre_matriz)
+        # La inversa se calcula junto con el determinante, que también se cachea
+        funcion = "inversa_y_determinante" if operacion == "inversa" else operacion
+
+        def guardar_en_cache(valor):
+            if funcion == "inversa_y_determinante":
+                valor, det = valor
+                self.cache.guardar(nombre_matriz, "determinante", det, version)
+            self.cache.guardar(nombre_matriz, operacion, valor, version)
+            al_terminar(valor)
+
+        M = self.matrices[nombre_matriz]
+        self.ejecutar_en_segundo_plano(descripcion, funcion, (M,), guardar_en_cache, {nombre_matriz: M})
+
+    def guardar_resultado(self, R, prompt, entrada_historial, mensaje):
+        """Pide un nombre para R, lo guarda y registra la operación."""
+        nombre = self.pedir_nombre_matriz(prompt)
+        if not nombre: return
+        self.matrices[nombre] = R
+        self.historial.registrar(f"{entrada_historial} → {nombre}", self.medicion, R)
+        self.medicion = None
+        messagebox.showinfo("✅ Éxito", f"{mensaje} '{nombre}'", parent=self.root)
+        self.actualizar_lista_matrices(nombre)
+
     # ================= OPERACIONES =================
-    # (Mantengo tus operaciones exactamente igual)
     def op_binaria(self, tipo):
         if len(self.matrices) < 2:
             messagebox.showwarning("⚠️ Atención","Se necesitan al menos 2 matrices.", parent=self.root)
@@ -259,170 +520,169 @@ class MatrixCalculatorGUI:
         selB = self.seleccionar_matriz("Segunda matriz")
         if not selA or not selB:
             return
-        A,_ = selA
-        B,_ = selB
-        try:
-            if tipo=="suma":
-                if len(A)!=len(B) or len(A[0])!=len(B[0]):
-                    messagebox.showerror("⚠️ Error","Dimensiones no coinciden para suma", parent=self.root)
-                    return
-                R=[[A[i][j]+B[i][j] for j in range(len(A[0]))] for i in range(len(A))]
-            elif tipo=="resta":
-                if len(A)!=len(B) or len(A[0])!=len(B[0]):
-                    messagebox.showerror("⚠️ Error","Dimensiones no coinciden para resta", parent=self.root)
-                    return
-                R=[[A[i][j]-B[i][j] for j in range(len(A[0]))] for i in range(len(A))]
-            elif tipo=="producto_matriz":
-                if len(A[0])!=len(B):
-                    messagebox.showerror("⚠️ Error","Columnas A != Filas B", parent=self.root)
-                    return
-                R=[[sum(A[i][k]*B[k][j] for k in range(len(B))) for j in range(len(B[0]))] for i in range(len(A))]
-            elif tipo=="producto_hadamard":
-                if len(A)!=len(B) or len(A[0])!=len(B[0]):
-                    messagebox.showerror("⚠️ Error","Dimensiones no coinciden para Hadamard", parent=self.root)
-                    return
-                R=[[A[i][j]*B[i][j] for j in range(len(A[0]))] for i in range(len(A))]
-            elif tipo=="division_elemento":
-                if len(A)!=len(B) or len(A[0])!=len(B[0]):
-                    messagebox.showerror("⚠️ Error","Dimensiones no coinciden para división", parent=self.root)
-                    return
-                R=[[A[i][j]/B[i][j] if B[i][j]!=0 else 0 for j in range(len(A[0]))] for i in range(len(A))]
-            else:
-                messagebox.showerror("⚠️ Error","Operación desconocida", parent=self.root)
-                return
-            nombre = self.pedir_nombre_matriz("Nombre de la matriz resultado")
-            if not nombre: return
-            self.matrices[nombre]=R
-            self.historial.append(f"Resultado de {tipo.upper()} → {nombre}")
-            messagebox.showinfo("✅ Éxito", f"Operación {tipo} guardada como '{nombre}'", parent=self.root)
-            self.actualizar_lista_matrices()
-        except Exception as e:
-            messagebox.showerror("⚠️ Error", f"Ocurrió un error: {e}", parent=self.root)
+        A,nombre_A = selA
+        B,nombre_B = selB
+        if tipo not in matrix_core.OPERACIONES_BINARIAS:
+            messagebox.showerror("⚠️ Error","Operación desconocida", parent=self.root)
+            return
+        args = (A, B, 0) if tipo=="division_elemento" else (A, B)
+        self.ejecutar_en_segundo_plano(
+            f"Calculando {tipo}", tipo, args,
+            lambda R: self.guardar_resultado(R, "Nombre de la matriz resultado", f"Resultado de {tipo.upper()}",
+                                             f"Operación {tipo} guardada como"),
+            {nombre_A: A, nombre_B: B})
 
     # ================= FUNCIONES DE MATRICES =================
     def op_transpuesta(self):
         sel = self.seleccionar_matriz()
         if not sel: return
-        A, _ = sel
-        R = [list(f) for f in zip(*A)]
+        A, nombre_matriz = sel
+        medicion = self.historial.medir("transpuesta", {nombre_matriz: A})
+        R = self.cache.obtener(nombre_matriz, "transpuesta", lambda: medicion.ejecutar(matrix_core.transpuesta, A))
         nombre = self.pedir_nombre_matriz("Nombre de la transpuesta")
         if not nombre: return
         self.matrices[nombre]=R
-        self.historial.append(f"Transpuesta → {nombre}")
+        self.historial.registrar(f"Transpuesta → {nombre}", medicion, R)
         messagebox.showinfo("✅ Éxito", f"Transpuesta guardada como '{nombre}'", parent=self.root)
-        self.actualizar_lista_matrices()
+        self.actualizar_lista_matrices(nombre)
 
     def op_determinante(self):
         sel = self.seleccionar_matriz()
         if not sel: return
         A, nombre_matriz = sel
-        if len(A)!=len(A[0]):
+        if not A.es_cuadrada:
             messagebox.showerror("⚠️ Error", "Solo se permite determinante en matrices cuadradas.", parent=self.root)
             return
-        det = self.determinante(A)
-        self.historial.append(f"Determinante de '{nombre_matriz}' calculado")
-        messagebox.showinfo("📌 Determinante", f"Determinante de '{nombre_matriz}' = {det}", parent=self.root)
+
+        def mostrar(det):
+            self.historial.registrar(f"Determinante de '{nombre_matriz}' = {det}", self.medicion)
+            self.medicion = None
+            messagebox.showinfo("📌 Determinante", f"Determinante de '{nombre_matriz}' = {det}", parent=self.root)
+
+        self.calcular_derivado(nombre_matriz, "determinante", "Calculando determinante", mostrar)
 
     def determinante(self, M):
-        if len(M) == 1: return M[0][0]
-        if len(M) == 2: return M[0][0]*M[1][1]-M[0][1]*M[1][0]
-        det=0
-        for c in range(len(M[0])):
-            minor=[fila[:c]+fila[c+1:] for fila in M[1:]]
-            det+=((-1)**c)*M[0][c]*self.determinante(minor)
-        return det
+        return matrix_core.determinante(M)
 
     def op_adjunta(self):
         sel = self.seleccionar_matriz()
         if not sel: return
-        A,_=sel
-        if len(A)!=len(A[0]):
+        A,nombre_matriz=sel
+        if not A.es_cuadrada:
             messagebox.showerror("⚠️ Error","Solo cuadradas", parent=self.root)
             return
-        adj=[]
-        n=len(A)
-        for i in range(n):
-            fila=[]
-            for j in range(n):
-                minor=[row[:j]+row[j+1:] for k,row in enumerate(A) if k!=i]
-                fila.append(((-1)**(i+j))*self.determinante(minor))
-            adj.append(fila)
-        adj_T=[list(f) for f in zip(*adj)]
-        nombre=self.pedir_nombre_matriz("Nombre adjunta")
-        if not nombre: return
-        self.matrices[nombre]=adj_T
-        self.historial.append(f"Adjunta → {nombre}")
-        messagebox.showinfo("✅ Éxito", f"Adjunta guardada como '{nombre}'", parent=self.root)
-        self.actualizar_lista_matrices()
+        self.calcular_derivado(
+            nombre_matriz, "adjunta", "Calculando adjunta",
+            lambda R: self.guardar_resultado(R, "Nombre adjunta", "Adjunta", "Adjunta guardada como"))
 
     def op_inversa(self):
         sel=self.seleccionar_matriz()
         if not sel: return
-        A,_=sel
-        if len(A)!=len(A[0]):
+        A,nombre_matriz=sel
+        if not A.es_cuadrada:
             messagebox.showerror("⚠️ Error","Solo cuadradas", parent=self.root)
             return
-        det=self.determinante(A)
-        if det==0:
-            messagebox.showerror("⚠️ Error","Matriz no tiene inversa", parent=self.root)
-            return
-        n=len(A)
-        adj=[]
-        for i in range(n):
-            fila=[]
-            for j in range(n):
-                minor=[row[:j]+row[j+1:] for k,row in enumerate(A) if k!=i]
-                fila.append(((-1)**(i+j))*self.determinante(minor))
-            adj.append(fila)
-        adj_T=[list(f) for f in zip(*adj)]
-        R=[[adj_T[i][j]/det for j in range(n)] for i in range(n)]
-        nombre=self.pedir_nombre_matriz("Nombre inversa")
-        if not nombre: return
-        self.matrices[nombre]=R
-        self.historial.append(f"Inversa → {nombre}")
-        messagebox.showinfo("✅ Éxito", f"Inversa guardada como '{nombre}'", parent=self.root)
-        self.actualizar_lista_matrices()
+        self.calcular_derivado(
+            nombre_matriz, "inversa", "Calculando inversa",
+            lambda R: self.guardar_resultado(R, "Nombre inversa", "Inversa", "Inversa guardada como"))
+
+    def op_resolver(self):
+        if not self.matrices:
+            messagebox.showwarning("⚠️ Atención","No hay matrices disponibles.", parent=self.root)
+            return
+        selA = self.seleccionar_matriz("Matriz de coeficientes A")
+        if not selA: return
+        selB = self.seleccionar_matriz("Términos independientes B")
+        if not selB: return
+        (A, nombre_A), (B, nombre_B) = selA, selB
+        entradas = {nombre_A: A, nombre_B: B}
+        guardar = lambda X: self.guardar_resultado(X, "Nombre de la solución", f"Sistema {nombre_A}·X = {nombre_B}",
+                                                  "Solución guardada como")
+        if not A.es_cuadrada:
+            # Mínimos cuadrados por QR
+            self.ejecutar_en_segundo_plano("Resolviendo por mínimos cuadrados", "resolver", (A, B), guardar, entradas)
+            return
+        # La LU de A se calcula una vez (en caché) y se reutiliza para cada B
+        encontrado, lu = self.cache.buscar(nombre_A, "lu")
+        if encontrado:
+            self.ejecutar_en_segundo_plano("Resolviendo sistema", "resolver", (A, B, lu), guardar, entradas)
+            return
+        version = self.cache.version(nombre_A)
+
+        def resolver(lu):
+            self.cache.guardar(nombre_A, "lu", lu, version)
+            self.ejecutar_en_segundo_plano("Resolviendo sistema", "resolver", (A, B, lu), guardar, entradas)
+
+        self.ejecutar_en_segundo_plano("Factorizando A (LU)", "factorizar", (A,), resolver, {nombre_A: A})
 
     def op_escalar(self):
         sel=self.seleccionar_matriz()
         if not sel: return
-        A,_=sel
+        A,nombre_A=sel
         try:
-            esc=float(simpledialog.askstring("Escalar","Valor escalar", parent=self.root))
+            esc=self._leer_numero(simpledialog.askstring("Escalar","Valor escalar", parent=self.root))
         except:
             messagebox.showerror("⚠️ Error","Valor inválido", parent=self.root)
             return
-        R=[[A[i][j]*esc for j in range(len(A[0]))] for i in range(len(A))]
+        medicion=self.historial.medir("escalar", {nombre_A: A})
+        R=medicion.ejecutar(matrix_core.escalar, A, esc)
         nombre=self.pedir_nombre_matriz("Nombre resultado")
         if not nombre: return
         self.matrices[nombre]=R
-        self.historial.append(f"Escalar({esc}) → {nombre}")
+        self.historial.registrar(f"Escalar({esc}) → {nombre}", medicion, R)
         messagebox.showinfo("✅ Éxito", f"Resultado guardado como '{nombre}'", parent=self.root)
-        self.actualizar_lista_matrices()
+        self.actualizar_lista_matrices(nombre)
 
     # ================= GUARDAR / CARGAR =================
     def guardar_matriz(self):
         sel=self.seleccionar_matriz()
         if not sel: return
         A,nombre=sel
-        ruta=filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files","*.txt")])
+        ruta=filedialog.asksaveasfilename(defaultextension=".txt", filetypes=TIPOS_ARCHIVO)
         if not ruta: return
-        with open(ruta,"w", encoding="utf-8") as f:
-            for fila in A:
-                f.write(",".join(str(x) for x in fila)+"\n")
+        matrix_io.guardar(A, ruta)
         messagebox.showinfo("✅ Guardada", f"Matriz '{nombre}' guardada en {ruta}", parent=self.root)
 
     def cargar_matriz(self):
-        ruta=filedialog.askopenfilename(filetypes=[("Text files","*.txt")])
+        ruta=filedialog.askopenfilename(filetypes=TIPOS_ARCHIVO)
         if not ruta: return
-        with open(ruta,"r", encoding="utf-8") as f:
-            lineas=f.readlines()
-        matriz=[list(map(float,l.strip().split(","))) for l in lineas]
+        try:
+            matriz=matrix_io.cargar(ruta)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("⚠️ Error", f"No se pudo cargar la matriz: {e}", parent=self.root)
+            return
         nombre=self.pedir_nombre_matriz("Nombre matriz cargada")
         if not nombre: return
         self.matrices[nombre]=matriz
         self.historial.append(f"Matriz '{nombre}' cargada desde archivo")
+        self.actualizar_lista_matrices(nombre)
+
+    def guardar_espacio(self):
+        if not self.matrices and not self.historial:
+            messagebox.showwarning("⚠️ Atención","No hay matrices ni historial", parent=self.root)
+            return
+        ruta=filedialog.asksaveasfilename(defaultextension=matrix_io.EXTENSION_ESPACIO, filetypes=TIPOS_ESPACIO)
+        if not ruta: return
+        try:
+            matrix_io.guardar_espacio(self.matrices, self.historial, ruta)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("⚠️ Error", f"No se pudo guardar: {e}", parent=self.root)
+            return
+        messagebox.showinfo("✅ Guardado", f"Espacio de trabajo guardado en {ruta}", parent=self.root)
+
+    def abrir_espacio(self):
+        ruta=filedialog.askopenfilename(filetypes=TIPOS_ESPACIO)
+        if not ruta: return
+        try:
+            espacio=matrix_io.EspacioTrabajo(ruta)
+            matrices=espacio.cargar_todas()
+        except (ValueError, OSError) as e:
+            messagebox.showerror("⚠️ Error", f"No se pudo abrir: {e}", parent=self.root)
+            return
+        self.matrices.update(matrices)
+        self.historial.extend(espacio.historial)
         self.actualizar_lista_matrices()
+        messagebox.showinfo("✅ Restaurado", f"{len(matrices)} matrices cargadas desde {ruta}", parent=self.root)
 
     # ================= HISTORIAL =================
     def mostrar_historial(self):
@@ -433,17 +693,70 @@ class MatrixCalculatorGUI:
         ventana.title("Historial")
         texto=tk.Text(ventana,width=50,height=20)
         texto.pack()
-        texto.insert("1.0","\n".join(self.historial))
+        texto.insert("1.0","\n".join(registro.resumen() for registro in self.historial))
+
+    def mostrar_cache(self):
+        messagebox.showinfo("🗂️ Caché de resultados", self.cache.describir(), parent=self.root)
+
+    # ================= PERFILADO =================
+    def configurar_perfilado(self):
+        """Define qué se mide en cada operación del historial: memoria y perfil de las operaciones lentas."""
+        h = self.historial
+        modo = simpledialog.askstring(
+            "Perfilado", f"Perfil ({', '.join(matrix_history.PERFILES)} o vacío = ninguno). Actual: {h.perfil or 'ninguno'}",
+            parent=self.root)
+        if modo is None: return
+        modo = modo.strip().lower() or None
+        if modo is not None and modo not in matrix_history.PERFILES:
+            messagebox.showerror("⚠️ Error", "Perfil desconocido.", parent=self.root)
+            return
+        if modo:
+            umbral = simpledialog.askfloat("Perfilado", "Umbral en segundos para guardar el perfil:",
+                                           initialvalue=h.umbral_perfil, minvalue=0, parent=self.root)
+            if umbral is None: return
+            h.umbral_perfil = umbral
+        h.perfil = modo
+        h.memoria = messagebox.askyesno("Perfilado", "¿Medir la memoria de cada operación? (la ralentiza)",
+                                        parent=self.root)
+        messagebox.showinfo("✅ Perfilado", f"Perfil: {modo or 'ninguno'}; memoria: {'sí' if h.memoria else 'no'}.",
+                            parent=self.root)
+
+    # ================= MODO EXACTO =================
+    def configurar_modo_exacto(self):
+        """Activa o desactiva el modo exacto y convierte las matrices guardadas al nuevo formato."""
+        self.exacto = not self.exacto
+        # Reasignar cada matriz la convierte (e invalida sus resultados en caché)
+        self.matrices.update(dict(self.matrices))
+        if self.exacto:
+            mensaje = ("Modo exacto activado: las matrices usan fracciones (p. ej. 3/4) y los resultados "
+                       "no tienen redondeo. Al guardar en archivo se exportan como float.")
+        else:
+            mensaje = "Modo exacto desactivado: las matrices vuelven a coma flotante."
+        self.historial.append(mensaje.split(":")[0])
+        messagebox.showinfo("✅ Modo exacto", mensaje, parent=self.root)
+        self.actualizar_lista_matrices()
+
+    def _formato(self, M):
+        """Formato en que se guarda cada matriz: exacta en modo exacto, densa o dispersa si no."""
+        if self.exacto:
+            return matrix_exact.como_exacta(M)
+        return matrix_sparse.formato_automatico(M)
+
+    def _leer_numero(self, texto):
+        """Número introducido por el usuario: fracción exacta (p. ej. 3/4) en modo exacto, float si no."""
+        return matrix_exact.racional(texto) if self.exacto else float(texto)
 
     def exportar_historial(self):
         if not self.historial:
             messagebox.showwarning("⚠️ Atención","No hay historial", parent=self.root)
             return
-        ruta=filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text files","*.txt")])
+        ruta=filedialog.asksaveasfilename(defaultextension=".jsonl",
+                                          filetypes=[("Registros JSON lines","*.jsonl"), ("Text files","*.txt")])
         if not ruta: return
-        with open(ruta,"w", encoding="utf-8") as f:
-            for h in self.historial:
-                f.write(h+"\n")
+        if ruta.lower().endswith(".txt"):
+            self.historial.exportar_texto(ruta)
+        else:
+            self.historial.exportar_jsonl(ruta)
         messagebox.showinfo("✅ Exportado", f"Historial exportado a {ruta}", parent=self.root)
 
 
@@ -1,20 +1,42 @@
-import random
+import os
+import sys
+from fractions import Fraction
+
+import matrix_cache
+import matrix_core
+import matrix_exact
+import matrix_expr
+import matrix_history
+import matrix_io
+import matrix_parallel
+import matrix_sparse
+import matrix_stack
 
 class MatrixCalculator:
     """
     Calculadora de matrices en consola.
     Permite:
     - Crear, modificar, guardar y cargar matrices.
+    - Guardar y restaurar el espacio de trabajo completo (matrices e historial) en un archivo.
     - Realizar operaciones entre matrices: suma, resta, multiplicación, Hadamard, división elemento a elemento.
     - Realizar operaciones sobre una matriz: transpuesta, determinante, adjunta, inversa, multiplicación por escalar.
     - Guardar un historial de operaciones realizadas.
+    - Reutilizar determinante, inversa, adjunta y transpuesta ya calculados (caché por matriz).
+    - Evaluar expresiones como inv(A) * (B + C) sin guardar resultados intermedios.
+    - Resolver sistemas A·X = B sin invertir A (LU reutilizable; mínimos cuadrados si A no es cuadrada).
     - Eliminar matrices existentes.
+    - Repartir las operaciones pesadas (producto, adjunta, inversa) en varios procesos.
+    - Modo exacto: matrices de fracciones, con determinante, inversa y adjunta sin redondeo.
+    - Operar de una vez sobre pilas de matrices de la misma forma guardadas en un archivo.
     """
 
     def __init__(self):
         """Inicializa la calculadora con un diccionario de matrices y un historial vacío."""
-        self.matrices = {}
-        self.historial = []
+        self.cache = matrix_cache.CacheDerivados()
+        self.exacto = False  # modo exacto: matrices de racionales (MatrizExacta)
+        self.matrices = matrix_cache.AlmacenMatrices(self.cache, formato=self._formato)
+        self.historial = matrix_history.Historial()
+        self.paralelo = None  # EjecutorParalelo activo, o None para cálculo serie
 
     # ======================= CREACIÓN Y LISTADO =======================
     def crear_matriz(self, nombre):
@@ -25,9 +47,13 @@ class MatrixCalculator:
             if filas <= 0 or columnas <= 0:
                 print("⚠️ Filas y columnas deben ser mayores que 0.")
                 return
-            if filas > 50 or columnas > 50:
-                print(f"⚠️ La matriz es demasiado grande ({filas}x{columnas}). Máximo recomendado: 50x50")
+            if filas > matrix_core.LIMITE_GRANDE or columnas > matrix_core.LIMITE_GRANDE:
+                print(f"⚠️ La matriz es demasiado grande ({filas}x{columnas}). Máximo: {matrix_core.LIMITE_GRANDE}x{matrix_core.LIMITE_GRANDE}")
                 return
+            if filas > matrix_core.LIMITE_NORMAL or columnas > matrix_core.LIMITE_NORMAL:
+                print(f"⚠️ Modo matriz grande ({filas}x{columnas}): {matrix_core.describir_costo(filas, columnas)}")
+                if input("¿Desea continuar? (S/N): ").strip().upper() != "S":
+                    return
 
             tipo = input("¿Desea llenarla manual (M) o aleatoria (A)? ").strip().upper()
             matriz = []
@@ -38,7 +64,7 @@ class MatrixCalculator:
                     for j in range(columnas):
                         while True:
                             try:
-                                val = float(input(f"Elemento ({i},{j}): "))
+                                val = self._leer_numero(input(f"Elemento ({i},{j}): "))
                                 if val != val or val in (float("inf"), float("-inf")):
                                     print("⚠️ Valor inválido (NaN o Inf). Intente de nuevo.")
                                     continue
@@ -47,6 +73,10 @@ class MatrixCalculator:
                             except ValueError:
                                 print("⚠️ Entrada inválida. Ingrese un número.")
                     matriz.append(fila)
+                if self.exacto:
+                    matriz = matrix_exact.MatrizExacta(matriz)
+                else:
+                    matriz = matrix_core.Matrix.desde_listas(matriz)
 
             elif tipo == "A":
                 while True:
@@ -59,7 +89,7 @@ class MatrixCalculator:
                         break
                     except ValueError:
                         print("⚠️ Entrada inválida. Deben ser números enteros.")
-                matriz = [[random.randint(minimo, maximo) for _ in range(columnas)] for _ in range(filas)]
+                matriz = matrix_core.Matrix.aleatoria(filas, columnas, minimo, maximo)
             else:
                 print("⚠️ Opción inválida.")
                 return
@@ -78,26 +108,36 @@ class MatrixCalculator:
 
         nombres = list(self.matrices.keys())
         num_matrices = len(nombres)
+        # Las matrices grandes se muestran recortadas a LIMITE_NORMAL x LIMITE_NORMAL
+        vistas = {nombre: self.matrices[nombre].recorte(matrix_core.LIMITE_NORMAL, matrix_core.LIMITE_NORMAL)
+                  for nombre in nombres}
 
         if num_matrices < 3:
             for nombre in nombres:
-                print(f"\n🔹 Matriz {nombre}:")
-                for fila in self.matrices[nombre]:
-                    print(" ".join(f"{x:8.2f}" for x in fila))
+                M = self.matrices[nombre]
+                filas, columnas = M.forma
+                if matrix_core.es_dispersa(M):
+                    print(f"\n🔹 Matriz {nombre} ({filas}x{columnas}, dispersa con {M.nnz} no nulos, vista previa):")
+                elif vistas[nombre].forma != (filas, columnas):
+                    print(f"\n🔹 Matriz {nombre} ({filas}x{columnas}, vista previa):")
+                else:
+                    print(f"\n🔹 Matriz {nombre}:")
+                for fila in vistas[nombre]:
+                    print(" ".join(matrix_exact.formatear(x, 8) for x in fila))
         else:
             # Mostrar matrices en columnas tipo 3 en paralelo
             col_count = 3
-            rows = max(len(self.matrices[nombres[i]]) for i in range(num_matrices))
+            rows = max(vistas[nombres[i]].filas for i in range(num_matrices))
             for r in range(rows):
                 line = ""
                 for c in range(col_count):
                     idx = r + c*rows
                     if idx < num_matrices:
-                        matriz = self.matrices[nombres[idx]]
-                        if r < len(matriz):
-                            line += " ".join(f"{x:6.2f}" for x in matriz[r]) + "    "
+                        matriz = vistas[nombres[idx]]
+                        if r < matriz.filas:
+                            line += " ".join(matrix_exact.formatear(x, 6) for x in matriz.fila(r)) + "    "
                         else:
-                            line += " " * (6*len(matriz[0])+4)
+                            line += " " * (6*matriz.columnas+4)
                 print(line)
 
     def modificar_elemento(self):
@@ -114,13 +154,13 @@ class MatrixCalculator:
         try:
             i = int(input("Fila: "))
             j = int(input("Columna: "))
-            if i < 0 or j < 0 or i >= len(matriz) or j >= len(matriz[0]):
+            if i < 0 or j < 0 or i >= matriz.filas or j >= matriz.columnas:
                 print("⚠️ Posición fuera de rango.")
                 return
 
             while True:
                 try:
-                    val = float(input("Nuevo valor: "))
+                    val = self._leer_numero(input("Nuevo valor: "))
                     if val != val or val in (float("inf"), float("-inf")):
                         print("⚠️ Valor inválido (NaN o Inf). Intente de nuevo.")
                         continue
@@ -128,8 +168,12 @@ class MatrixCalculator:
                 except ValueError:
                     print("⚠️ Entrada inválida. Ingrese un número.")
 
-            matriz[i][j] = val
-            print("✅ Valor actualizado.")
+            delta = val - matriz[i, j]
+            matriz[i, j] = val
+            if self.cache.actualizar_elemento(nombre, i, j, delta):
+                print("✅ Valor actualizado (inversa y determinante actualizados sin recalcular).")
+            else:
+                print("✅ Valor actualizado.")
 
         except ValueError:
             print("⚠️ Entrada inválida. Debe ser un número entero.")
@@ -159,11 +203,10 @@ class MatrixCalculator:
             print("⚠️ No existe esa matriz.")
             return
 
-        archivo = input("Nombre del archivo (.txt o .csv): ").strip()
+        archivo = input(f"Nombre del archivo (.txt, .csv, {matrix_io.EXTENSION_BINARIA} binario "
+                        f"o {'/'.join(matrix_io.EXTENSIONES_TRIPLETES)} tripletes): ").strip()
         try:
-            with open(archivo, "w") as f:
-                for fila in self.matrices[nombre]:
-                    f.write(",".join(map(str, fila)) + "\n")
+            matrix_io.guardar(self.matrices[nombre], archivo)
             print(f"✅ Matriz '{nombre}' guardada en {archivo}.")
         except Exception as e:
             print(f"⚠️ Error al guardar: {e}")
@@ -171,186 +214,409 @@ class MatrixCalculator:
     def cargar_matriz(self):
         archivo = input("Nombre del archivo a cargar: ").strip()
         try:
-            with open(archivo, "r") as f:
-                lineas = f.readlines()
-
-            matriz = []
-            for linea in lineas:
-                try:
-                    matriz.append(list(map(float, linea.strip().split(","))))
-                except ValueError:
-                    print("⚠️ El archivo contiene datos inválidos.")
-                    return
-
-            if not matriz:
-                print("⚠️ El archivo está vacío o mal formateado.")
+            try:
+                if matrix_io.es_binario(archivo):
+                    matriz, enteras = matrix_io.cargar_binario(archivo), None
+                elif matrix_io.es_tripletes(archivo):
+                    matriz, enteras = matrix_io.cargar_tripletes(archivo), None
+                else:
+                    matriz, enteras = matrix_io.cargar_texto(archivo)
+            except ValueError as e:
+                print(f"⚠️ {e}")
                 return
 
             nombre = input("Nombre para la matriz cargada: ").strip()
             self.matrices[nombre] = matriz
-            print(f"✅ Matriz '{nombre}' cargada desde {archivo}.")
+            matriz = self.matrices[nombre]
+            formato = f", dispersa con {matriz.nnz} no nulos" if matrix_core.es_dispersa(matriz) else ""
+            print(f"✅ Matriz '{nombre}' ({matriz.filas}x{matriz.columnas}{formato}) cargada desde {archivo}.")
+            if enteras:
+                print(f"   Columnas enteras: {', '.join(map(str, enteras))}")
 
         except FileNotFoundError:
             print("⚠️ Archivo no encontrado.")
         except Exception as e:
             print(f"⚠️ Error al cargar: {e}")
 
-    # ======================= OPERACIONES BINARIAS =======================
-    def op_binaria(self, tipo):
-        if len(self.matrices) < 2:
-            print("⚠️ Se necesitan al menos 2 matrices.")
+    def guardar_espacio(self):
+        if not self.matrices and not self.historial:
+            print("⚠️ No hay matrices ni historial que guardar.")
             return
+        archivo = input(f"Nombre del espacio de trabajo ({matrix_io.EXTENSION_ESPACIO}): ").strip()
+        if not matrix_io.es_espacio(archivo):
+            archivo += matrix_io.EXTENSION_ESPACIO
+        try:
+            matrix_io.guardar_espacio(self.matrices, self.historial, archivo)
+            print(f"✅ Espacio de trabajo guardado en {archivo} ({len(self.matrices)} matrices).")
+        except Exception as e:
+            print(f"⚠️ Error al guardar: {e}")
 
-        A = self.seleccionar_matriz("primera")
-        B = self.seleccionar_matriz("segunda")
-        if not A or not B:
+    def abrir_espacio(self):
+        archivo = input("Espacio de trabajo a abrir: ").strip()
+        try:
+            espacio = matrix_io.EspacioTrabajo(archivo)
+        except FileNotFoundError:
+            print("⚠️ Archivo no encontrado.")
+            return
+        except ValueError as e:
+            print(f"⚠️ {e}")
             return
 
+        print("📌 Matrices en el espacio de trabajo:")
+        for nombre in espacio.nombres:
+            filas, columnas = espacio.forma(nombre)
+            print(f" - {nombre} ({filas}x{columnas})")
+        nombre = input("Matriz a cargar (vacío = todas, con el historial): ").strip()
         try:
-            if tipo == "suma":
-                if len(A) != len(B) or len(A[0]) != len(B[0]):
-                    print("⚠️ Las dimensiones no coinciden para la suma.")
-                    return
-                R = [[A[i][j] + B[i][j] for j in range(len(A[0]))] for i in range(len(A))]
-
-            elif tipo == "resta":
-                if len(A) != len(B) or len(A[0]) != len(B[0]):
-                    print("⚠️ Las dimensiones no coinciden para la resta.")
-                    return
-                R = [[A[i][j] - B[i][j] for j in range(len(A[0]))] for i in range(len(A))]
+            if nombre:
+                self.matrices[nombre] = espacio.cargar(nombre)
+                self.historial.append(f"Matriz '{nombre}' cargada desde {archivo}")
+                print(f"✅ Matriz '{nombre}' cargada.")
+            else:
+                self.matrices.update(espacio.cargar_todas())
+                self.historial.extend(espacio.historial)
+                print(f"✅ Espacio de trabajo restaurado: {len(espacio.nombres)} matrices, "
+                      f"{len(espacio.historial)} entradas de historial.")
+        except ValueError as e:
+            print(f"⚠️ {e}")
 
-            elif tipo == "producto_matriz":
-                if len(A[0]) != len(B):
-                    print("⚠️ Columnas de A ≠ Filas de B.")
-                    return
-                R = [[sum(A[i][k] * B[k][j] for k in range(len(B))) for j in range(len(B[0]))] for i in range(len(A))]
+    # ======================= OPERACIONES BINARIAS =======================
+    def op_binaria(self, tipo):
+        if len(self.matrices) < 2:
+            print("⚠️ Se necesitan al menos 2 matrices.")
+            return
 
-            elif tipo == "producto_hadamard":
-                if len(A) != len(B) or len(A[0]) != len(B[0]):
-                    print("⚠️ Las dimensiones no coinciden para Hadamard.")
-                    return
-                R = [[A[i][j] * B[i][j] for j in range(len(A[0]))] for i in range(len(A))]
+        nombre_A = self.seleccionar_nombre("primera")
+        nombre_B = self.seleccionar_nombre("segunda")
+        if not nombre_A or not nombre_B:
+            return
+        A, B = self.matrices[nombre_A], self.matrices[nombre_B]
 
-            elif tipo == "division_elemento":
-                if len(A) != len(B) or len(A[0]) != len(B[0]):
-                    print("⚠️ Las dimensiones no coinciden para división.")
-                    return
-                R = [[A[i][j] / B[i][j] if B[i][j] != 0 else float("inf") for j in range(len(A[0]))] for i in range(len(A))]
+        if tipo not in matrix_core.OPERACIONES_BINARIAS:
+            print("⚠️ Operación desconocida.")
+            return
 
-            else:
-                print("⚠️ Operación desconocida.")
-                return
+        try:
+            medicion = self.historial.medir(tipo, {nombre_A: A, nombre_B: B})
+            R = medicion.ejecutar(self._operacion(tipo), A, B)
 
             nombre = input("Nombre de la matriz resultado: ").strip()
             self.matrices[nombre] = R
-            self.historial.append(f"Resultado de {tipo.upper()} → {nombre}")
+            self.historial.registrar(f"Resultado de {tipo.upper()} → {nombre}", medicion, R)
             print(f"✅ Operación {tipo} guardada como '{nombre}'.")
 
+        except ValueError as e:
+            print(f"⚠️ {e}")
         except Exception as e:
             print(f"⚠️ Error en operación: {e}")
 
     # ======================= OPERACIONES SOBRE UNA MATRIZ =======================
     def op_transpuesta(self):
-        A = self.seleccionar_matriz()
-        if not A:
+        nombre_A = self.seleccionar_nombre()
+        if not nombre_A:
             return
-        R = [list(fila) for fila in zip(*A)]
+        A = self.matrices[nombre_A]
+        medicion = self.historial.medir("transpuesta", {nombre_A: A})
+        R = self.cache.obtener(nombre_A, "transpuesta", lambda: medicion.ejecutar(matrix_core.transpuesta, A))
         nombre = input("Nombre de la transpuesta: ").strip()
         self.matrices[nombre] = R
-        self.historial.append(f"Transpuesta → {nombre}")
+        self.historial.registrar(f"Transpuesta → {nombre}", medicion, R)
         print(f"✅ Transpuesta guardada como '{nombre}'.")
 
     def op_determinante(self):
-        A = self.seleccionar_matriz()
-        if not A:
+        nombre_A = self.seleccionar_nombre()
+        if not nombre_A:
             return
-        if len(A) != len(A[0]):
+        A = self.matrices[nombre_A]
+        if not A.es_cuadrada:
             print("⚠️ Solo se permite determinante en matrices cuadradas.")
             return
-        print("📌 Cálculo paso a paso del determinante:")
-        det = self.determinante(A, paso=True)
-        print(f"Determinante = {det}")
-
-    def determinante(self, M, paso=False, nivel=0):
-        if len(M) == 1:
-            return M[0][0]
-        if len(M) == 2:
-            return M[0][0]*M[1][1] - M[0][1]*M[1][0]
-        det = 0
-        for c in range(len(M[0])):
-            minor = [fila[:c]+fila[c+1:] for fila in M[1:]]
-            cofactor = ((-1)**c) * M[0][c] * self.determinante(minor, paso, nivel+1)
+        medicion = self.historial.medir("determinante", {nombre_A: A})
+        encontrado, det = self.cache.buscar(nombre_A, "determinante")
+        if encontrado:
+            print("📌 Determinante ya calculado (caché).")
+        else:
+            version = self.cache.version(nombre_A)
+            paso = (A.filas <= matrix_core.LIMITE_PASO_A_PASO
+                    and input("¿Mostrar paso a paso? (S/N): ").strip().upper() == "S")
             if paso:
-                print(" "*nivel + f"Expandir con elemento {M[0][c]} en columna {c}: {cofactor}")
-            det += cofactor
-        return det
+                print("📌 Cálculo paso a paso del determinante:")
+            det = medicion.ejecutar(self.determinante, A, paso)
+            self.cache.guardar(nombre_A, "determinante", det, version)
+        self.historial.registrar(f"Determinante de '{nombre_A}' = {det}", medicion)
+        if isinstance(det, Fraction):
+            print(f"Determinante = {det} (≈ {float(det):.6g})")
+        else:
+            print(f"Determinante = {det}")
+
+    def determinante(self, M, paso=False):
+        return matrix_core.determinante(M, paso=paso)
 
     def op_adjunta(self):
-        A = self.seleccionar_matriz()
-        if not A or len(A) != len(A[0]):
+        nombre_A = self.seleccionar_nombre()
+        if not nombre_A or not self.matrices[nombre_A].es_cuadrada:
             print("⚠️ Solo se permite adjunta en matrices cuadradas.")
             return
-        adj = []
-        for i in range(len(A)):
-            fila = []
-            for j in range(len(A)):
-                minor = [row[:j] + row[j+1:] for k, row in enumerate(A) if k != i]
-                fila.append(((-1) ** (i+j)) * self.determinante(minor))
-            adj.append(fila)
-        R = [list(fila) for fila in zip(*adj)]
+        A = self.matrices[nombre_A]
+        medicion = self.historial.medir("adjunta", {nombre_A: A})
+        R = self.cache.obtener(nombre_A, "adjunta", lambda: medicion.ejecutar(self._operacion("adjunta"), A))
         nombre = input("Nombre de la adjunta: ").strip()
         self.matrices[nombre] = R
-        self.historial.append(f"Adjunta → {nombre}")
+        self.historial.registrar(f"Adjunta → {nombre}", medicion, R)
         print(f"✅ Adjunta guardada como '{nombre}'.")
 
     def op_inversa(self):
-        A = self.seleccionar_matriz()
-        if not A or len(A) != len(A[0]):
+        nombre_A = self.seleccionar_nombre()
+        if not nombre_A or not self.matrices[nombre_A].es_cuadrada:
             print("⚠️ Solo se permite inversa en matrices cuadradas.")
             return
-        det = self.determinante(A)
-        if det == 0:
-            print("⚠️ La matriz no tiene inversa.")
-            return
-        adj = []
-        for i in range(len(A)):
-            fila = []
-            for j in range(len(A)):
-                minor = [row[:j] + row[j+1:] for k, row in enumerate(A) if k != i]
-                fila.append(((-1) ** (i+j)) * self.determinante(minor))
-            adj.append(fila)
-        adj_T = [list(fila) for fila in zip(*adj)]
+        A = self.matrices[nombre_A]
+        medicion = self.historial.medir("inversa", {nombre_A: A})
+
+        def calcular():
+            inv, det = medicion.ejecutar(self._operacion("inversa_y_determinante"), A)
+            self.cache.guardar(nombre_A, "determinante", det)
+            return inv
+
         try:
-            R = [[adj_T[i][j]/det for j in range(len(A))] for i in range(len(A))]
-        except ZeroDivisionError:
-            print("⚠️ Error: división por cero en la inversa.")
+            R = self.cache.obtener(nombre_A, "inversa", calcular)
+        except ValueError:
+            print("⚠️ La matriz no tiene inversa.")
             return
         nombre = input("Nombre de la inversa: ").strip()
         self.matrices[nombre] = R
-        self.historial.append(f"Inversa → {nombre}")
+        self.historial.registrar(f"Inversa → {nombre}", medicion, R)
         print(f"✅ Inversa guardada como '{nombre}'.")
 
+    def op_resolver(self):
+        """Resuelve A·X = B. La factorización LU de A se guarda en caché para otros lados derechos B."""
+        if not self.matrices:
+            print("⚠️ No hay matrices.")
+            return
+        print("📌 Sistema A·X = B: la primera matriz es A (coeficientes) y la segunda B (términos independientes).")
+        nombre_A = self.seleccionar_nombre("primera")
+        nombre_B = self.seleccionar_nombre("segunda")
+        if not nombre_A or not nombre_B:
+            return
+        A, B = self.matrices[nombre_A], self.matrices[nombre_B]
+        medicion = self.historial.medir("resolver", {nombre_A: A, nombre_B: B})
+        try:
+            with medicion:
+                if A.es_cuadrada:
+                    lu = self.cache.obtener(nombre_A, "lu", lambda: matrix_core.factorizar(A))
+                    X = matrix_core.resolver(A, B, lu)
+                else:
+                    print("📌 A no es cuadrada: solución por mínimos cuadrados (QR).")
+                    X = matrix_core.resolver(A, B)
+        except ValueError as e:
+            print(f"⚠️ {e}")
+            return
+        nombre = input("Nombre de la solución: ").strip()
+        self.matrices[nombre] = X
+        self.historial.registrar(f"Sistema {nombre_A}·X = {nombre_B} → {nombre}", medicion, X)
+        print(f"✅ Solución ({X.filas}x{X.columnas}) guardada como '{nombre}'.")
+
     def op_escalar(self):
-        A = self.seleccionar_matriz()
-        if not A:
+        nombre_A = self.seleccionar_nombre()
+        if not nombre_A:
             return
+        A = self.matrices[nombre_A]
         while True:
             try:
-                esc = float(input("Ingrese el escalar: "))
+                esc = self._leer_numero(input("Ingrese el escalar: "))
                 if esc != esc or esc in (float("inf"), float("-inf")):
                     print("⚠️ Escalar inválido.")
                     continue
                 break
             except ValueError:
                 print("⚠️ Entrada inválida. Ingrese un número.")
-        R = [[A[i][j]*esc for j in range(len(A[0]))] for i in range(len(A))]
+        medicion = self.historial.medir("escalar", {nombre_A: A})
+        R = medicion.ejecutar(matrix_core.escalar, A, esc)
         nombre = input("Nombre de la matriz resultado: ").strip()
         self.matrices[nombre] = R
-        self.historial.append(f"Escalar ({esc}) → {nombre}")
+        self.historial.registrar(f"Escalar ({esc}) → {nombre}", medicion, R)
         print(f"✅ Escalar aplicado, guardado como '{nombre}'.")
 
+    # ======================= EXPRESIONES =======================
+    def op_expresion(self):
+        """
+        Evalúa una expresión sobre las matrices guardadas. Antes se optimiza (orden de los
+        productos, inv(A)·B como sistema, escalares) mostrando el coste estimado; las
+        operaciones elemento a elemento se calculan en una sola pasada y solo se guarda el resultado.
+        """
+        if not self.matrices:
+            print("⚠️ No hay matrices.")
+            return
+        print("📌 Operadores: + - * (producto o escalar) .* (Hadamard) ./ (división elemento a elemento)")
+        print("   / (por escalar) ' (transpuesta); funciones inv, adj, det, t. Ej.: inv(A) * (B + C)")
+        texto = input("Expresión: ").strip()
+        try:
+            expresion = matrix_expr.analizar(texto, self.matrices)
+            optimizada = matrix_expr.optimizar(expresion)
+            print(f"📌 Coste estimado: {matrix_expr.flops(expresion):,} → "
+                  f"{matrix_expr.flops(optimizada):,} multiplicaciones-suma")
+            if str(optimizada) != str(expresion):
+                print(f"   Se evalúa como: {optimizada}")
+            medicion = self.historial.medir("expresion", matrix_expr.hojas(expresion))
+            R = medicion.ejecutar(optimizada.evaluar, self._operacion)
+        except ValueError as e:
+            print(f"⚠️ {e}")
+            return
+        if not isinstance(R, matrix_core.Matrix) and not matrix_core.es_alternativa(R):
+            print(f"Resultado = {R}")
+            self.historial.registrar(f"Expresión {texto} = {R}", medicion)
+            return
+        nombre = input("Nombre de la matriz resultado: ").strip()
+        self.matrices[nombre] = R
+        self.historial.registrar(f"Expresión {texto} → {nombre}", medicion, R)
+        print(f"✅ Resultado ({R.filas}x{R.columnas}) guardado como '{nombre}'.")
+
+    # ======================= PILAS DE MATRICES =======================
+    def op_pila(self):
+        """
+        Aplica una operación a todas las matrices de un archivo (una pila de matrices de la
+        misma forma) en una sola llamada y guarda los resultados en otro archivo.
+        """
+        archivo = input(f"Archivo con la pila ({matrix_io.EXTENSION_PILA}, texto con matrices separadas "
+                        f"por líneas vacías o {matrix_io.EXTENSION_ESPACIO}): ").strip()
+        try:
+            P = matrix_io.cargar_pila(archivo)
+        except FileNotFoundError:
+            print("⚠️ Archivo no encontrado.")
+            return
+        except ValueError as e:
+            print(f"⚠️ {e}")
+            return
+        print(f"📌 Pila de {P.n} matrices {P.filas}x{P.columnas}.")
+        print(f"   Operaciones: {', '.join(matrix_stack.OPERACIONES)}")
+        tipo = input("Operación: ").strip()
+        if tipo not in matrix_stack.OPERACIONES:
+            print("⚠️ Operación desconocida.")
+            return
+        args = (P,)
+        if tipo in matrix_core.OPERACIONES_BINARIAS:
+            segundo = input("Segundo operando (matriz guardada, que se aplica a todas, o archivo de pila): ").strip()
+            try:
+                args = (P, self.matrices[segundo] if segundo in self.matrices else matrix_io.cargar_pila(segundo))
+            except FileNotFoundError:
+                print("⚠️ Archivo no encontrado.")
+                return
+            except ValueError as e:
+                print(f"⚠️ {e}")
+                return
+        elif tipo == "escalar":
+            try:
+                args = (P, float(input("Ingrese el escalar: ")))
+            except ValueError:
+                print("⚠️ Entrada inválida. Ingrese un número.")
+                return
+        medicion = self.historial.medir(f"pila_{tipo}", {archivo: P})
+        try:
+            R = medicion.ejecutar(matrix_stack.OPERACIONES[tipo], *args)
+        except ValueError as e:
+            print(f"⚠️ {e}")
+            return
+        if tipo == "determinante":
+            R = matrix_stack.PilaMatrices.desde_valores(R)
+        salida = input("Archivo para los resultados: ").strip()
+        try:
+            matrix_io.guardar_pila(R, salida)
+        except Exception as e:
+            print(f"⚠️ Error al guardar: {e}")
+            return
+        self.historial.registrar(f"Pila {tipo} ({P.n} matrices) → {salida}", medicion, R)
+        print(f"✅ {R.n} resultados ({R.filas}x{R.columnas}) guardados en {salida}.")
+
+    # ======================= PARALELISMO =======================
+    def configurar_paralelismo(self):
+        """Define cuántos procesos se usan para las operaciones pesadas (1 = cálculo serie)."""
+        actual = self.paralelo.trabajadores if self.paralelo else 1
+        print(f"Procesos actuales: {actual} (CPU disponibles: {os.cpu_count()})")
+        try:
+            trabajadores = int(input("Número de procesos (1 = sin paralelismo): "))
+        except ValueError:
+            print("⚠️ Entrada inválida. Debe ser un número entero.")
+            return
+        try:
+            self.establecer_procesos(trabajadores)
+        except ValueError as e:
+            print(f"⚠️ {e}")
+            return
+        print(f"✅ Operaciones pesadas con {trabajadores} proceso(s) "
+              f"(a partir de {matrix_parallel.UMBRAL_PARALELO}x{matrix_parallel.UMBRAL_PARALELO}).")
+
+    def establecer_procesos(self, trabajadores):
+        """Usa `trabajadores` procesos para las operaciones pesadas (1 = cálculo serie)."""
+        if trabajadores < 1:
+            raise ValueError("Debe usarse al menos 1 proceso.")
+        if self.paralelo:
+            self.paralelo.cerrar()
+        self.paralelo = matrix_parallel.EjecutorParalelo(trabajadores) if trabajadores > 1 else None
+        self.historial.procesos = trabajadores
+
+    def _operacion(self, nombre):
+        """Función de cálculo `nombre`: la del ejecutor paralelo si está activo, si no la de matrix_core."""
+        if self.paralelo is not None and hasattr(self.paralelo, nombre):
+            return getattr(self.paralelo, nombre)
+        return getattr(matrix_core, nombre)
+
+    # ======================= PERFILADO =======================
+    def configurar_perfilado(self):
+        """Define qué se mide en cada operación del historial: memoria y perfil de las operaciones lentas."""
+        h = self.historial
+        print(f"Perfil actual: {h.perfil or 'ninguno'} (operaciones de más de {h.umbral_perfil} s); "
+              f"memoria: {'sí' if h.memoria else 'no'}")
+        modo = input(f"Perfil ({', '.join(matrix_history.PERFILES)} o vacío = ninguno): ").strip().lower() or None
+        if modo is not None and modo not in matrix_history.PERFILES:
+            print("⚠️ Perfil desconocido.")
+            return
+        umbral = h.umbral_perfil
+        if modo:
+            try:
+                umbral = float(input(f"Umbral en segundos para guardar el perfil ({umbral}): ") or umbral)
+            except ValueError:
+                print("⚠️ Entrada inválida. Ingrese un número.")
+                return
+        h.perfil, h.umbral_perfil = modo, umbral
+        h.memoria = input("¿Medir la memoria de cada operación? (S/N, la ralentiza): ").strip().upper() == "S"
+        print(f"✅ Perfil: {modo or 'ninguno'}; memoria: {'sí' if h.memoria else 'no'}.")
+
+    # ======================= MODO EXACTO =======================
+    def configurar_modo_exacto(self):
+        """Activa o desactiva el modo exacto y convierte las matrices guardadas al nuevo formato."""
+        self.establecer_modo_exacto(not self.exacto)
+        if self.exacto:
+            print("✅ Modo exacto activado: las matrices usan fracciones y los resultados no tienen redondeo.")
+            print("   Los elementos pueden escribirse como fracciones (p. ej. 3/4); al guardar se exportan como float.")
+        else:
+            print("✅ Modo exacto desactivado: las matrices vuelven a coma flotante.")
+
+    def establecer_modo_exacto(self, activo):
+        if activo != self.exacto:
+            self.exacto = activo
+            # Reasignar cada matriz la convierte (e invalida sus resultados en caché)
+            self.matrices.update(dict(self.matrices))
+
+    def _formato(self, M):
+        """Formato en que se guarda cada matriz: exacta en modo exacto, densa o dispersa si no."""
+        if self.exacto:
+            return matrix_exact.como_exacta(M)
+        return matrix_sparse.formato_automatico(M)
+
+    def _leer_numero(self, texto):
+        """Número introducido por el usuario: fracción exacta (p. ej. 3/4) en modo exacto, float si no."""
+        return matrix_exact.racional(texto) if self.exacto else float(texto)
+
+    def mostrar_cache(self):
+        print(f"🗂️ Caché de resultados: {self.cache.describir()}")
+
     # ======================= AUXILIARES =======================
     def seleccionar_matriz(self, orden=""):
+        nombre = self.seleccionar_nombre(orden)
+        return self.matrices[nombre] if nombre else None
+
+    def seleccionar_nombre(self, orden=""):
+        """Pide el nombre de una matriz existente; devuelve None si no existe."""
         if not self.matrices:
             print("⚠️ No hay matrices.")
             return None
@@ -358,25 +624,26 @@ class MatrixCalculator:
         if nombre not in self.matrices:
             print("⚠️ No existe esa matriz.")
             return None
-        return self.matrices[nombre]
+        return nombre
 
     def mostrar_historial(self):
         if not self.historial:
             print("⚠️ No hay operaciones registradas.")
             return
         print("\n📜 Historial de operaciones:")
-        for op in self.historial:
-            print(" -", op)
+        for registro in self.historial:
+            print(" -", registro.resumen())
 
     def exportar_historial(self):
         if not self.historial:
             print("⚠️ No hay operaciones para exportar.")
             return
-        archivo = input("Nombre del archivo para exportar historial: ").strip()
+        archivo = input("Nombre del archivo para exportar historial (.jsonl registros, .txt texto): ").strip()
         try:
-            with open(archivo, "w") as f:
-                for op in self.historial:
-                    f.write(op + "\n")
+            if archivo.lower().endswith(".txt"):
+                self.historial.exportar_texto(archivo)
+            else:
+                self.historial.exportar_jsonl(archivo)
             print(f"✅ Historial exportado a {archivo}.")
         except Exception as e:
             print(f"⚠️ Error al exportar historial: {e}")
@@ -402,15 +669,27 @@ class MatrixCalculator:
             "16": ("Adjunta", self.op_adjunta),
             "17": ("Inversa", self.op_inversa),
             "18": ("Escalar", self.op_escalar),
+            "19": ("Paralelismo", self.configurar_paralelismo),
+            "20": ("Guardar espacio de trabajo", self.guardar_espacio),
+            "21": ("Abrir espacio de trabajo", self.abrir_espacio),
+            "22": ("Caché de resultados", self.mostrar_cache),
+            "23": ("Evaluar expresión", self.op_expresion),
+            "24": ("Resolver sistema A·X = B", self.op_resolver),
+            "25": ("Modo exacto (fracciones)", self.configurar_modo_exacto),
+            "26": ("Perfilado de operaciones", self.configurar_perfilado),
+            "27": ("Operación sobre una pila de matrices", self.op_pila),
             "0": ("Salir", None)
         }
 
+        print(f"⚙️ Backend de cálculo: {matrix_core.backend_activo()}")
         while True:
             print("\n===== CALCULADORA DE MATRICES =====")
             for k, (desc, _) in opciones.items():
                 print(f"{k}. {desc}")
             op = input("Seleccione una opción: ").strip()
             if op == "0":
+                if self.paralelo:
+                    self.paralelo.cerrar()
                 print("👋 Adiós.")
                 break
             elif op in opciones:
@@ -423,7 +702,9 @@ class MatrixCalculator:
 
 # ======================= MAIN =======================
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Con argumentos, modo por lotes: python calculadora_consola.py guion.txt [--json ...]
+        import matrix_script
+        sys.exit(matrix_script.main())
     calc = MatrixCalculator()
     calc.menu()
-
-
@@ -0,0 +1,244 @@
+"""
+Banco de pruebas de rendimiento de las operaciones de la calculadora.
+Recorre las operaciones con varios tamaños, formatos (densa, dispersa, exacta) y tipos de
+elementos (int, float) sobre un MatrixCalculator sin interfaz: cada caso se calcula con la
+misma función que usa el menú (MatrixCalculator._operacion, que respeta el paralelismo
+configurado), sin pasar por la caché de resultados. Para cada caso se mide:
+- segundos: el mejor y la mediana de varias muestras (las operaciones rápidas se repiten
+  dentro de cada muestra para que duren al menos TIEMPO_MUESTRA).
+- memoria_pico: bytes máximos asignados durante el cálculo (tracemalloc).
+- memoria_retenida y bloques: bytes y bloques que siguen asignados al terminar una llamada
+  (el resultado y lo que cachee la operación), por diferencia de instantáneas de tracemalloc.
+Los resultados se escriben en JSON y pueden compararse con una ejecución anterior (base):
+un caso empeora si su tiempo o su memoria superan los de la base en más del umbral.
+Uso:
+    python matrix_benchmark.py --salida base.json
+    python matrix_benchmark.py --base base.json --umbral 0.25   (código de salida 1 si empeora)
+Solo usa la biblioteca estándar; no necesita red ni interfaz gráfica.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import matrix_core
+import matrix_exact
+import matrix_expr
+import matrix_parallel
+import matrix_sparse
+from calculadora_consola import MatrixCalculator
+
+TAMANOS = (2, 5, 10, 20, 50, 100)
+FORMATOS = ("densa", "dispersa", "exacta")
+TIPOS = ("int", "float")
+# Proporción de no nulos fuera de la diagonal en las matrices del formato disperso
+DENSIDAD_DISPERSA = 0.05
+# Muestras por caso y duración mínima de cada muestra
+REPETICIONES = 5
+TIEMPO_MUESTRA = 0.01
+# Si un caso tarda más, no se prueban tamaños mayores de esa operación, formato y tipo
+LIMITE_SEGUNDOS = 10.0
+# Empeoramiento relativo que se considera regresión, y diferencias absolutas por debajo
+# de las cuales se ignora (ruido de medida)
+UMBRAL_REGRESION = 0.25
+TIEMPO_MINIMO = 1e-5
+MEMORIA_MINIMA = 4096
+VERSION_RESULTADOS = 1
+
+EXPRESION = "inv(A) * (A + B) .* B"
+
+OPERACIONES = {
+    "suma": lambda op, A, B: op("suma")(A, B),
+    "resta": lambda op, A, B: op("resta")(A, B),
+    "producto_matriz": lambda op, A, B: op("producto_matriz")(A, B),
+    "producto_hadamard": lambda op, A, B: op("producto_hadamard")(A, B),
+    "division_elemento": lambda op, A, B: op("division_elemento")(A, B),
+    "transpuesta": lambda op, A, B: op("transpuesta")(A),
+    "escalar": lambda op, A, B: op("escalar")(A, 2.5),
+    "determinante": lambda op, A, B: op("determinante")(A),
+    "inversa": lambda op, A, B: op("inversa_y_determinante")(A),
+    "adjunta": lambda op, A, B: op("adjunta")(A),
+    "resolver": lambda op, A, B: op("resolver")(A, B),
+    "expresion": lambda op, A, B: matrix_expr.optimizar(
+        matrix_expr.analizar(EXPRESION, {"A": A, "B": B})).evaluar(op),
+}
+
+
+def generar(n, formato, tipo, semilla):
+    """
+    Matriz n x n reproducible del formato y tipo pedidos. La diagonal domina (|a_ii| > suma
+    del resto de la fila), así que siempre es invertible y todas las operaciones tienen resultado.
+    """
+    rnd = random.Random(semilla)
+    densidad = DENSIDAD_DISPERSA if formato == "dispersa" else 1.0
+    valor = (lambda: rnd.randint(-9, 9)) if tipo == "int" else (lambda: rnd.uniform(-9, 9))
+    filas = [[valor() if i != j and rnd.random() < densidad else 0 for j in range(n)] for i in range(n)]
+    for i, fila in enumerate(filas):
+        fila[i] = 10 * n if tipo == "int" else 10.0 * n
+    if formato == "exacta":
+        return matrix_exact.como_exacta(filas)
+    M = matrix_core.Matrix.desde_listas(filas)
+    return matrix_sparse.MatrizDispersa.desde_densa(M) if formato == "dispersa" else M
+
+
+def medir(funcion, repeticiones=REPETICIONES):
+    """Mide funcion(): tiempos (mejor y mediana por llamada), pico de memoria y memoria retenida."""
+    inicio = time.perf_counter()
+    funcion()
+    primera = time.perf_counter() - inicio
+    llamadas = max(1, min(1000, int(TIEMPO_MUESTRA / primera))) if primera > 0 else 1000
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        tiempos.append((time.perf_counter() - inicio) / llamadas)
+
+    # Solo cuenta lo asignado durante la llamada, no las instantáneas
+    propias = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        resultado = funcion()
+        _, pico = tracemalloc.get_traced_memory()
+        diferencias = tracemalloc.take_snapshot().filter_traces(propias).compare_to(
+            antes.filter_traces(propias), "filename")
+    finally:
+        tracemalloc.stop()
+    del resultado
+    return {"segundos": min(tiempos), "segundos_mediana": statistics.median(tiempos),
+            "llamadas_por_muestra": llamadas, "memoria_pico": pico,
+            "memoria_retenida": sum(d.size_diff for d in diferencias),
+            "bloques": sum(d.count_diff for d in diferencias)}
+
+
+def ejecutar(operaciones=None, tamanos=TAMANOS, formatos=FORMATOS, tipos=TIPOS,
+             repeticiones=REPETICIONES, procesos=1, semilla=0, progreso=None):
+    """
+    Ejecuta el barrido y devuelve el documento de resultados (un dict serializable a JSON).
+    `progreso(resultado)` se llama tras cada caso. Un caso que lanza ValueError (p. ej.
+    división entre 0 en modo exacto) se registra con su mensaje en "error".
+    """
+    operaciones = list(operaciones or OPERACIONES)
+    calc = MatrixCalculator()
+    if procesos > 1:
+        calc.paralelo = matrix_parallel.EjecutorParalelo(procesos)
+    resultados = []
+    try:
+        for nombre in operaciones:
+            for formato in formatos:
+                for tipo in tipos:
+                    for n in sorted(tamanos):
+                        A = generar(n, formato, tipo, semilla)
+                        B = generar(n, formato, tipo, semilla + 1)
+                        caso = {"operacion": nombre, "n": n, "formato": formato, "tipo": tipo}
+                        try:
+                            caso.update(medir(lambda: OPERACIONES[nombre](calc._operacion, A, B), repeticiones))
+                        except ValueError as e:
+                            caso["error"] = str(e)
+                        resultados.append(caso)
+                        if progreso:
+                            progreso(caso)
+                        if caso.get("segundos", 0) > LIMITE_SEGUNDOS:
+                            break
+    finally:
+        if calc.paralelo:
+            calc.paralelo.cerrar()
+    return {
+        "version": VERSION_RESULTADOS,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "entorno": {"python": platform.python_version(), "plataforma": platform.platform(),
+                    "backend": matrix_core.backend_activo(), "procesos": procesos, "semilla": semilla},
+        "resultados": resultados,
+    }
+
+
+def _clave(caso):
+    return caso["operacion"], caso["n"], caso["formato"], caso["tipo"]
+
+
+def comparar(actual, base, umbral=UMBRAL_REGRESION):
+    """
+    Compara dos documentos de resultados caso a caso (solo los presentes en ambos).
+    Devuelve la lista de regresiones: dicts con el caso, la métrica, ambos valores y el cociente.
+    """
+    anteriores = {_clave(c): c for c in base["resultados"] if "error" not in c}
+    regresiones = []
+    for caso in actual["resultados"]:
+        anterior = anteriores.get(_clave(caso))
+        if anterior is None or "error" in caso:
+            continue
+        for metrica, minimo in (("segundos", TIEMPO_MINIMO), ("memoria_pico", MEMORIA_MINIMA)):
+            antes, ahora = anterior[metrica], caso[metrica]
+            if ahora > antes * (1 + umbral) and ahora - antes > minimo:
+                regresiones.append({"operacion": caso["operacion"], "n": caso["n"], "formato": caso["formato"],
+                                    "tipo": caso["tipo"], "metrica": metrica, "base": antes, "actual": ahora,
+                                    "cociente": ahora / antes if antes else float("inf")})
+    return regresiones
+
+
+def describir(caso):
+    texto = f"{caso['operacion']:<18} n={caso['n']:<4} {caso['formato']:<8} {caso['tipo']:<5}"
+    if "error" in caso:
+        return f"{texto} ⚠️ {caso['error']}"
+    return (f"{texto} {caso['segundos'] * 1000:10.3f} ms  pico {caso['memoria_pico'] / 1024:9.1f} KiB  "
+            f"retenida {caso['memoria_retenida'] / 1024:9.1f} KiB ({caso['bloques']} bloques)")
+
+
+def _lista(texto, tipo=str):
+    return [tipo(x) for x in texto.split(",") if x.strip()]
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento de la calculadora de matrices.")
+    parser.add_argument("--operaciones", type=_lista, default=list(OPERACIONES),
+                        help=f"separadas por comas (por defecto todas: {', '.join(OPERACIONES)})")
+    parser.add_argument("--tamanos", type=lambda t: _lista(t, int), default=list(TAMANOS))
+    parser.add_argument("--formatos", type=_lista, default=list(FORMATOS))
+    parser.add_argument("--tipos", type=_lista, default=list(TIPOS))
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--procesos", type=int, default=1, help="procesos para las operaciones pesadas")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto, la salida estándar)")
+    parser.add_argument("--base", help="resultados anteriores con los que comparar")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION,
+                        help="empeoramiento relativo que se considera regresión (0.25 = 25%%)")
+    args = parser.parse_args(argumentos)
+
+    for nombre, validos, pedidos in (("operación", OPERACIONES, args.operaciones),
+                                     ("formato", FORMATOS, args.formatos), ("tipo", TIPOS, args.tipos)):
+        desconocidos = [x for x in pedidos if x not in validos]
+        if desconocidos:
+            parser.error(f"valor desconocido de {nombre}: {', '.join(desconocidos)}")
+
+    resultado = ejecutar(args.operaciones, args.tamanos, args.formatos, args.tipos, args.repeticiones,
+                         args.procesos, args.semilla, progreso=lambda c: print(describir(c), file=sys.stderr))
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+        print(f"✅ Resultados guardados en {args.salida}.", file=sys.stderr)
+    else:
+        print(texto)
+
+    if args.base:
+        with open(args.base, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(resultado, base, args.umbral)
+        for r in regresiones:
+            print(f"⚠️ Regresión: {r['operacion']} n={r['n']} {r['formato']} {r['tipo']}: {r['metrica']} "
+                  f"{r['base']:.6g} → {r['actual']:.6g} (x{r['cociente']:.2f})", file=sys.stderr)
+        if regresiones:
+            return 1
+        print(f"✅ Sin regresiones respecto a {args.base} (umbral {args.umbral:.0%}).", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Caché de resultados derivados (determinante, inversa, adjunta, transpuesta, factorización
+LU) por matriz.
+- Las entradas se indexan por (nombre de la matriz, versión, operación). La versión de
+  un nombre aumenta cada vez que la matriz se modifica, se reemplaza o se elimina, y sus
+  entradas se descartan; un resultado calculado sobre una versión anterior (p. ej. una
+  tarea en segundo plano que termina tras una edición) ya no se guarda.
+- El tamaño total se limita en bytes; al superarlo se descartan las entradas usadas hace
+  más tiempo (LRU).
+- Los resultados se reutilizan entre operaciones: con det = 0 la inversa se descarta sin
+  calcularla, y con el determinante y la inversa (o la adjunta) se obtiene la otra en O(n²).
+- Al cambiar un único elemento, la inversa y el determinante cacheados se actualizan en
+  O(n²) (Sherman-Morrison) en vez de descartarse.
+Las matrices se guardan y se devuelven como copias, así que editar un resultado no
+altera la caché.
+"""
+
+import sys
+from array import array
+from collections import OrderedDict
+from fractions import Fraction
+
+import matrix_core
+
+# Límite por defecto del tamaño total de la caché
+LIMITE_BYTES = 64 * 1024 * 1024
+# Actualizaciones de rango uno seguidas antes de refactorizar (acotan el error acumulado)
+LIMITE_ACTUALIZACIONES = 32
+
+
+def tam_bytes(valor):
+    """Tamaño aproximado en memoria de un resultado cacheado."""
+    if isinstance(valor, matrix_core.Matrix):
+        return 8 * valor.filas * valor.columnas + 64
+    if matrix_core.es_dispersa(valor):
+        return 16 * valor.nnz + 8 * (valor.filas + 1) + 64
+    if hasattr(valor, "tam_bytes"):
+        return valor.tam_bytes()
+    if isinstance(valor, (matrix_core.FactorizacionLU, matrix_core.FactorizacionLUNumpy)):
+        # Listas de floats de Python (~32 bytes por elemento) o array de NumPy (8)
+        por_elemento = 32 if isinstance(valor, matrix_core.FactorizacionLU) else 8
+        return por_elemento * valor.n * valor.n + 64
+    return sys.getsizeof(valor)
+
+
+def _copiar(valor):
+    return valor.copia() if hasattr(valor, "copia") else valor
+
+
+class CacheDerivados:
+    """Caché LRU de resultados derivados por nombre de matriz y versión."""
+
+    def __init__(self, limite_bytes=LIMITE_BYTES):
+        self.limite_bytes = limite_bytes
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()  # (nombre, versión, operación) → (valor, bytes)
+        self._versiones = {}
+        self._actualizaciones = {}  # nombre → actualizaciones de rango uno desde la última factorización
+        self.incrementales = 0
+
+    def version(self, nombre):
+        return self._versiones.get(nombre, 0)
+
+    def invalidar(self, nombre):
+        """Marca la matriz `nombre` como modificada y descarta sus resultados."""
+        self._versiones[nombre] = self.version(nombre) + 1
+        self._actualizaciones.pop(nombre, None)
+        for clave in [c for c in self._entradas if c[0] == nombre]:
+            self.bytes -= self._entradas.pop(clave)[1]
+
+    def actualizar_elemento(self, nombre, i, j, delta):
+        """
+        Registra que se sumó `delta` al elemento (i, j) de la matriz `nombre`. Si la inversa
+        y el determinante están en caché se actualizan en O(n²) y se conservan (la adjunta se
+        deriva de ambos al pedirla); si no, o si la actualización no es segura, la matriz se invalida.
+        Devuelve True si la actualización fue incremental.
+        """
+        inv = self._conocido(nombre, "inversa")
+        det = self._conocido(nombre, "determinante")
+        cuenta = self._actualizaciones.get(nombre, 0) + 1
+        res = None
+        if inv is not None and det is not None and cuenta <= LIMITE_ACTUALIZACIONES:
+            try:
+                res = matrix_core.actualizar_elemento(inv, det, i, j, delta)
+            except OverflowError:
+                pass
+        self.invalidar(nombre)
+        if res is None:
+            return False
+        inv, det = res
+        self.guardar(nombre, "inversa", inv)
+        self.guardar(nombre, "determinante", det)
+        self._actualizaciones[nombre] = cuenta
+        self.incrementales += 1
+        return True
+
+    def limpiar(self):
+        for nombre in {c[0] for c in self._entradas}:
+            self.invalidar(nombre)
+
+    def buscar(self, nombre, operacion):
+        """
+        Devuelve (True, valor) si el resultado está en caché o puede derivarse de otros
+        resultados cacheados, y (False, None) si no. Un valor ValueError indica que la
+        operación no tiene solución (inversa de una matriz singular).
+        """
+        encontrado, valor = self._consultar(nombre, operacion)
+        if encontrado:
+            self.aciertos += 1
+        else:
+            self.fallos += 1
+        return encontrado, valor
+
+    def _consultar(self, nombre, operacion):
+        clave = (nombre, self.version(nombre), operacion)
+        if clave in self._entradas:
+            self._entradas.move_to_end(clave)
+            return True, _copiar(self._entradas[clave][0])
+        try:
+            return self._derivar(nombre, operacion)
+        except OverflowError:
+            return False, None
+
+    def guardar(self, nombre, operacion, valor, version=None):
+        """
+        Guarda un resultado. Si se indica `version` y la matriz ha cambiado desde entonces,
+        el resultado está obsoleto y se ignora. Los resultados mayores que el límite no se guardan.
+        """
+        actual = self.version(nombre)
+        if version is not None and version != actual:
+            return
+        tam = tam_bytes(valor)
+        if tam > self.limite_bytes:
+            return
+        clave = (nombre, actual, operacion)
+        if clave in self._entradas:
+            self.bytes -= self._entradas.pop(clave)[1]
+        self._entradas[clave] = (_copiar(valor), tam)
+        self.bytes += tam
+        while self.bytes > self.limite_bytes:
+            self.bytes -= self._entradas.popitem(last=False)[1][1]
+
+    def _conocido(self, nombre, operacion):
+        entrada = self._entradas.get((nombre, self.version(nombre), operacion))
+        return None if entrada is None else entrada[0]
+
+    def _derivar(self, nombre, operacion):
+        det = self._conocido(nombre, "determinante")
+        if operacion == "inversa" and det == 0:
+            return True, ValueError("La matriz no tiene inversa.")
+        if not det:
+            return False, None
+        R = None
+        if operacion == "adjunta":
+            inv = self._conocido(nombre, "inversa")
+            if inv is not None:
+                R = matrix_core.escalar(inv, det)
+        elif operacion == "inversa":
+            adj = self._conocido(nombre, "adjunta")
+            if adj is not None and matrix_core.es_exacta(adj):
+                R = matrix_core.escalar(adj, Fraction(1) / det)
+            elif adj is not None:
+                R = matrix_core.Matrix(adj.filas, adj.columnas, array("d", (x / det for x in adj.datos)))
+        if R is None:
+            return False, None
+        self.guardar(nombre, operacion, R)
+        return True, R
+
+    def obtener(self, nombre, operacion, calcular):
+        """
+        Devuelve el resultado de `operacion` sobre la matriz `nombre`, desde la caché si es
+        posible y llamando a calcular() en otro caso. Propaga ValueError de calcular().
+        """
+        encontrado, valor = self.buscar(nombre, operacion)
+        if encontrado:
+            if isinstance(valor, ValueError):
+                raise valor
+            return valor
+        version = self.version(nombre)
+        valor = calcular()
+        self.guardar(nombre, operacion, valor, version)
+        return valor
+
+    @property
+    def tasa_aciertos(self):
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
+
+    def estadisticas(self):
+        return {"entradas": len(self._entradas), "bytes": self.bytes, "limite_bytes": self.limite_bytes,
+                "aciertos": self.aciertos, "fallos": self.fallos, "tasa_aciertos": self.tasa_aciertos,
+                "incrementales": self.incrementales}
+
+    def describir(self):
+        e = self.estadisticas()
+        return (f"{e['entradas']} resultados, {e['bytes'] / 2**20:.1f} de {e['limite_bytes'] / 2**20:.0f} MiB; "
+                f"aciertos {e['aciertos']}, fallos {e['fallos']} ({e['tasa_aciertos']:.0%}); "
+                f"actualizaciones incrementales {e['incrementales']}")
+
+
+class AlmacenMatrices(dict):
+    """
+    Diccionario nombre → Matrix que invalida la caché al asignar, reemplazar o eliminar
+    una matriz. Las ediciones in situ (M[i, j] = x) deben invalidarse con cache.invalidar(nombre).
+    Si se indica `formato` (p. ej. matrix_sparse.formato_automatico), cada matriz asignada
+    se guarda como formato(matriz).
+    """
+
+    def __init__(self, cache, *args, formato=None, **kwargs):
+        self.cache = cache
+        self.formato = formato
+        super().__init__()
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, nombre, matriz):
+        if self.formato is not None:
+            matriz = self.formato(matriz)
+        super().__setitem__(nombre, matriz)
+        self.cache.invalidar(nombre)
+
+    def __delitem__(self, nombre):
+        super().__delitem__(nombre)
+        self.cache.invalidar(nombre)
+
+    def pop(self, nombre, *defecto):
+        if nombre in self:
+            self.cache.invalidar(nombre)
+        return super().pop(nombre, *defecto)
+
+    def update(self, *args, **kwargs):
+        for nombre, matriz in dict(*args, **kwargs).items():
+            self[nombre] = matriz
@@ -0,0 +1,1177 @@
+"""
+Núcleo de cálculo de matrices compartido por la calculadora de consola y la GUI.
+No depende de input() ni de tkinter: todas las funciones son puras, reciben matrices
+y devuelven resultados nuevos, y señalan los errores con ValueError.
+Contiene:
+- Matrix: matriz densa compacta sobre un buffer array('d') contiguo.
+- Modo matriz grande: generación aleatoria por tramos y estimación de memoria/tiempo.
+- Operaciones entre matrices: suma, resta, producto matricial, Hadamard y división elemento a elemento.
+- Operaciones sobre una matriz: transpuesta, multiplicación por escalar.
+- Determinante por eliminación LU con pivoteo parcial (matrices reales) en O(n³).
+- Determinante exacto por eliminación de Bareiss (matrices enteras) en O(n³).
+- Desarrollo por cofactores con traza paso a paso, solo para matrices pequeñas.
+- Backends intercambiables: Python puro (siempre) o NumPy vectorizado si está instalado.
+- Factorización LU reutilizable para resolver sistemas en O(n²) por lado derecho, y
+  mínimos cuadrados por QR (Householder) para sistemas no cuadrados.
+- Inversa por Gauss-Jordan con pivoteo parcial y adjunta derivada de ella (adj = det·A⁻¹),
+  con un cálculo exacto libre de fracciones para matrices enteras o singulares.
+"""
+
+import math
+import operator
+import os
+import random
+from array import array
+from fractions import Fraction
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usa el backend en Python puro
+    np = None
+
+# Tamaño máximo para el que se permite el desarrollo por cofactores paso a paso
+LIMITE_PASO_A_PASO = 6
+# Producto matricial en Python puro: tamaño a partir del cual se usa Strassen
+# y número de columnas de B que se procesan juntas en el producto por bloques
+UMBRAL_STRASSEN = 128
+TAM_BLOQUE = 64
+# Tamaño máximo sin confirmación (y para mostrar completa) y tamaño máximo en modo matriz grande
+LIMITE_NORMAL = 50
+LIMITE_GRANDE = 5000
+# Tamaño máximo para el cálculo exacto de matrices enteras (Bareiss); por encima se usa coma flotante
+LIMITE_EXACTO = 100
+# Elementos generados por tramo al crear matrices aleatorias
+TAM_TRAMO = 65536
+# Velocidades aproximadas para estimar costes: elementos aleatorios/s y multiplicaciones-suma/s
+VELOCIDAD_GENERACION = 3e6
+VELOCIDAD_FLOPS = {"python": 2e7, "numpy": 1e9}
+# Actualización de rango uno: |1 + δ·A⁻¹[j, i]| mínimo para considerarla estable
+TOLERANCIA_RANGO_UNO = 1e-8
+
+
+# ======================= TIPO MATRIZ =======================
+class Matrix:
+    """
+    Matriz densa compacta: los elementos se guardan en un único buffer contiguo
+    array('d') por filas (el elemento (i, j) está en datos[i*columnas + j]).
+    Ocupa 8 bytes por elemento frente a los ~32 de una lista de listas de floats.
+    `datos` también puede ser un memoryview de formato 'd' (p. ej. un archivo mapeado
+    con mmap); al copiar o serializar la matriz se convierte a array('d').
+    """
+
+    __slots__ = ("filas", "columnas", "datos")
+
+    def __init__(self, filas, columnas, datos=None):
+        if filas <= 0 or columnas <= 0:
+            raise ValueError("Filas y columnas deben ser mayores que 0.")
+        if datos is None:
+            datos = array("d", bytes(8 * filas * columnas))
+        elif isinstance(datos, memoryview):
+            if datos.format != "d":
+                raise ValueError("El buffer de datos debe ser de tipo 'd' (float64).")
+        elif not isinstance(datos, array):
+            datos = array("d", datos)
+        if len(datos) != filas * columnas:
+            raise ValueError(f"Se esperaban {filas * columnas} elementos y hay {len(datos)}.")
+        self.filas = filas
+        self.columnas = columnas
+        self.datos = datos
+
+    @classmethod
+    def desde_listas(cls, listas):
+        """Crea una matriz a partir de una lista de filas; todas deben tener la misma longitud."""
+        if not listas or not listas[0]:
+            raise ValueError("La matriz está vacía.")
+        columnas = len(listas[0])
+        datos = array("d")
+        for i, fila in enumerate(listas):
+            if len(fila) != columnas:
+                raise ValueError(f"La fila {i} tiene {len(fila)} elementos y se esperaban {columnas}.")
+            datos.extend(fila)
+        return cls(len(listas), columnas, datos)
+
+    @classmethod
+    def aleatoria(cls, filas, columnas, minimo, maximo, generador=random):
+        """
+        Matriz de enteros aleatorios en [minimo, maximo] generada por tramos directamente
+        en el buffer, sin construir listas por fila (apta para matrices grandes).
+        """
+        if minimo > maximo:
+            raise ValueError("El mínimo no puede ser mayor que el máximo.")
+        total = filas * columnas
+        valores = range(minimo, maximo + 1)
+        datos = array("d")
+        for inicio in range(0, total, TAM_TRAMO):
+            datos.extend(generador.choices(valores, k=min(TAM_TRAMO, total - inicio)))
+        return cls(filas, columnas, datos)
+
+    def a_listas(self):
+        """Devuelve la matriz como lista de filas (listas de floats)."""
+        return [self.datos[i:i + self.columnas].tolist() for i in range(0, len(self.datos), self.columnas)]
+
+    def fila(self, i):
+        """Copia de la fila i como array('d')."""
+        inicio = i * self.columnas
+        return self.datos[inicio:inicio + self.columnas]
+
+    def recorte(self, filas, columnas):
+        """Submatriz con las primeras `filas` x `columnas` (limitadas al tamaño real)."""
+        filas, columnas = min(filas, self.filas), min(columnas, self.columnas)
+        datos = array("d")
+        for i in range(filas):
+            inicio = i * self.columnas
+            datos.extend(self.datos[inicio:inicio + columnas])
+        return Matrix(filas, columnas, datos)
+
+    def copia(self):
+        return Matrix(self.filas, self.columnas, _copiar_buffer(self.datos))
+
+    def __reduce__(self):
+        datos = self.datos if isinstance(self.datos, array) else _copiar_buffer(self.datos)
+        return Matrix, (self.filas, self.columnas, datos)
+
+    @property
+    def forma(self):
+        return self.filas, self.columnas
+
+    @property
+    def es_cuadrada(self):
+        return self.filas == self.columnas
+
+    def __getitem__(self, posicion):
+        i, j = posicion
+        return self.datos[i * self.columnas + j]
+
+    def __setitem__(self, posicion, valor):
+        i, j = posicion
+        self.datos[i * self.columnas + j] = valor
+
+    def __iter__(self):
+        """Itera sobre las filas."""
+        for i in range(self.filas):
+            yield self.fila(i)
+
+    def __eq__(self, otra):
+        if not isinstance(otra, Matrix):
+            return NotImplemented
+        return self.forma == otra.forma and self.datos == otra.datos
+
+    def __repr__(self):
+        return f"Matrix({self.filas}x{self.columnas})"
+
+
+def _copiar_buffer(datos):
+    """Copia un array('d') o memoryview 'd' en un array('d') nuevo."""
+    copia = array("d")
+    copia.frombytes(memoryview(datos).cast("B"))
+    return copia
+
+
+def estimar_costo(filas, columnas):
+    """
+    Estimación aproximada del coste de trabajar con una matriz de filas x columnas:
+    memoria del buffer, tiempo de generación aleatoria y de una operación O(n³)
+    (producto, determinante, inversa) con el backend activo.
+    """
+    n = max(filas, columnas)
+    return {
+        "bytes": 8 * filas * columnas,
+        "segundos_generacion": filas * columnas / VELOCIDAD_GENERACION,
+        "segundos_cubica": n ** 3 / VELOCIDAD_FLOPS.get(backend_activo(), VELOCIDAD_FLOPS["python"]),
+    }
+
+
+def describir_costo(filas, columnas):
+    """Texto legible con la estimación de estimar_costo()."""
+    costo = estimar_costo(filas, columnas)
+    return (f"≈ {costo['bytes'] / 2**20:.1f} MB en memoria, "
+            f"generación ≈ {costo['segundos_generacion']:.2f} s, "
+            f"producto/determinante/inversa ≈ {costo['segundos_cubica']:.1f} s")
+
+
+def como_matriz(M):
+    """Devuelve M como Matrix (acepta también listas de filas, matrices dispersas y exactas)."""
+    if isinstance(M, Matrix):
+        return M
+    if es_alternativa(M):
+        return M.a_densa()
+    return Matrix.desde_listas(M)
+
+
+# ======================= OTROS FORMATOS DE MATRIZ =======================
+# Otros módulos registran aquí sus tipos de matriz al importarse (matrix_sparse: "dispersa",
+# matrix_exact: "exacta") con sus implementaciones de las operaciones. Las funciones de este
+# módulo las usan cuando algún operando es de ese tipo (el de mayor prioridad si hay varios);
+# el resto de operaciones convierte los operandos a Matrix con a_densa().
+_formatos = {}  # nombre → (tipo, operaciones, prioridad)
+
+
+def registrar_formato(nombre, tipo, operaciones, prioridad=0):
+    _formatos[nombre] = (tipo, operaciones, prioridad)
+
+
+def es_formato(M, nombre):
+    return nombre in _formatos and isinstance(M, _formatos[nombre][0])
+
+
+def es_alternativa(M):
+    """Indica si M es de alguno de los tipos registrados (y no Matrix)."""
+    return any(isinstance(M, tipo) for tipo, _, _ in _formatos.values())
+
+
+def es_dispersa(M):
+    return es_formato(M, "dispersa")
+
+
+def es_exacta(M):
+    return es_formato(M, "exacta")
+
+
+def _alternativa(nombre, *operandos):
+    """Implementación de la operación para el formato de mayor prioridad entre los operandos, o None."""
+    candidatas = [(prioridad, operaciones[nombre]) for tipo, operaciones, prioridad in _formatos.values()
+                  if nombre in operaciones and any(isinstance(M, tipo) for M in operandos)]
+    return max(candidatas, key=lambda c: c[0])[1] if candidatas else None
+
+
+# ======================= AUXILIARES =======================
+def _valores(M):
+    if isinstance(M, Matrix):
+        return M.datos
+    return (x for fila in M for x in fila)
+
+
+def es_entera(M):
+    """Indica si todos los elementos de M son enteros (int o float con valor entero)."""
+    for x in _valores(M):
+        if isinstance(x, int):
+            continue
+        if not float(x).is_integer():
+            return False
+    return True
+
+
+def _todos_int(M):
+    return all(isinstance(x, int) for x in _valores(M))
+
+
+def _mismas_dimensiones(A, B, operacion):
+    if A.forma != B.forma:
+        raise ValueError(f"Las dimensiones no coinciden para {operacion}.")
+
+
+def _pareja(A, B, operacion):
+    A, B = como_matriz(A), como_matriz(B)
+    _mismas_dimensiones(A, B, operacion)
+    return A, B
+
+
+# ======================= BACKENDS =======================
+class BackendPython:
+    """Backend de referencia en Python puro; siempre disponible."""
+
+    nombre = "python"
+
+    def __init__(self, umbral_strassen=None, tam_bloque=None):
+        self.umbral_strassen = umbral_strassen or UMBRAL_STRASSEN
+        self.tam_bloque = tam_bloque or TAM_BLOQUE
+
+    @staticmethod
+    def _elemento_a_elemento(A, B, funcion):
+        return Matrix(A.filas, A.columnas, array("d", map(funcion, A.datos, B.datos)))
+
+    def suma(self, A, B):
+        return self._elemento_a_elemento(A, B, operator.add)
+
+    def resta(self, A, B):
+        return self._elemento_a_elemento(A, B, operator.sub)
+
+    def producto_hadamard(self, A, B):
+        return self._elemento_a_elemento(A, B, operator.mul)
+
+    def division_elemento(self, A, B, por_cero):
+        return self._elemento_a_elemento(A, B, lambda a, b: a / b if b != 0 else por_cero)
+
+    def producto_matriz(self, A, B):
+        if min(A.filas, A.columnas, B.columnas) >= self.umbral_strassen:
+            return self._producto_strassen(A, B)
+        filas_A = [A.fila(i) for i in range(A.filas)]
+        columnas_B = [B.datos[j::B.columnas] for j in range(B.columnas)]
+        R = _producto_bloques(filas_A, columnas_B, self.tam_bloque)
+        datos = array("d")
+        for fila in R:
+            datos.extend(fila)
+        return Matrix(A.filas, B.columnas, datos)
+
+    def _producto_strassen(self, A, B):
+        """Strassen sobre matrices cuadradas rellenadas con ceros hasta el mismo tamaño par."""
+        n = max(A.filas, A.columnas, B.columnas)
+        n += n % 2
+        P = _rellenar(A.a_listas(), n)
+        Q = _rellenar(B.a_listas(), n)
+        R = _strassen(P, Q, self.umbral_strassen, self.tam_bloque)
+        datos = array("d")
+        for fila in R[:A.filas]:
+            datos.extend(fila[:B.columnas])
+        return Matrix(A.filas, B.columnas, datos)
+
+    def transpuesta(self, A):
+        datos = array("d")
+        for j in range(A.columnas):
+            datos.extend(A.datos[j::A.columnas])
+        return Matrix(A.columnas, A.filas, datos)
+
+    def escalar(self, A, k):
+        return Matrix(A.filas, A.columnas, array("d", [x * k for x in A.datos]))
+
+    def evaluar_fusion(self, codigo, matrices, constantes, forma):
+        parametros = ", ".join(matrices)
+        funcion = eval(f"lambda {parametros}: {codigo}", {"_div": _div_elemento, **constantes})
+        return Matrix(*forma, array("d", map(funcion, *(M.datos for M in matrices.values()))))
+
+    def determinante(self, A):
+        return determinante_lu(A.a_listas())
+
+    def inversa(self, A):
+        """Devuelve (inversa, determinante) o None si A es singular."""
+        res = _gauss_jordan(A.a_listas())
+        if res is None:
+            return None
+        return Matrix.desde_listas(res[0]), res[1]
+
+    def factorizar(self, A):
+        return FactorizacionLU(A)
+
+    def minimos_cuadrados(self, A, B):
+        m, n = A.forma
+        columnas_B = [B.datos[j::B.columnas].tolist() for j in range(B.columnas)]
+        if m >= n:
+            # A = Q·R: X = R⁻¹·(Qᵀ·B)[:n]
+            columnas = [A.datos[j::n].tolist() for j in range(n)]
+            reflexiones = _householder(columnas)
+            _comprobar_rango(columnas)
+            soluciones = []
+            for y in columnas_B:
+                for k, (v, vv) in enumerate(reflexiones):
+                    _reflejar(y, v, vv, k)
+                x = [0.0] * n
+                for i in range(n - 1, -1, -1):
+                    x[i] = (y[i] - sum(columnas[j][i] * x[j] for j in range(i + 1, n))) / columnas[i][i]
+                soluciones.append(x)
+        else:
+            # Solución de norma mínima: Aᵀ = Q·R, X = Q·(R⁻ᵀ·B)
+            columnas = [A.fila(i).tolist() for i in range(m)]
+            reflexiones = _householder(columnas)
+            _comprobar_rango(columnas)
+            soluciones = []
+            for b in columnas_B:
+                z = [0.0] * n
+                for i in range(m):
+                    z[i] = (b[i] - sum(columnas[i][k] * z[k] for k in range(i))) / columnas[i][i]
+                for k in range(m - 1, -1, -1):
+                    _reflejar(z, *reflexiones[k], k)
+                soluciones.append(z)
+        datos = array("d")
+        for i in range(n):
+            datos.extend([x[i] for x in soluciones])
+        return Matrix(n, B.columnas, datos)
+
+    def rango_uno(self, A, u, v, k):
+        """A - k·u·vᵀ."""
+        datos = array("d")
+        for r in range(A.filas):
+            c = k * u[r]
+            datos.extend([a - c * b for a, b in zip(A.fila(r), v)])
+        return Matrix(A.filas, A.columnas, datos)
+
+
+# ----------------------- QR de Householder en Python puro -----------------------
+def _householder(columnas):
+    """
+    QR por reflexiones de Householder de la matriz m×n (m >= n) dada por columnas, que
+    quedan con R en su parte superior. Devuelve las reflexiones (v, vᵀv) de cada paso.
+    """
+    reflexiones = []
+    for k in range(len(columnas)):
+        x = columnas[k][k:]
+        norma = math.sqrt(sum(t * t for t in x))
+        v = x[:]
+        v[0] += norma if x[0] >= 0 else -norma
+        vv = sum(t * t for t in v) or 1.0
+        reflexiones.append((v, vv))
+        for j in range(k, len(columnas)):
+            _reflejar(columnas[j], v, vv, k)
+    return reflexiones
+
+
+def _reflejar(y, v, vv, k):
+    """Aplica H = I - 2·v·vᵀ/(vᵀv) a y[k:], en el sitio."""
+    s = 2 * sum(map(operator.mul, v, y[k:])) / vv
+    y[k:] = [a - s * b for a, b in zip(y[k:], v)]
+
+
+def _comprobar_rango(columnas):
+    diagonal = [abs(c[k]) for k, c in enumerate(columnas)]
+    if min(diagonal) <= max(diagonal) * len(columnas[0]) * 2.2e-16:
+        raise ValueError("La matriz no tiene rango completo; la solución por mínimos cuadrados no es única.")
+
+
+# ----------------------- Núcleos de producto en Python puro -----------------------
+def _producto_bloques(filas_A, columnas_B, tam_bloque):
+    """
+    Producto con B ya transpuesta (columnas_B[j] es la columna j de B).
+    Se recorre por bloques de columnas de B para reutilizarlas en todas las filas de A;
+    cada elemento es un producto escalar sum(map(mul, ...)) sin generadores intermedios.
+    """
+    mul = operator.mul
+    R = [[] for _ in filas_A]
+    for inicio in range(0, len(columnas_B), tam_bloque):
+        bloque = columnas_B[inicio:inicio + tam_bloque]
+        for fila_R, fila in zip(R, filas_A):
+            fila_R.extend([sum(map(mul, fila, col)) for col in bloque])
+    return R
+
+
+def _rellenar(M, n):
+    """Copia de M (lista de filas) ampliada con ceros hasta n x n."""
+    R = [list(fila) + [0.0] * (n - len(fila)) for fila in M]
+    R.extend([0.0] * n for _ in range(n - len(M)))
+    return R
+
+
+def _sumar(A, B):
+    return [list(map(operator.add, fa, fb)) for fa, fb in zip(A, B)]
+
+
+def _restar(A, B):
+    return [list(map(operator.sub, fa, fb)) for fa, fb in zip(A, B)]
+
+
+def _strassen(A, B, umbral, tam_bloque):
+    """Multiplicación de Strassen para matrices n x n (listas de filas); 7 productos por nivel."""
+    n = len(A)
+    if n < umbral or n % 2:
+        return _producto_bloques(A, [list(col) for col in zip(*B)], tam_bloque)
+    h = n // 2
+    A11 = [f[:h] for f in A[:h]]; A12 = [f[h:] for f in A[:h]]
+    A21 = [f[:h] for f in A[h:]]; A22 = [f[h:] for f in A[h:]]
+    B11 = [f[:h] for f in B[:h]]; B12 = [f[h:] for f in B[:h]]
+    B21 = [f[:h] for f in B[h:]]; B22 = [f[h:] for f in B[h:]]
+
+    M1 = _strassen(_sumar(A11, A22), _sumar(B11, B22), umbral, tam_bloque)
+    M2 = _strassen(_sumar(A21, A22), B11, umbral, tam_bloque)
+    M3 = _strassen(A11, _restar(B12, B22), umbral, tam_bloque)
+    M4 = _strassen(A22, _restar(B21, B11), umbral, tam_bloque)
+    M5 = _strassen(_sumar(A11, A12), B22, umbral, tam_bloque)
+    M6 = _strassen(_restar(A21, A11), _sumar(B11, B12), umbral, tam_bloque)
+    M7 = _strassen(_restar(A12, A22), _sumar(B21, B22), umbral, tam_bloque)
+
+    C11 = _sumar(_restar(_sumar(M1, M4), M5), M7)
+    C12 = _sumar(M3, M5)
+    C21 = _sumar(M2, M4)
+    C22 = _sumar(_sumar(_restar(M1, M2), M3), M6)
+    return [f1 + f2 for f1, f2 in zip(C11, C12)] + [f1 + f2 for f1, f2 in zip(C21, C22)]
+
+
+class BackendNumpy:
+    """Backend vectorizado con NumPy (BLAS para el producto matricial)."""
+
+    nombre = "numpy"
+
+    @staticmethod
+    def _nd(A):
+        # Vista sin copia sobre el buffer array('d') de la matriz
+        return np.frombuffer(A.datos, dtype=np.float64).reshape(A.filas, A.columnas)
+
+    @staticmethod
+    def _matriz(R):
+        R = np.ascontiguousarray(R, dtype=np.float64)
+        return Matrix(R.shape[0], R.shape[1], array("d", R.tobytes()))
+
+    def suma(self, A, B):
+        return self._matriz(self._nd(A) + self._nd(B))
+
+    def resta(self, A, B):
+        return self._matriz(self._nd(A) - self._nd(B))
+
+    def producto_hadamard(self, A, B):
+        return self._matriz(self._nd(A) * self._nd(B))
+
+    def division_elemento(self, A, B, por_cero):
+        a, b = self._nd(A), self._nd(B)
+        return self._matriz(np.divide(a, b, out=np.full_like(a, por_cero), where=b != 0))
+
+    def producto_matriz(self, A, B):
+        return self._matriz(self._nd(A) @ self._nd(B))
+
+    def transpuesta(self, A):
+        return self._matriz(self._nd(A).T)
+
+    def escalar(self, A, k):
+        return self._matriz(self._nd(A) * k)
+
+    def evaluar_fusion(self, codigo, matrices, constantes, forma):
+        def dividir(a, b):
+            salida = np.full(np.broadcast(a, b).shape, np.inf)
+            return np.divide(a, b, out=salida, where=b != 0)
+        variables = {n: self._nd(M) for n, M in matrices.items()}
+        return self._matriz(eval(codigo, {"_div": dividir, **constantes}, variables))
+
+    def determinante(self, A):
+        return float(np.linalg.det(self._nd(A)))
+
+    def inversa(self, A):
+        """Devuelve (inversa, determinante) o None si A es singular."""
+        a = self._nd(A)
+        det = float(np.linalg.det(a))
+        if det == 0:
+            return None
+        try:
+            return self._matriz(np.linalg.inv(a)), det
+        except np.linalg.LinAlgError:
+            return None
+
+    def rango_uno(self, A, u, v, k):
+        return self._matriz(self._nd(A) - k * np.outer(u, v))
+
+    def factorizar(self, A):
+        return FactorizacionLUNumpy(self._nd(A))
+
+    def minimos_cuadrados(self, A, B):
+        a, b = self._nd(A), self._nd(B)
+        transpuesta = a.shape[0] < a.shape[1]
+        q, r = np.linalg.qr(a.T if transpuesta else a)
+        diagonal = np.abs(np.diag(r))
+        if diagonal.min() <= diagonal.max() * max(a.shape) * np.finfo(float).eps:
+            raise ValueError("La matriz no tiene rango completo; la solución por mínimos cuadrados no es única.")
+        if transpuesta:
+            return self._matriz(q @ np.linalg.solve(r.T, b))
+        return self._matriz(np.linalg.solve(r, q.T @ b))
+
+
+class FactorizacionLUNumpy:
+    """FactorizacionLU sobre arrays de NumPy: misma interfaz, eliminación vectorizada por filas."""
+
+    __slots__ = ("n", "lu", "permutacion", "signo")
+
+    def __init__(self, a):
+        lu = np.array(a, dtype=np.float64)
+        n = lu.shape[0]
+        permutacion = np.arange(n)
+        signo = 1
+        for k in range(n):
+            p = k + int(np.argmax(np.abs(lu[k:, k])))
+            if lu[p, k] == 0:
+                raise ValueError("La matriz es singular.")
+            if p != k:
+                lu[[k, p]] = lu[[p, k]]
+                permutacion[[k, p]] = permutacion[[p, k]]
+                signo = -signo
+            lu[k + 1:, k] /= lu[k, k]
+            lu[k + 1:, k + 1:] -= np.outer(lu[k + 1:, k], lu[k, k + 1:])
+        self.n = n
+        self.lu = lu
+        self.permutacion = permutacion
+        self.signo = signo
+
+    def determinante(self):
+        return float(self.signo * np.prod(np.diag(self.lu)))
+
+    def _sustituir(self, y):
+        lu = self.lu
+        for i in range(1, self.n):
+            y[i] -= lu[i, :i] @ y[:i]
+        for i in range(self.n - 1, -1, -1):
+            y[i] = (y[i] - lu[i, i + 1:] @ y[i + 1:]) / lu[i, i]
+        return y
+
+    def resolver(self, b):
+        return self._sustituir(np.asarray(b, dtype=np.float64)[self.permutacion]).tolist()
+
+    def resolver_matriz(self, B):
+        B = _lado_derecho(self.n, B)
+        return BackendNumpy._matriz(self._sustituir(BackendNumpy._nd(B)[self.permutacion]))
+
+
+BACKENDS = {"python": BackendPython}
+if np is not None:
+    BACKENDS["numpy"] = BackendNumpy
+
+
+def seleccionar_backend(nombre=None):
+    """
+    Activa el backend `nombre` ("python" o "numpy"). Sin nombre se usa la variable de
+    entorno CALCULADORA_BACKEND o, en su defecto, NumPy si está instalado.
+    """
+    global _backend
+    if nombre is None:
+        nombre = os.environ.get("CALCULADORA_BACKEND") or ("numpy" if np is not None else "python")
+    if nombre not in BACKENDS:
+        raise ValueError(f"Backend no disponible: {nombre}. Disponibles: {', '.join(BACKENDS)}")
+    _backend = BACKENDS[nombre]()
+    return _backend.nombre
+
+
+def backend_activo():
+    """Nombre del backend con el que se están ejecutando las operaciones."""
+    return _backend.nombre
+
+
+_backend = BackendPython()
+
+
+# ======================= OPERACIONES BINARIAS =======================
+def suma(A, B):
+    alternativa = _alternativa("suma", A, B)
+    if alternativa:
+        return alternativa(A, B)
+    return _backend.suma(*_pareja(A, B, "la suma"))
+
+
+def resta(A, B):
+    alternativa = _alternativa("resta", A, B)
+    if alternativa:
+        return alternativa(A, B)
+    return _backend.resta(*_pareja(A, B, "la resta"))
+
+
+def producto_matriz(A, B):
+    alternativa = _alternativa("producto_matriz", A, B)
+    if alternativa:
+        return alternativa(A, B)
+    A, B = como_matriz(A), como_matriz(B)
+    if A.columnas != B.filas:
+        raise ValueError("Columnas de A ≠ Filas de B.")
+    return _backend.producto_matriz(A, B)
+
+
+def producto_hadamard(A, B):
+    alternativa = _alternativa("producto_hadamard", A, B)
+    if alternativa:
+        return alternativa(A, B)
+    return _backend.producto_hadamard(*_pareja(A, B, "Hadamard"))
+
+
+def division_elemento(A, B, por_cero=float("inf")):
+    """División elemento a elemento; las divisiones entre 0 valen `por_cero`."""
+    alternativa = _alternativa("division_elemento", A, B)
+    if alternativa:
+        return alternativa(A, B, por_cero)
+    A, B = _pareja(A, B, "división")
+    return _backend.division_elemento(A, B, por_cero)
+
+
+def _div_elemento(a, b):
+    return a / b if b != 0 else float("inf")
+
+
+def evaluar_fusion(codigo, variables, forma):
+    """
+    Evalúa en una sola pasada la expresión elemento a elemento `codigo` (generada por
+    matrix_expr) sobre `variables`: matrices (m0, m1...) y escalares (k0, k1...) por nombre.
+    _div(a, b) es la división elemento a elemento (∞ donde b = 0, como division_elemento).
+    """
+    matrices = {n: v for n, v in variables.items() if isinstance(v, Matrix)}
+    constantes = {n: v for n, v in variables.items() if not isinstance(v, Matrix)}
+    return _backend.evaluar_fusion(codigo, matrices, constantes, forma)
+
+
+OPERACIONES_BINARIAS = {
+    "suma": suma,
+    "resta": resta,
+    "producto_matriz": producto_matriz,
+    "producto_hadamard": producto_hadamard,
+    "division_elemento": division_elemento,
+}
+
+
+# ======================= OPERACIONES SOBRE UNA MATRIZ =======================
+def transpuesta(A):
+    alternativa = _alternativa("transpuesta", A)
+    if alternativa:
+        return alternativa(A)
+    return _backend.transpuesta(como_matriz(A))
+
+
+def escalar(A, k):
+    alternativa = _alternativa("escalar", A)
+    if alternativa:
+        return alternativa(A, k)
+    return _backend.escalar(como_matriz(A), k)
+
+
+# ======================= DETERMINANTE =======================
+def determinante(M, paso=False, salida=print):
+    """
+    Calcula el determinante de la matriz cuadrada M.
+    - Si todos los elementos son enteros (y n <= LIMITE_EXACTO) usa Bareiss y el resultado es exacto.
+    - En otro caso usa LU con pivoteo parcial.
+    Con paso=True y n <= LIMITE_PASO_A_PASO muestra el desarrollo por cofactores
+    mediante la función `salida`.
+    """
+    alternativa = _alternativa("determinante", M)
+    if alternativa:
+        return alternativa(M, paso, salida)
+    todos_int = _todos_int(M)
+    A = como_matriz(M)
+    if not A.es_cuadrada:
+        raise ValueError("El determinante solo está definido para matrices cuadradas.")
+    n = A.filas
+    M = [list(fila) for fila in M] if todos_int else A.a_listas()
+
+    if paso:
+        if n <= LIMITE_PASO_A_PASO:
+            return determinante_cofactores(M, paso=True, salida=salida)
+        salida(f"(Paso a paso disponible solo hasta {LIMITE_PASO_A_PASO}x{LIMITE_PASO_A_PASO}; "
+               f"se usa eliminación directa)")
+
+    if n <= LIMITE_EXACTO and es_entera(M):
+        det = determinante_bareiss([[int(x) for x in fila] for fila in M])
+        if todos_int:
+            return det
+        try:
+            return float(det)
+        except OverflowError:
+            return det
+    return _backend.determinante(A)
+
+
+def determinante_lu(M):
+    """Determinante por eliminación gaussiana con pivoteo parcial. O(n³)."""
+    n = len(M)
+    A = [[float(x) for x in fila] for fila in M]
+    det = 1.0
+    for k in range(n):
+        p = max(range(k, n), key=lambda i: abs(A[i][k]))
+        if A[p][k] == 0:
+            return 0.0
+        if p != k:
+            A[k], A[p] = A[p], A[k]
+            det = -det
+        fila_k = A[k]
+        pivote = fila_k[k]
+        det *= pivote
+        for i in range(k + 1, n):
+            fila_i = A[i]
+            factor = fila_i[k] / pivote
+            if factor:
+                for j in range(k + 1, n):
+                    fila_i[j] -= factor * fila_k[j]
+    return det
+
+
+def determinante_bareiss(M):
+    """
+    Determinante exacto de una matriz de enteros por el algoritmo de Bareiss.
+    Todas las divisiones son exactas, así que los valores intermedios se mantienen acotados.
+    """
+    n = len(M)
+    A = [list(fila) for fila in M]
+    signo = 1
+    previo = 1
+    for k in range(n - 1):
+        if A[k][k] == 0:
+            for i in range(k + 1, n):
+                if A[i][k] != 0:
+                    A[k], A[i] = A[i], A[k]
+                    signo = -signo
+                    break
+            else:
+                return 0
+        fila_k = A[k]
+        pivote = fila_k[k]
+        for i in range(k + 1, n):
+            fila_i = A[i]
+            a_ik = fila_i[k]
+            for j in range(k + 1, n):
+                fila_i[j] = (fila_i[j] * pivote - a_ik * fila_k[j]) // previo
+        previo = pivote
+    return signo * A[n - 1][n - 1]
+
+
+def determinante_cofactores(M, paso=False, nivel=0, salida=print):
+    """Desarrollo por cofactores a lo largo de la fila 0. O(n!): solo para matrices pequeñas."""
+    if len(M) == 1:
+        return M[0][0]
+    if len(M) == 2:
+        return M[0][0]*M[1][1] - M[0][1]*M[1][0]
+    det = 0
+    for c in range(len(M[0])):
+        minor = [fila[:c]+fila[c+1:] for fila in M[1:]]
+        cofactor = ((-1)**c) * M[0][c] * determinante_cofactores(minor, paso, nivel+1, salida)
+        if paso:
+            salida(" "*nivel + f"Expandir con elemento {M[0][c]} en columna {c}: {cofactor}")
+        det += cofactor
+    return det
+
+
+# ======================= FACTORIZACIÓN LU =======================
+class FactorizacionLU:
+    """
+    Factorización P·A = L·U con pivoteo parcial (O(n³)), guardada de forma compacta:
+    `lu` contiene U en el triángulo superior y los multiplicadores de L (diagonal 1)
+    debajo; `permutacion[i]` es la fila de A que ocupa la posición i.
+    Una vez calculada, cada sistema A·x = b se resuelve en O(n²).
+    Lanza ValueError si la matriz es singular.
+    """
+
+    __slots__ = ("n", "lu", "permutacion", "signo")
+
+    def __init__(self, M):
+        M = _cuadrada(M)
+        n = M.filas
+        lu = M.a_listas()
+        permutacion = list(range(n))
+        signo = 1
+        for k in range(n):
+            p = max(range(k, n), key=lambda i: abs(lu[i][k]))
+            if lu[p][k] == 0:
+                raise ValueError("La matriz es singular.")
+            if p != k:
+                lu[k], lu[p] = lu[p], lu[k]
+                permutacion[k], permutacion[p] = permutacion[p], permutacion[k]
+                signo = -signo
+            fila_k = lu[k]
+            pivote = fila_k[k]
+            cola_k = fila_k[k + 1:]
+            for i in range(k + 1, n):
+                fila_i = lu[i]
+                factor = fila_i[k] / pivote
+                fila_i[k] = factor
+                if factor:
+                    fila_i[k + 1:] = [a - factor * b for a, b in zip(fila_i[k + 1:], cola_k)]
+        self.n = n
+        self.lu = lu
+        self.permutacion = permutacion
+        self.signo = signo
+
+    def determinante(self):
+        det = float(self.signo)
+        for i, fila in enumerate(self.lu):
+            det *= fila[i]
+        return det
+
+    def resolver(self, b):
+        """Resuelve A·x = b para un vector b (secuencia de n números)."""
+        mul = operator.mul
+        lu = self.lu
+        y = [float(b[p]) for p in self.permutacion]
+        for i in range(1, self.n):
+            y[i] -= sum(map(mul, lu[i][:i], y[:i]))
+        x = [0.0] * self.n
+        for i in range(self.n - 1, -1, -1):
+            fila = lu[i]
+            x[i] = (y[i] - sum(map(mul, fila[i + 1:], x[i + 1:]))) / fila[i]
+        return x
+
+    def resolver_matriz(self, B):
+        """Resuelve A·X = B para todas las columnas de B con esta misma factorización."""
+        B = _lado_derecho(self.n, B)
+        soluciones = [self.resolver(B.datos[j::B.columnas]) for j in range(B.columnas)]
+        datos = array("d")
+        for i in range(self.n):
+            datos.extend([x[i] for x in soluciones])
+        return Matrix(self.n, B.columnas, datos)
+
+    def columna_inversa(self, j):
+        """Columna j de A⁻¹ (solución de A·x = e_j)."""
+        e = [0.0] * self.n
+        e[j] = 1.0
+        return self.resolver(e)
+
+
+def _lado_derecho(n, B):
+    B = como_matriz(B)
+    if B.filas != n:
+        raise ValueError("Filas de A ≠ Filas de B.")
+    return B
+
+
+# ======================= SISTEMAS LINEALES =======================
+def factorizar(A):
+    """
+    Factorización LU con pivoteo parcial de la matriz cuadrada A (≈ n³/3), reutilizable:
+    su método resolver_matriz(B) resuelve A·X = B en O(n²) por columna de B.
+    Lanza ValueError si A es singular.
+    """
+    alternativa = _alternativa("factorizar", A)
+    if alternativa:
+        return alternativa(A)
+    return _backend.factorizar(_cuadrada(A))
+
+
+def resolver(A, B, factorizacion=None):
+    """
+    Resuelve A·X = B sin calcular A⁻¹.
+    - A cuadrada: factorización LU (la indicada en `factorizacion`, o una nueva) y sustitución.
+    - A no cuadrada: mínimos cuadrados por QR (ver minimos_cuadrados).
+    Lanza ValueError si A es singular o las dimensiones no encajan.
+    """
+    alternativa = _alternativa("resolver", A, B)
+    if alternativa:
+        return alternativa(A, B, factorizacion)
+    A, B = como_matriz(A), como_matriz(B)
+    if A.filas != B.filas:
+        raise ValueError("Filas de A ≠ Filas de B.")
+    if not A.es_cuadrada:
+        return minimos_cuadrados(A, B)
+    return (factorizacion or factorizar(A)).resolver_matriz(B)
+
+
+def minimos_cuadrados(A, B):
+    """
+    Solución de A·X ≈ B por QR de Householder (sin formar AᵀA):
+    - Más ecuaciones que incógnitas: X minimiza ‖A·X - B‖.
+    - Menos ecuaciones que incógnitas: la solución exacta de norma mínima.
+    Lanza ValueError si A no tiene rango completo.
+    """
+    A, B = como_matriz(A), como_matriz(B)
+    if A.filas != B.filas:
+        raise ValueError("Filas de A ≠ Filas de B.")
+    return _backend.minimos_cuadrados(A, B)
+
+
+# ======================= INVERSA Y ADJUNTA =======================
+def inversa(M):
+    """
+    Calcula la inversa de la matriz cuadrada M en O(n³).
+    - Matrices enteras hasta LIMITE_EXACTO: adjunta y determinante exactos, una sola división final.
+    - Resto: Gauss-Jordan con pivoteo parcial.
+    Lanza ValueError si la matriz no es cuadrada o no tiene inversa.
+    """
+    return inversa_y_determinante(M)[0]
+
+
+def inversa_y_determinante(M):
+    """
+    Como inversa(M), pero devuelve (A⁻¹, det) aprovechando que ambos salen de la misma
+    eliminación. El determinante se devuelve como en determinante(M).
+    """
+    alternativa = _alternativa("inversa_y_determinante", M)
+    if alternativa:
+        return alternativa(M)
+    todos_int = _todos_int(M)
+    M = _cuadrada(M)
+    if M.filas <= LIMITE_EXACTO and es_entera(M):
+        res = _gauss_jordan_sin_fracciones([[int(x) for x in fila] for fila in M])
+        if res is None:
+            raise ValueError("La matriz no tiene inversa.")
+        adj, det = res
+        inv = Matrix.desde_listas([[x / det for x in fila] for fila in adj])
+        if todos_int:
+            return inv, det
+        try:
+            return inv, float(det)
+        except OverflowError:
+            return inv, det
+
+    res = _backend.inversa(M)
+    if res is None:
+        raise ValueError("La matriz no tiene inversa.")
+    return res
+
+
+def actualizar_elemento(inv, det, i, j, delta):
+    """
+    Actualiza A⁻¹ y det(A) en O(n²) cuando se suma `delta` al elemento (i, j) de A
+    (A' = A + delta·e_i·e_jᵀ):
+    - det(A') = det(A)·(1 + delta·A⁻¹[j, i])                           (lema del determinante)
+    - A'⁻¹ = A⁻¹ - delta·(A⁻¹e_i)(e_jᵀA⁻¹) / (1 + delta·A⁻¹[j, i])    (Sherman-Morrison)
+    Un determinante exacto (int) sigue siendo exacto si delta es entero.
+    Devuelve (A'⁻¹, det') o None si la actualización no es numéricamente segura
+    (A' singular o casi singular); en ese caso hay que refactorizar A'.
+    """
+    alternativa = _alternativa("actualizar_elemento", inv)
+    if alternativa:
+        return alternativa(inv, det, i, j, delta)
+    n = inv.filas
+    denominador = 1 + delta * inv[j, i]
+    if abs(denominador) < TOLERANCIA_RANGO_UNO:
+        return None
+    nuevo_det = det * denominador
+    if isinstance(det, int) and float(delta).is_integer():
+        # det' = det + delta·C_ij, con el cofactor C_ij = det·A⁻¹[j, i] entero
+        cofactor = det * inv[j, i]
+        if abs(cofactor) < 2 ** 52 and abs(cofactor - round(cofactor)) < 1e-6:
+            nuevo_det = det + int(delta) * round(cofactor)
+    columna = inv.datos[i::n]
+    nueva = _backend.rango_uno(inv, columna, inv.fila(j), delta / denominador)
+    return nueva, nuevo_det
+
+
+def adjunta(M):
+    """
+    Calcula la matriz adjunta (transpuesta de la matriz de cofactores) de M en O(n³).
+    - Matrices enteras hasta LIMITE_EXACTO: Gauss-Jordan libre de fracciones (resultado exacto).
+    - Matrices reales invertibles: adj = det·A⁻¹ a partir de una única factorización.
+    - Matrices singulares: cálculo exacto con fracciones a partir de los núcleos de A y Aᵀ.
+    """
+    alternativa = _alternativa("adjunta", M)
+    if alternativa:
+        return alternativa(M)
+    M = _cuadrada(M)
+    if M.filas <= LIMITE_EXACTO and es_entera(M):
+        A = [[int(x) for x in fila] for fila in M]
+        res = _gauss_jordan_sin_fracciones(A)
+        if res is None:
+            adj = _adjunta_singular(A)
+        else:
+            adj = res[0]
+        return Matrix.desde_listas([[float(x) for x in fila] for fila in adj])
+
+    res = _backend.inversa(M)
+    if res is None:
+        adj = _adjunta_singular([[Fraction(x) for x in fila] for fila in M])
+        return Matrix.desde_listas([[float(x) for x in fila] for fila in adj])
+    inv, det = res
+    return escalar(inv, det)
+
+
+def _cuadrada(M):
+    """Devuelve M como Matrix si es cuadrada; lanza ValueError en otro caso."""
+    M = como_matriz(M)
+    if not M.es_cuadrada:
+        raise ValueError("La operación solo está definida para matrices cuadradas.")
+    return M
+
+
+def _gauss_jordan(M):
+    """
+    Gauss-Jordan con pivoteo parcial sobre [M | I].
+    Devuelve (inversa, determinante) o None si M es singular.
+    """
+    n = len(M)
+    A = [[float(x) for x in fila] + [1.0 if i == j else 0.0 for j in range(n)]
+         for i, fila in enumerate(M)]
+    ancho = 2 * n
+    det = 1.0
+    for k in range(n):
+        p = max(range(k, n), key=lambda i: abs(A[i][k]))
+        if A[p][k] == 0:
+            return None
+        if p != k:
+            A[k], A[p] = A[p], A[k]
+            det = -det
+        fila_k = A[k]
+        pivote = fila_k[k]
+        det *= pivote
+        for j in range(k, ancho):
+            fila_k[j] /= pivote
+        for i in range(n):
+            if i == k:
+                continue
+            fila_i = A[i]
+            factor = fila_i[k]
+            if factor:
+                for j in range(k, ancho):
+                    fila_i[j] -= factor * fila_k[j]
+    return [fila[n:] for fila in A], det
+
+
+def _gauss_jordan_sin_fracciones(M):
+    """
+    Gauss-Jordan libre de fracciones (Bareiss) sobre [M | I] con elementos exactos.
+    Al terminar la parte izquierda vale p·I y la derecha p·M⁻¹, con p = ±det(M);
+    por tanto adj(M) = signo·(parte derecha). Todas las divisiones son exactas.
+    Devuelve (adjunta, determinante) o None si M es singular.
+    """
+    n = len(M)
+    A = [list(fila) + [1 if i == j else 0 for j in range(n)] for i, fila in enumerate(M)]
+    ancho = 2 * n
+    signo = 1
+    previo = 1
+    for k in range(n):
+        if A[k][k] == 0:
+            for i in range(k + 1, n):
+                if A[i][k] != 0:
+                    A[k], A[i] = A[i], A[k]
+                    signo = -signo
+                    break
+            else:
+                return None
+        fila_k = A[k]
+        pivote = fila_k[k]
+        for i in range(n):
+            if i == k:
+                continue
+            fila_i = A[i]
+            a_ik = fila_i[k]
+            for j in range(ancho):
+                if j != k:
+                    fila_i[j] = (fila_i[j] * pivote - a_ik * fila_k[j]) // previo
+            fila_i[k] = 0
+        previo = pivote
+    adj = [[signo * x for x in fila[n:]] for fila in A]
+    return adj, signo * previo
+
+
+def _rref(M):
+    """Forma escalonada reducida exacta. Devuelve (R, columnas_pivote)."""
+    R = [[Fraction(x) for x in fila] for fila in M]
+    filas, columnas = len(R), len(R[0])
+    pivotes = []
+    r = 0
+    for c in range(columnas):
+        p = next((i for i in range(r, filas) if R[i][c] != 0), None)
+        if p is None:
+            continue
+        R[r], R[p] = R[p], R[r]
+        pivote = R[r][c]
+        R[r] = [x / pivote for x in R[r]]
+        for i in range(filas):
+            if i != r and R[i][c] != 0:
+                factor = R[i][c]
+                R[i] = [a - factor * b for a, b in zip(R[i], R[r])]
+        pivotes.append(c)
+        r += 1
+        if r == filas:
+            break
+    return R, pivotes
+
+
+def _vector_nucleo(M):
+    """Vector no nulo del núcleo de M, suponiendo rango n-1."""
+    R, pivotes = _rref(M)
+    n = len(M[0])
+    libre = next(c for c in range(n) if c not in pivotes)
+    x = [Fraction(0)] * n
+    x[libre] = Fraction(1)
+    for r, c in enumerate(pivotes):
+        x[c] = -R[r][libre]
+    return x
+
+
+def _adjunta_singular(M):
+    """
+    Adjunta exacta de una matriz singular.
+    - Rango <= n-2: la adjunta es nula.
+    - Rango n-1: adj(M) = α·x·yᵀ con M·x = 0 y Mᵀ·y = 0; α se obtiene de un único cofactor.
+    """
+    n = len(M)
+    if n == 1:
+        return [[1]]
+    _, pivotes = _rref(M)
+    if len(pivotes) < n - 1:
+        return [[0] * n for _ in range(n)]
+
+    x = _vector_nucleo(M)
+    y = _vector_nucleo([list(col) for col in zip(*M)])
+    i = next(k for k in range(n) if x[k] != 0)
+    j = next(k for k in range(n) if y[k] != 0)
+    # adj[i][j] = (-1)^(i+j) · det(M sin fila j y sin columna i)
+    minor = [fila[:i] + fila[i+1:] for k, fila in enumerate(M) if k != j]
+    cofactor = (-1) ** (i + j) * _det_exacto(minor)
+    alfa = Fraction(cofactor) / (x[i] * y[j])
+    return [[alfa * a * b for b in y] for a in x]
+
+
+def _det_exacto(M):
+    """Determinante exacto para elementos enteros o Fraction."""
+    if all(isinstance(v, int) for fila in M for v in fila):
+        return determinante_bareiss(M)
+    denominador = math.lcm(*(Fraction(v).denominator for fila in M for v in fila))
+    A = [[int(Fraction(v) * denominador) for v in fila] for fila in M]
+    return Fraction(determinante_bareiss(A), denominador ** len(M))
+
+
+seleccionar_backend()
@@ -0,0 +1,324 @@
+"""
+Modo exacto: matrices de números racionales (int o Fraction), sin errores de redondeo.
+- MatrizExacta: filas como listas de int/Fraction, con la misma interfaz de acceso que Matrix.
+  Los float se convierten por su representación decimal (0.1 → 1/10), no por su valor binario.
+- Cada fila se escala a enteros (por el mínimo común múltiplo de sus denominadores) y se
+  trabaja con aritmética entera: determinante por Bareiss, inversa y adjunta por Gauss-Jordan
+  libre de fracciones, producto como producto entero. Todas las divisiones intermedias son
+  exactas, así que los números intermedios no superan el tamaño de los menores de la matriz,
+  en vez de crecer sin control como al operar con Fraction en cada paso.
+- a_densa() convierte a Matrix (float) para exportar o para las operaciones numéricas.
+Al importarse, el módulo se registra en matrix_core con prioridad sobre los demás formatos:
+una operación con algún operando exacto da un resultado exacto.
+"""
+
+import math
+import sys
+from array import array
+from fractions import Fraction
+from itertools import chain
+
+import matrix_core
+
+
+def racional(x):
+    """Convierte x (int, Fraction, float o texto como "3/4" o "0.1") a int o Fraction."""
+    if isinstance(x, int):
+        return x
+    if isinstance(x, str):
+        x = Fraction(x.strip())
+    elif not isinstance(x, Fraction):
+        x = float(x)
+        if not math.isfinite(x):
+            raise ValueError(f"Valor no finito: {x}.")
+        if x.is_integer():
+            return int(x)
+        x = Fraction(repr(x))
+    return x.numerator if x.denominator == 1 else x
+
+
+def _cociente(numerador, denominador):
+    """numerador / denominador como int si es exacto, o como Fraction."""
+    q = Fraction(numerador, denominador)
+    return q.numerator if q.denominator == 1 else q
+
+
+def formatear(x, ancho=0):
+    """Texto de un elemento para mostrarlo: los float con 2 decimales, los racionales exactos."""
+    if isinstance(x, float):
+        return f"{x:{ancho}.2f}"
+    return str(x).rjust(ancho)
+
+
+class MatrizExacta:
+    """Matriz de racionales exactos guardada por filas (listas de int o Fraction)."""
+
+    __slots__ = ("filas", "columnas", "datos")
+
+    def __init__(self, datos):
+        if not datos or not datos[0]:
+            raise ValueError("Filas y columnas deben ser mayores que 0.")
+        columnas = len(datos[0])
+        if any(len(fila) != columnas for fila in datos):
+            raise ValueError("Todas las filas deben tener el mismo número de columnas.")
+        self.filas = len(datos)
+        self.columnas = columnas
+        self.datos = datos
+
+    @property
+    def forma(self):
+        return self.filas, self.columnas
+
+    @property
+    def es_cuadrada(self):
+        return self.filas == self.columnas
+
+    def __getitem__(self, posicion):
+        i, j = posicion
+        return self.datos[i][j]
+
+    def __setitem__(self, posicion, valor):
+        i, j = posicion
+        self.datos[i][j] = racional(valor)
+
+    def fila(self, i):
+        return list(self.datos[i])
+
+    def __iter__(self):
+        for fila in self.datos:
+            yield list(fila)
+
+    def a_listas(self):
+        return [list(fila) for fila in self.datos]
+
+    def a_densa(self):
+        """Conversión a Matrix (float64), redondeando cada elemento al float más cercano."""
+        return matrix_core.Matrix(self.filas, self.columnas, array("d", map(float, chain(*self.datos))))
+
+    def recorte(self, filas, columnas):
+        return MatrizExacta([fila[:columnas] for fila in self.datos[:filas]])
+
+    def copia(self):
+        return MatrizExacta(self.a_listas())
+
+    def tam_bytes(self):
+        """Tamaño aproximado en memoria: los enteros exactos crecen con su número de dígitos."""
+        return sum(_tam_racional(x) for fila in self.datos for x in fila) + 8 * self.filas * self.columnas
+
+    def __eq__(self, otra):
+        if isinstance(otra, MatrizExacta):
+            return self.datos == otra.datos
+        if isinstance(otra, matrix_core.Matrix) or matrix_core.es_alternativa(otra):
+            return self.forma == otra.forma and self.datos == otra.a_listas()
+        return NotImplemented
+
+    def __repr__(self):
+        return f"MatrizExacta({self.filas}x{self.columnas})"
+
+
+def _tam_racional(x):
+    if isinstance(x, Fraction):
+        return sys.getsizeof(x) + sys.getsizeof(x.numerator) + sys.getsizeof(x.denominator)
+    return sys.getsizeof(x)
+
+
+def como_exacta(M):
+    """Devuelve M como MatrizExacta (acepta Matrix, matrices dispersas y listas de filas)."""
+    if isinstance(M, MatrizExacta):
+        return M
+    return MatrizExacta([[racional(x) for x in fila] for fila in M])
+
+
+def _enteras(M):
+    """
+    Escala cada fila de M a enteros. Devuelve (filas_enteras, escalas), con
+    M[i][j] = filas_enteras[i][j] / escalas[i].
+    """
+    filas, escalas = [], []
+    for fila in M.datos:
+        d = math.lcm(*(x.denominator for x in fila))
+        filas.append([x.numerator * (d // x.denominator) for x in fila])
+        escalas.append(d)
+    return filas, escalas
+
+
+def _cuadrada(M):
+    M = como_exacta(M)
+    if not M.es_cuadrada:
+        raise ValueError("La operación solo está definida para matrices cuadradas.")
+    return M
+
+
+# ======================= OPERACIONES ELEMENTO A ELEMENTO =======================
+def _elemento_a_elemento(A, B, op, operacion):
+    A, B = como_exacta(A), como_exacta(B)
+    matrix_core._mismas_dimensiones(A, B, operacion)
+    return MatrizExacta([[op(a, b) for a, b in zip(fa, fb)] for fa, fb in zip(A.datos, B.datos)])
+
+
+def suma(A, B):
+    return _elemento_a_elemento(A, B, lambda a, b: a + b, "la suma")
+
+
+def resta(A, B):
+    return _elemento_a_elemento(A, B, lambda a, b: a - b, "la resta")
+
+
+def producto_hadamard(A, B):
+    return _elemento_a_elemento(A, B, lambda a, b: a * b, "Hadamard")
+
+
+def division_elemento(A, B, por_cero=float("inf")):
+    """División exacta elemento a elemento; las divisiones entre 0 valen `por_cero` si es finito."""
+    if math.isfinite(por_cero):
+        por_cero = racional(por_cero)
+    else:
+        por_cero = None
+
+    def dividir(a, b):
+        if b != 0:
+            return _cociente(a, b)
+        if por_cero is None:
+            raise ValueError("División por cero: no tiene resultado exacto.")
+        return por_cero
+    return _elemento_a_elemento(A, B, dividir, "división")
+
+
+def transpuesta(A):
+    return MatrizExacta([list(columna) for columna in zip(*como_exacta(A).datos)])
+
+
+def escalar(A, k):
+    k = racional(k)
+    return MatrizExacta([[x * k for x in fila] for fila in como_exacta(A).datos])
+
+
+def producto_matriz(A, B):
+    """
+    Producto exacto como producto de enteros: con A = Dₐ⁻¹·Aₑ (filas escaladas) y
+    B = Bₑ / d (un denominador común), A·B = Dₐ⁻¹·(Aₑ·Bₑ) / d.
+    """
+    A, B = como_exacta(A), como_exacta(B)
+    if A.columnas != B.filas:
+        raise ValueError("Columnas de A ≠ Filas de B.")
+    filas_A, escalas = _enteras(A)
+    d = math.lcm(*(x.denominator for fila in B.datos for x in fila))
+    columnas_B = [[x.numerator * (d // x.denominator) for x in columna] for columna in zip(*B.datos)]
+    return MatrizExacta([[_cociente(sum(map(int.__mul__, fila, columna)), e * d) for columna in columnas_B]
+                         for fila, e in zip(filas_A, escalas)])
+
+
+# ======================= DETERMINANTE, INVERSA Y ADJUNTA =======================
+def determinante(M, paso=False, salida=print):
+    """Determinante exacto por Bareiss: det(M) = det(Mₑ) / ∏ escalas."""
+    M = _cuadrada(M)
+    filas, escalas = _enteras(M)
+    if paso and M.filas <= matrix_core.LIMITE_PASO_A_PASO:
+        return racional(matrix_core.determinante_cofactores(M.a_listas(), paso=True, salida=salida))
+    return _cociente(matrix_core.determinante_bareiss(filas), math.prod(escalas))
+
+
+def inversa_y_determinante(M):
+    """
+    (M⁻¹, det M) exactos con un único Gauss-Jordan libre de fracciones sobre Mₑ:
+    M = D⁻¹·Mₑ, así que M⁻¹ = adj(Mₑ)·D / det(Mₑ). Lanza ValueError si M es singular.
+    """
+    M = _cuadrada(M)
+    filas, escalas = _enteras(M)
+    res = matrix_core._gauss_jordan_sin_fracciones(filas)
+    if res is None:
+        raise ValueError("La matriz no tiene inversa.")
+    adj, det = res
+    inv = MatrizExacta([[_cociente(x * e, det) for x, e in zip(fila, escalas)] for fila in adj])
+    return inv, _cociente(det, math.prod(escalas))
+
+
+def inversa(M):
+    return inversa_y_determinante(M)[0]
+
+
+def adjunta(M):
+    """adj(M) = det(M)·M⁻¹ = adj(Mₑ)·D / ∏ escalas; si M es singular, por los núcleos de M y Mᵀ."""
+    M = _cuadrada(M)
+    filas, escalas = _enteras(M)
+    res = matrix_core._gauss_jordan_sin_fracciones(filas)
+    if res is None:
+        return como_exacta(matrix_core._adjunta_singular([[Fraction(x) for x in fila] for fila in M.datos]))
+    producto = math.prod(escalas)
+    return MatrizExacta([[_cociente(x * e, producto) for x, e in zip(fila, escalas)] for fila in res[0]])
+
+
+def actualizar_elemento(inv, det, i, j, delta):
+    """Sherman-Morrison exacto en O(n²) (ver matrix_core.actualizar_elemento); None si A' es singular."""
+    delta = racional(delta)
+    denominador = 1 + delta * inv[j, i]
+    if denominador == 0:
+        return None
+    factor = delta / denominador
+    columna = [fila[i] for fila in inv.datos]
+    fila_j = inv.datos[j]
+    nueva = MatrizExacta([[x - c * factor * y for x, y in zip(fila, fila_j)] if c else list(fila)
+                          for fila, c in zip(inv.datos, columna)])
+    return nueva, racional(det * denominador)
+
+
+# ======================= SISTEMAS LINEALES =======================
+class FactorizacionExacta:
+    """Inversa exacta de A, reutilizable para resolver A·X = B con distintos B en O(n²) por columna."""
+
+    __slots__ = ("inversa",)
+
+    def __init__(self, A):
+        self.inversa = inversa(A)
+
+    def resolver_matriz(self, B):
+        return producto_matriz(self.inversa, B)
+
+    def tam_bytes(self):
+        return self.inversa.tam_bytes()
+
+
+def factorizar(A):
+    return FactorizacionExacta(A)
+
+
+def resolver(A, B, factorizacion=None):
+    """
+    Resuelve A·X = B de forma exacta.
+    - A cuadrada: X = A⁻¹·B (con la factorización indicada o una nueva).
+    - A no cuadrada: ecuaciones normales exactas, X = (AᵀA)⁻¹AᵀB con más ecuaciones que
+      incógnitas y X = Aᵀ(AAᵀ)⁻¹B (norma mínima) con menos. Sin redondeo, formar AᵀA no
+      pierde precisión.
+    Lanza ValueError si A es singular o no tiene rango completo.
+    """
+    A, B = como_exacta(A), como_exacta(B)
+    if A.filas != B.filas:
+        raise ValueError("Filas de A ≠ Filas de B.")
+    if A.es_cuadrada:
+        return (factorizacion or factorizar(A)).resolver_matriz(B)
+    At = transpuesta(A)
+    try:
+        if A.filas > A.columnas:
+            return producto_matriz(inversa(producto_matriz(At, A)), producto_matriz(At, B))
+        return producto_matriz(At, producto_matriz(inversa(producto_matriz(A, At)), B))
+    except ValueError:
+        raise ValueError("A no tiene rango completo.") from None
+
+
+OPERACIONES = {
+    "suma": suma,
+    "resta": resta,
+    "producto_hadamard": producto_hadamard,
+    "division_elemento": division_elemento,
+    "producto_matriz": producto_matriz,
+    "transpuesta": transpuesta,
+    "escalar": escalar,
+    "determinante": determinante,
+    "inversa_y_determinante": inversa_y_determinante,
+    "adjunta": adjunta,
+    "actualizar_elemento": actualizar_elemento,
+    "factorizar": factorizar,
+    "resolver": resolver,
+}
+
+matrix_core.registrar_formato("exacta", MatrizExacta, OPERACIONES, prioridad=1)
@@ -0,0 +1,511 @@
+"""
+Expresiones matriciales perezosas con fusión de operaciones elemento a elemento.
+Una expresión se construye como un árbol sin calcular nada:
+- En Python: Matriz(A) + Matriz(B), X - Y, X * Y (Hadamard, o escalar si un lado es un
+  número), X / k, X @ Y (producto matricial), -X, X.T, inv(X), adj(X), det(X).
+- Desde texto con analizar("inv(A) * (B + C)", matrices): '*' es el producto matricial
+  (o por escalar), '.*' o '∘' el producto de Hadamard, './' la división elemento a elemento,
+  '/' la división por un escalar y X' la transpuesta; funciones inv, adj, det y t.
+Al evaluar, cada subárbol de operaciones elemento a elemento (suma, resta, Hadamard,
+división, escalar) se fusiona en una única función que recorre los operandos una sola
+vez, sin matrices intermedias; solo se materializan los operandos que no son elemento a
+elemento (productos, inversas, ...) y el resultado final. Las matrices dispersas y exactas
+no se fusionan: sus operaciones se calculan una a una con sus propias implementaciones.
+optimizar() reescribe la expresión antes de evaluarla (orden de los productos, inv(A)·B
+como sistema lineal, transpuestas dobles y escalares) y flops() estima su coste.
+"""
+
+import operator
+import re
+from fractions import Fraction
+
+import matrix_core
+
+
+class Expresion:
+    """Nodo de una expresión. `forma` es (filas, columnas), o None si el valor es un escalar."""
+
+    forma = None
+
+    @property
+    def es_escalar(self):
+        return self.forma is None
+
+    def __add__(self, otra):
+        return ElementoAElemento("+", self, _expresion(otra))
+
+    def __sub__(self, otra):
+        return ElementoAElemento("-", self, _expresion(otra))
+
+    def __mul__(self, otra):
+        return ElementoAElemento("*", self, _expresion(otra))
+
+    def __rmul__(self, otra):
+        return ElementoAElemento("*", _expresion(otra), self)
+
+    def __truediv__(self, otra):
+        return ElementoAElemento("/", self, _expresion(otra))
+
+    def __matmul__(self, otra):
+        return Producto(self, _expresion(otra))
+
+    def __neg__(self):
+        return ElementoAElemento("*", self, Escalar(-1.0))
+
+    @property
+    def T(self):
+        return Funcion("transpuesta", self)
+
+    def evaluar(self, operacion=None):
+        """
+        Calcula la expresión y devuelve una matriz (o un número si es escalar).
+        `operacion(nombre)` devuelve la función de cálculo a usar (por defecto la de matrix_core).
+        """
+        return self._evaluar(operacion or (lambda nombre: getattr(matrix_core, nombre)))
+
+
+class Matriz(Expresion):
+    """Hoja: una matriz ya existente."""
+
+    def __init__(self, matriz, nombre=None):
+        self.matriz = matriz if matrix_core.es_alternativa(matriz) else matrix_core.como_matriz(matriz)
+        self.nombre = nombre
+        self.forma = self.matriz.forma
+
+    def _evaluar(self, operacion):
+        return self.matriz
+
+    def __str__(self):
+        return self.nombre or repr(self.matriz)
+
+
+class Escalar(Expresion):
+    def __init__(self, valor):
+        self.valor = float(valor)
+
+    def _evaluar(self, operacion):
+        return self.valor
+
+    def __str__(self):
+        return repr(self.valor)
+
+
+class ElementoAElemento(Expresion):
+    """Suma, resta, producto o división elemento a elemento (o por un escalar)."""
+
+    NOMBRES = {"+": "la suma", "-": "la resta", "*": "el producto de Hadamard", "/": "la división"}
+
+    def __init__(self, op, izq, der):
+        if izq.es_escalar and der.es_escalar:
+            forma = None
+        elif izq.es_escalar or der.es_escalar:
+            if op in "+-":
+                raise ValueError(f"No se puede aplicar {self.NOMBRES[op]} entre un escalar y una matriz.")
+            if op == "/" and der.forma is not None:
+                raise ValueError("No se puede dividir un escalar entre una matriz.")
+            forma = izq.forma or der.forma
+        elif izq.forma != der.forma:
+            raise ValueError(f"Las dimensiones no coinciden para {self.NOMBRES[op]}.")
+        else:
+            forma = izq.forma
+        if op == "/" and isinstance(der, Escalar) and der.valor == 0:
+            raise ValueError("División por cero.")
+        self.op, self.izq, self.der, self.forma = op, izq, der, forma
+
+    def _evaluar(self, operacion):
+        if self.es_escalar:
+            izq, der = self.izq._evaluar(operacion), self.der._evaluar(operacion)
+            if self.op == "/" and der == 0:
+                raise ValueError("División por cero.")
+            return _OPERADORES[self.op](izq, der)
+        if _sin_fusion(self):
+            return self._por_pasos(operacion)
+        operandos = []
+        codigo = self._codigo(operacion, operandos)
+        variables = {("m" if isinstance(v, matrix_core.Matrix) else "k") + str(n): v
+                     for n, v in enumerate(operandos)}
+        return matrix_core.evaluar_fusion(codigo, variables, self.forma)
+
+    def _por_pasos(self, operacion):
+        """Evaluación operación a operación, para operandos dispersos o exactos."""
+        izq, der = self.izq._evaluar(operacion), self.der._evaluar(operacion)
+        if not (self.izq.es_escalar or self.der.es_escalar):
+            return operacion(_POR_PASOS[self.op])(izq, der)
+        k, X = (izq, der) if self.izq.es_escalar else (der, izq)
+        if self.op == "/":
+            if k == 0:
+                raise ValueError("División por cero.")
+            # 1/k exacto para que una matriz exacta siga siéndolo (k = 3 → 1/3, no 0.333...)
+            k = 1 / (Fraction(repr(k)) if isinstance(k, float) else Fraction(k))
+        return operacion("escalar")(X, k)
+
+    def _codigo(self, operacion, operandos):
+        """
+        Código Python de la fusión: los operandos ya materializados se referencian como
+        m0, m1... (matrices) o k0, k1... (escalares, calculados una sola vez) y se añaden
+        a `operandos`.
+        """
+        partes = []
+        for hijo in (self.izq, self.der):
+            if hijo.es_escalar:
+                valor = hijo._evaluar(operacion)
+                if self.op == "/" and hijo is self.der and valor == 0:
+                    raise ValueError("División por cero.")
+                partes.append(f"k{_indice(operandos, valor)}")
+            elif isinstance(hijo, ElementoAElemento):
+                partes.append(f"({hijo._codigo(operacion, operandos)})")
+            else:
+                partes.append(f"m{_indice(operandos, hijo._evaluar(operacion))}")
+        izq, der = partes
+        if self.op == "/" and not self.der.es_escalar:
+            return f"_div({izq}, {der})"
+        return f"{izq} {self.op} {der}"
+
+    def __str__(self):
+        simbolo = self.op
+        if not (self.izq.es_escalar or self.der.es_escalar):
+            simbolo = {"*": "∘", "/": "./"}.get(self.op, self.op)
+        return f"({self.izq} {simbolo} {self.der})"
+
+
+class Producto(Expresion):
+    def __init__(self, izq, der):
+        if izq.es_escalar or der.es_escalar:
+            raise ValueError("El producto matricial necesita dos matrices; use '*' con escalares.")
+        if izq.forma[1] != der.forma[0]:
+            raise ValueError("Columnas de A ≠ Filas de B.")
+        self.izq, self.der = izq, der
+        self.forma = (izq.forma[0], der.forma[1])
+
+    def _evaluar(self, operacion):
+        return operacion("producto_matriz")(self.izq._evaluar(operacion), self.der._evaluar(operacion))
+
+    def __str__(self):
+        return f"({self.izq} · {self.der})"
+
+
+class Funcion(Expresion):
+    """inversa, adjunta, transpuesta o determinante de una subexpresión."""
+
+    SIMBOLOS = {"inversa": "inv", "adjunta": "adj", "transpuesta": "t", "determinante": "det"}
+
+    def __init__(self, nombre, hijo):
+        if hijo.es_escalar:
+            raise ValueError(f"{self.SIMBOLOS[nombre]}() necesita una matriz.")
+        filas, columnas = hijo.forma
+        if nombre != "transpuesta" and filas != columnas:
+            raise ValueError(f"{self.SIMBOLOS[nombre]}() solo está definida para matrices cuadradas.")
+        self.nombre, self.hijo = nombre, hijo
+        self.forma = {"transpuesta": (columnas, filas), "determinante": None}.get(nombre, hijo.forma)
+
+    def _evaluar(self, operacion):
+        return operacion(self.nombre)(self.hijo._evaluar(operacion))
+
+    def __str__(self):
+        return f"{self.SIMBOLOS[self.nombre]}({self.hijo})"
+
+
+def inv(X):
+    return Funcion("inversa", _expresion(X))
+
+
+def adj(X):
+    return Funcion("adjunta", _expresion(X))
+
+
+def det(X):
+    return Funcion("determinante", _expresion(X))
+
+
+def hojas(expr):
+    """Matrices de las hojas con nombre de expr (nombre → matriz)."""
+    if isinstance(expr, Matriz):
+        return {expr.nombre: expr.matriz} if expr.nombre else {}
+    encontradas = {}
+    for hijo in vars(expr).values():
+        if isinstance(hijo, Expresion):
+            encontradas.update(hojas(hijo))
+    return encontradas
+
+
+def _expresion(valor):
+    if isinstance(valor, Expresion):
+        return valor
+    if isinstance(valor, (int, float)):
+        return Escalar(valor)
+    return Matriz(valor)
+
+
+def _indice(operandos, valor):
+    for n, v in enumerate(operandos):
+        if v is valor:
+            return n
+    operandos.append(valor)
+    return len(operandos) - 1
+
+
+_OPERADORES = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv}
+_POR_PASOS = {"+": "suma", "-": "resta", "*": "producto_hadamard", "/": "division_elemento"}
+
+
+def _sin_fusion(expr):
+    """Indica si alguna hoja de expr es una matriz dispersa o exacta, que no se fusionan."""
+    if isinstance(expr, Matriz):
+        return matrix_core.es_alternativa(expr.matriz)
+    return any(_sin_fusion(hijo) for hijo in vars(expr).values() if isinstance(hijo, Expresion))
+
+
+class Resolver(Expresion):
+    """A⁻¹·B calculado como la solución de A·X = B, sin invertir A (lo genera optimizar())."""
+
+    def __init__(self, A, B):
+        self.A, self.B = A, B
+        self.forma = B.forma
+
+    def _evaluar(self, operacion):
+        return operacion("resolver")(self.A._evaluar(operacion), self.B._evaluar(operacion))
+
+    def __str__(self):
+        return f"resolver({self.A}, {self.B})"
+
+
+# ======================= OPTIMIZACIÓN =======================
+def flops(expr):
+    """Coste estimado de evaluar `expr`, en multiplicaciones-suma (como VELOCIDAD_FLOPS)."""
+    if isinstance(expr, (Matriz, Escalar)):
+        return 0
+    if isinstance(expr, ElementoAElemento):
+        propio = 0 if expr.es_escalar else expr.forma[0] * expr.forma[1]
+        return flops(expr.izq) + flops(expr.der) + propio
+    if isinstance(expr, Producto):
+        (p, q), r = expr.izq.forma, expr.der.forma[1]
+        return flops(expr.izq) + flops(expr.der) + p * q * r
+    if isinstance(expr, Resolver):
+        n, m = expr.B.forma
+        return flops(expr.A) + flops(expr.B) + n ** 3 // 3 + n * n * m
+    n = expr.hijo.forma[0]
+    return flops(expr.hijo) + {"transpuesta": 0, "determinante": n ** 3 // 3}.get(expr.nombre, n ** 3)
+
+
+def optimizar(expr):
+    """
+    Devuelve una expresión equivalente y más barata de evaluar:
+    - Productos de varias matrices: paréntesis de coste mínimo (programación dinámica de
+      la cadena de matrices).
+    - inv(A)·B → resolver(A, B): una LU y sustituciones en lugar de la inversa completa.
+    - t(t(X)) → X.
+    - Escalares: las operaciones entre constantes se pliegan, (X*a)*b → X*(a·b), X*1 → X,
+      y los factores escalares de un producto se agrupan en uno solo, aplicado al factor
+      o al resultado con menos elementos.
+    """
+    if isinstance(expr, Funcion):
+        hijo = optimizar(expr.hijo)
+        if expr.nombre == "transpuesta" and isinstance(hijo, Funcion) and hijo.nombre == "transpuesta":
+            return hijo.hijo
+        return Funcion(expr.nombre, hijo)
+    if isinstance(expr, ElementoAElemento):
+        return _plegar(expr.op, optimizar(expr.izq), optimizar(expr.der))
+    if isinstance(expr, Producto):
+        factores, k = [], 1.0
+        for factor in _factores(expr):
+            escala, factor = _separar_escalar(factor)
+            k *= escala
+            factores.append(factor)
+        if k != 1:
+            candidatos = [i for i, f in enumerate(factores) if not _es_inversa(f)]
+            menor = min(candidatos, key=lambda i: factores[i].forma[0] * factores[i].forma[1], default=None)
+            if menor is not None and (factores[menor].forma[0] * factores[menor].forma[1]
+                                      < expr.forma[0] * expr.forma[1]):
+                factores[menor] = _plegar("*", factores[menor], Escalar(k))
+                k = 1.0
+        return _plegar("*", _cadena_optima(factores), Escalar(k))
+    return expr
+
+
+def _factores(expr):
+    """Factores (ya optimizados) de una cadena de productos."""
+    if isinstance(expr, Producto):
+        return _factores(expr.izq) + _factores(expr.der)
+    optimizada = optimizar(expr)
+    return _factores(optimizada) if isinstance(optimizada, Producto) else [optimizada]
+
+
+def _separar_escalar(expr):
+    """X*k (o k*X) con k constante → (k, X); cualquier otra expresión → (1, expr)."""
+    if isinstance(expr, ElementoAElemento) and expr.op == "*" and not expr.es_escalar:
+        if isinstance(expr.der, Escalar):
+            return expr.der.valor, expr.izq
+        if isinstance(expr.izq, Escalar):
+            return expr.izq.valor, expr.der
+    return 1.0, expr
+
+
+def _plegar(op, izq, der):
+    if isinstance(izq, Escalar) and isinstance(der, Escalar):
+        if op == "/" and der.valor == 0:
+            raise ValueError("División por cero.")
+        return Escalar(_OPERADORES[op](izq.valor, der.valor))
+    if op == "*" and (isinstance(izq, Escalar) or isinstance(der, Escalar)):
+        k, X = (izq.valor, der) if isinstance(izq, Escalar) else (der.valor, izq)
+        if k == 1:
+            return X
+        if isinstance(X, ElementoAElemento) and X.op == "*" and isinstance(X.der, Escalar):
+            return _plegar("*", X.izq, Escalar(X.der.valor * k))
+        return ElementoAElemento("*", X, Escalar(k))
+    return ElementoAElemento(op, izq, der)
+
+
+def _es_inversa(expr):
+    return isinstance(expr, Funcion) and expr.nombre == "inversa"
+
+
+def _cadena_optima(factores):
+    """
+    Paréntesis de coste mínimo para factores[0]·factores[1]·...: O(k³) en el número de
+    factores. Cada factor cuesta lo que su evaluación (un inv(A), la inversa completa);
+    un inv(A) que queda como factor izquierdo de un subproducto se resuelve (resolver)
+    en vez de invertirse y multiplicarse, y ese coste se tiene en cuenta al elegir el orden.
+    Como factor derecho no hay reescritura: se invierte y se multiplica.
+    """
+    n = len(factores)
+    dims = [factores[0].forma[0]] + [f.forma[1] for f in factores]
+    coste = [[0] * n for _ in range(n)]
+    for i, factor in enumerate(factores):
+        coste[i][i] = flops(factor)
+    corte = [[0] * n for _ in range(n)]
+    for largo in range(2, n + 1):
+        for i in range(n - largo + 1):
+            j = i + largo - 1
+            coste[i][j] = float("inf")
+            for k in range(i, j):
+                c = coste[i][k] + coste[k + 1][j] + dims[i] * dims[k + 1] * dims[j + 1]
+                if k == i and _es_inversa(factores[i]):
+                    # resolver(A, ·) ≈ n³/3 + n²·m en lugar de la inversa (n³) más el producto
+                    m = dims[i]
+                    c = flops(factores[i].hijo) + coste[k + 1][j] + m ** 3 // 3 + m * m * dims[j + 1]
+                if c < coste[i][j]:
+                    coste[i][j], corte[i][j] = c, k
+
+    def construir(i, j):
+        if i == j:
+            return factores[i]
+        k = corte[i][j]
+        izq, der = construir(i, k), construir(k + 1, j)
+        if _es_inversa(izq):
+            return Resolver(izq.hijo, der)
+        return Producto(izq, der)
+
+    return construir(0, n - 1)
+
+
+# ======================= ANÁLISIS DE TEXTO =======================
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(\.\*|\./|[-+*/()'∘]))")
+FUNCIONES = {"inv": inv, "adj": adj, "det": det, "t": lambda X: X.T}
+
+
+def _tokens(texto):
+    posicion = 0
+    texto = texto.rstrip()
+    while posicion < len(texto):
+        m = _TOKEN.match(texto, posicion)
+        if not m:
+            posicion += len(texto[posicion:]) - len(texto[posicion:].lstrip())
+            raise ValueError(f"Carácter no válido en la posición {posicion + 1}: {texto[posicion]!r}.")
+        numero, nombre, simbolo = m.groups()
+        if numero:
+            yield "numero", float(numero)
+        elif nombre:
+            yield "nombre", nombre
+        else:
+            yield "simbolo", simbolo
+        posicion = m.end()
+    yield "fin", None
+
+
+class _Analizador:
+    """Descenso recursivo: suma → producto → unario → postfijo → primario."""
+
+    def __init__(self, texto, matrices):
+        self.tokens = list(_tokens(texto))
+        self.pos = 0
+        self.matrices = matrices
+
+    def _actual(self):
+        return self.tokens[self.pos]
+
+    def _consumir(self, simbolo=None):
+        tipo, valor = self.tokens[self.pos]
+        if simbolo is not None and (tipo, valor) != ("simbolo", simbolo):
+            esperado = "fin de la expresión" if valor is None else repr(valor)
+            raise ValueError(f"Se esperaba {simbolo!r} y se encontró {esperado}.")
+        self.pos += 1
+        return tipo, valor
+
+    def analizar(self):
+        expr = self._suma()
+        tipo, valor = self._actual()
+        if tipo != "fin":
+            raise ValueError(f"Sobra {valor!r} al final de la expresión.")
+        return expr
+
+    def _suma(self):
+        expr = self._producto()
+        while self._actual() in (("simbolo", "+"), ("simbolo", "-")):
+            _, op = self._consumir()
+            expr = ElementoAElemento(op, expr, self._producto())
+        return expr
+
+    def _producto(self):
+        expr = self._unario()
+        while self._actual()[0] == "simbolo" and self._actual()[1] in ("*", ".*", "∘", "/", "./"):
+            _, op = self._consumir()
+            der = self._unario()
+            if op == "*" and not (expr.es_escalar or der.es_escalar):
+                expr = Producto(expr, der)
+            elif op == "/" and not der.es_escalar:
+                raise ValueError("'/' solo divide por un escalar; use './' para dividir elemento a elemento.")
+            else:
+                expr = ElementoAElemento("/" if op in ("/", "./") else "*", expr, der)
+        return expr
+
+    def _unario(self):
+        if self._actual() == ("simbolo", "-"):
+            self._consumir()
+            return -self._unario()
+        if self._actual() == ("simbolo", "+"):
+            self._consumir()
+        return self._postfijo()
+
+    def _postfijo(self):
+        expr = self._primario()
+        while self._actual() == ("simbolo", "'"):
+            self._consumir()
+            expr = expr.T
+        return expr
+
+    def _primario(self):
+        tipo, valor = self._consumir()
+        if tipo == "numero":
+            return Escalar(valor)
+        if tipo == "nombre":
+            if valor in FUNCIONES and self._actual() == ("simbolo", "("):
+                self._consumir("(")
+                argumento = self._suma()
+                self._consumir(")")
+                return FUNCIONES[valor](argumento)
+            if valor not in self.matrices:
+                raise ValueError(f"No existe la matriz '{valor}'.")
+            return Matriz(self.matrices[valor], valor)
+        if (tipo, valor) == ("simbolo", "("):
+            expr = self._suma()
+            self._consumir(")")
+            return expr
+        raise ValueError("Expresión incompleta." if tipo == "fin" else f"Símbolo inesperado {valor!r}.")
+
+
+def analizar(texto, matrices):
+    """
+    Convierte el texto en una expresión perezosa; `matrices` es el diccionario nombre → Matrix.
+    Lanza ValueError con la causa si la expresión no es válida o las dimensiones no encajan.
+    """
+    return _Analizador(texto, matrices).analizar()
@@ -0,0 +1,200 @@
+"""
+Historial de operaciones con registros estructurados.
+- Registro: descripción (el texto que ve el usuario), operación, entradas (nombre → forma),
+  forma y tamaño del resultado, tiempo real y de CPU, bytes asignados, backend, procesos,
+  fecha y, opcionalmente, un perfil. str(registro) es la descripción, como antes.
+- Medicion: mide un cálculo con `with`. Siempre el tiempo real y de CPU del proceso (las
+  tareas repartidas en otros procesos solo cuentan en el tiempo real); con memoria=True
+  también el pico de bytes asignados durante el cálculo, descontando lo que ya estaba
+  asignado al empezar (tracemalloc, que ralentiza el cálculo). Con perfil="cprofile" o
+  "tracemalloc" el cálculo se ejecuta bajo el perfilador y la captura (funciones, o líneas
+  con más memoria asignada por el cálculo) se conserva solo si tarda al menos umbral_perfil segundos.
+- Historial: lista de registros que acepta también texto (entradas sin medir, o de espacios
+  de trabajo antiguos) y se exporta como JSON lines (un registro JSON por línea).
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+import matrix_cache
+import matrix_core
+
+PERFILES = ("cprofile", "tracemalloc")
+# Los cálculos más rápidos no guardan perfil
+UMBRAL_PERFIL = 0.5
+# Funciones o líneas que se guardan de cada perfil
+LINEAS_PERFIL = 15
+
+
+class Medicion:
+    """Mide un cálculo: `with medicion: R = ...`. Tras el bloque quedan los tiempos, bytes y perfil."""
+
+    __slots__ = ("operacion", "entradas", "segundos", "segundos_cpu", "bytes", "perfil",
+                 "_modo", "_umbral", "_memoria", "_perfilador", "_traza_propia", "_memoria_inicial",
+                 "_instantanea", "_inicio", "_inicio_cpu")
+
+    def __init__(self, operacion, entradas=None, perfil=None, umbral_perfil=UMBRAL_PERFIL, memoria=False):
+        if perfil is not None and perfil not in PERFILES:
+            raise ValueError(f"Perfil desconocido: {perfil}. Use {', '.join(PERFILES)}.")
+        self.operacion = operacion
+        self.entradas = {nombre: list(M.forma) for nombre, M in (entradas or {}).items()}
+        self.segundos = self.segundos_cpu = self.bytes = self.perfil = None
+        self._modo = perfil
+        self._umbral = umbral_perfil
+        self._memoria = memoria or perfil == "tracemalloc"
+        self._perfilador = None
+        self._instantanea = None
+
+    def __enter__(self):
+        if self._memoria:
+            self._traza_propia = not tracemalloc.is_tracing()
+            if self._traza_propia:
+                tracemalloc.start()
+            if self._modo == "tracemalloc":
+                self._instantanea = tracemalloc.take_snapshot()
+            # Si la traza ya estaba activa, lo asignado antes no es de este cálculo
+            tracemalloc.reset_peak()
+            self._memoria_inicial = tracemalloc.get_traced_memory()[0]
+        if self._modo == "cprofile":
+            self._perfilador = cProfile.Profile()
+            self._perfilador.enable()
+        self._inicio_cpu = time.process_time()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.segundos = time.perf_counter() - self._inicio
+        self.segundos_cpu = time.process_time() - self._inicio_cpu
+        if self._perfilador is not None:
+            self._perfilador.disable()
+            if self.segundos >= self._umbral:
+                self.perfil = _resumen_cprofile(self._perfilador)
+            self._perfilador = None
+        if self._memoria:
+            self.bytes = tracemalloc.get_traced_memory()[1] - self._memoria_inicial
+            if self._modo == "tracemalloc" and self.segundos >= self._umbral:
+                self.perfil = _resumen_tracemalloc(tracemalloc.take_snapshot(), self._instantanea)
+            self._instantanea = None
+            if self._traza_propia:
+                tracemalloc.stop()
+        return False
+
+    def ejecutar(self, funcion, *args):
+        """Llama a funcion(*args) midiendo la llamada y devuelve su resultado."""
+        with self:
+            return funcion(*args)
+
+
+def _resumen_cprofile(perfilador):
+    estadisticas = pstats.Stats(perfilador).stats
+    filas = sorted(estadisticas.items(), key=lambda e: e[1][3], reverse=True)[:LINEAS_PERFIL]
+    return [{"funcion": f"{funcion} ({os.path.basename(archivo)}:{linea})", "llamadas": llamadas,
+             "segundos_propios": propios, "segundos_acumulados": acumulados}
+            for (archivo, linea, funcion), (_, llamadas, propios, acumulados, _) in filas]
+
+
+def _resumen_tracemalloc(instantanea, anterior):
+    """Líneas que más memoria asignaron (y siguen reteniendo) entre las dos instantáneas."""
+    propias = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diferencias = instantanea.filter_traces(propias).compare_to(anterior.filter_traces(propias), "lineno")
+    return [{"linea": str(e.traceback[0]), "bytes": e.size_diff, "bloques": e.count_diff}
+            for e in diferencias[:LINEAS_PERFIL] if e.size_diff or e.count_diff]
+
+
+class Registro:
+    """Entrada del historial. Los campos de medida valen None si no hubo cálculo medido."""
+
+    __slots__ = ("descripcion", "operacion", "entradas", "salida", "bytes_salida", "segundos",
+                 "segundos_cpu", "bytes", "backend", "procesos", "fecha", "perfil")
+
+    def __init__(self, descripcion, **campos):
+        self.descripcion = descripcion
+        for campo in self.__slots__[1:]:
+            setattr(self, campo, campos.get(campo))
+        if self.fecha is None:
+            self.fecha = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    def __str__(self):
+        return self.descripcion
+
+    def resumen(self):
+        """Descripción con el tiempo y la memoria, si se midieron."""
+        partes = []
+        if self.segundos is not None:
+            partes.append(f"{self.segundos * 1000:.1f} ms, CPU {self.segundos_cpu * 1000:.1f} ms")
+        if self.bytes is not None:
+            partes.append(f"{self.bytes / 2**20:.1f} MiB")
+        if self.perfil:
+            partes.append("con perfil")
+        return f"{self.descripcion} ({'; '.join(partes)})" if partes else self.descripcion
+
+    def a_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        return cls(**datos)
+
+
+class Historial(list):
+    """
+    Lista de Registro. append/extend aceptan también texto o diccionarios (p. ej. el historial
+    de un espacio de trabajo) y los convierten en registros. `perfil`, `umbral_perfil` y
+    `memoria` configuran las mediciones creadas con medir(); `procesos` se anota en cada registro.
+    """
+
+    def __init__(self, registros=(), perfil=None, umbral_perfil=UMBRAL_PERFIL, memoria=False):
+        super().__init__()
+        self.perfil = perfil
+        self.umbral_perfil = umbral_perfil
+        self.memoria = memoria
+        self.procesos = 1
+        self.extend(registros)
+
+    def medir(self, operacion, entradas=None):
+        """Medicion de `operacion` sobre `entradas` (nombre → matriz) con la configuración del historial."""
+        return Medicion(operacion, entradas, self.perfil, self.umbral_perfil, self.memoria)
+
+    def registrar(self, descripcion, medicion=None, salida=None):
+        """Añade un registro con la descripción, la medición (si la hay) y el resultado."""
+        campos = {"backend": matrix_core.backend_activo(), "procesos": self.procesos}
+        if medicion is not None:
+            campos.update(operacion=medicion.operacion, entradas=medicion.entradas, segundos=medicion.segundos,
+                          segundos_cpu=medicion.segundos_cpu, bytes=medicion.bytes, perfil=medicion.perfil)
+        if salida is not None and hasattr(salida, "forma"):
+            campos.update(salida=list(salida.forma), bytes_salida=matrix_cache.tam_bytes(salida))
+        registro = Registro(descripcion, **campos)
+        super().append(registro)
+        return registro
+
+    def append(self, entrada):
+        super().append(_como_registro(entrada))
+
+    def extend(self, entradas):
+        super().extend(_como_registro(e) for e in entradas)
+
+    def a_dicts(self):
+        return [r.a_dict() for r in self]
+
+    def exportar_jsonl(self, ruta):
+        """Escribe un registro JSON por línea."""
+        with open(ruta, "w", encoding="utf-8") as f:
+            for registro in self:
+                f.write(json.dumps(registro.a_dict(), ensure_ascii=False, default=str) + "\n")
+
+    def exportar_texto(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as f:
+            for registro in self:
+                f.write(registro.resumen() + "\n")
+
+
+def _como_registro(entrada):
+    if isinstance(entrada, Registro):
+        return entrada
+    if isinstance(entrada, dict):
+        return Registro.desde_dict(entrada)
+    return Registro(str(entrada))
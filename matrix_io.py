@@ -0,0 +1,603 @@
+"""
+Lectura y escritura de matrices en disco, independiente de la interfaz.
+Formato binario (.matb):
+- Cabecera de 24 bytes little-endian: firma b"MATB", versión (u8), tipo ('d' float64
+  o 'q' int64), 2 bytes de relleno, filas (u64) y columnas (u64).
+- A continuación los datos por filas, en little-endian, sin separadores.
+Se guarda con una única escritura del buffer y se carga con mmap: los datos float64
+se usan directamente desde el archivo mapeado, sin copiarlos ni convertirlos.
+Formato de texto (.txt/.csv): una fila por línea con los valores separados por comas
+(también ';', tabulador o espacios), con encabezado opcional. Se lee en lotes de líneas
+directamente al buffer de la matriz, validando que sea rectangular sobre la marcha.
+Espacio de trabajo (.matw): todas las matrices con nombre y el historial en un archivo.
+- Cabecera de 24 bytes: firma b"MATW", versión (u8), 3 bytes de relleno, desplazamiento
+  (u64) y longitud (u64) del índice.
+- Cada matriz en un bloque alineado a 8 bytes, según su formato:
+  densa, un bloque .matb completo (cabecera + datos); dispersa, los arrays CSR indptr e
+  indices (int64) y valores (float64); exacta, sus filas en JSON como texto ("3/4").
+- Al final, el índice en JSON (UTF-8): posición, forma y formato de cada matriz, y el historial.
+Abrir un espacio solo lee la cabecera y el índice; cada matriz se mapea al pedirla.
+Tripletes (.coo, .mtx): un no nulo por línea (fila, columna, valor), para matrices
+dispersas; se leen y escriben en memoria O(nnz).
+Pilas de matrices (varias matrices de la misma forma):
+- Binario (.mats): cabecera de 32 bytes (firma b"MATS", versión, tipo, 2 bytes de relleno,
+  número de matrices, filas y columnas, u64) y los datos de todas las matrices seguidos;
+  se carga con mmap, como .matb.
+- Texto: las matrices separadas por líneas vacías, cada una como en el formato de texto.
+- Un espacio de trabajo .matw cuyas matrices tienen todas la misma forma.
+"""
+
+import contextlib
+import itertools
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import matrix_core
+import matrix_exact
+import matrix_sparse
+import matrix_stack
+
+EXTENSION_BINARIA = ".matb"
+FIRMA = b"MATB"
+VERSION = 1
+CABECERA = struct.Struct("<4sBcxxQQ")
+TIPOS = {"float64": b"d", "int64": b"q"}
+# Delimitadores que se prueban, en orden, cuando no se indica ninguno (None = espacios)
+DELIMITADORES = (",", ";", "\t", None)
+# Líneas que se procesan por lote al leer texto
+TAM_LOTE = 4096
+EXTENSION_ESPACIO = ".matw"
+FIRMA_ESPACIO = b"MATW"
+VERSION_ESPACIO = 1
+CABECERA_ESPACIO = struct.Struct("<4sB3xQQ")
+EXTENSIONES_TRIPLETES = (".coo", ".mtx")
+CABECERA_MATRIX_MARKET = "%%MatrixMarket matrix coordinate real general"
+EXTENSION_PILA = ".mats"
+FIRMA_PILA = b"MATS"
+VERSION_PILA = 1
+CABECERA_PILA = struct.Struct("<4sBcxxQQQ")
+
+
+def guardar(M, ruta):
+    """Guarda M en binario (.matb), como tripletes (.coo, .mtx) o como texto según la extensión."""
+    if es_binario(ruta):
+        guardar_binario(M, ruta)
+    elif es_tripletes(ruta):
+        guardar_tripletes(M, ruta)
+    else:
+        guardar_texto(M, ruta)
+
+
+# ======================= FORMATO DE TEXTO =======================
+def guardar_texto(M, ruta):
+    M = matrix_core.como_matriz(M)
+    with open(ruta, "w", encoding="utf-8") as f:
+        for fila in M:
+            f.write(",".join(map(repr, fila)) + "\n")
+
+
+def cargar_texto(ruta, delimitador="auto", encabezado=None):
+    """
+    Carga una matriz de texto por lotes sin cargar el archivo completo en memoria.
+    - delimitador: "auto" (detecta ',', ';', tabulador o espacios), un carácter o None (espacios).
+    - encabezado: True/False, o None para detectarlo (primera línea sin ningún campo numérico;
+      una primera fila de datos con un valor erróneo se rechaza, no se toma por encabezado).
+    Las líneas vacías y las que empiezan por '#' se ignoran.
+    Devuelve (matriz, columnas_enteras): la lista de índices de columnas cuyos valores son todos enteros.
+    Lanza ValueError indicando la línea (y columna) del primer valor inválido o fila irregular.
+    """
+    with open(ruta, "r", encoding="utf-8") as f:
+        lineas = ((n, linea) for n, linea in enumerate(f, 1)
+                  if linea.strip() and not linea.lstrip().startswith("#"))
+        primera = next(lineas, None)
+        if primera is None:
+            raise ValueError("El archivo está vacío.")
+        n_primera, texto_primera = primera
+        if delimitador == "auto":
+            delimitador = _detectar_delimitador(texto_primera)
+        if encabezado is None:
+            encabezado = _es_encabezado(texto_primera, delimitador)
+        if not encabezado:
+            lineas = itertools.chain([primera], lineas)
+
+        datos = array("d")
+        columnas = None
+        enteras = None
+        filas = 0
+        while True:
+            lote = list(itertools.islice(lineas, TAM_LOTE))
+            if not lote:
+                break
+            for n, linea in lote:
+                campos = linea.split(delimitador)
+                if columnas is None:
+                    columnas = len(campos)
+                    enteras = list(range(columnas))
+                elif len(campos) != columnas:
+                    raise ValueError(f"Línea {n}: tiene {len(campos)} valores y se esperaban {columnas}.")
+                try:
+                    valores = list(map(float, campos))
+                except ValueError:
+                    raise ValueError(_describir_error(n, campos)) from None
+                if not all(map(math.isfinite, valores)):
+                    raise ValueError(_describir_error(n, campos))
+                if enteras:
+                    enteras = [j for j in enteras if valores[j].is_integer()]
+                datos.extend(valores)
+                filas += 1
+    if not filas:
+        raise ValueError("El archivo no contiene datos.")
+    return matrix_core.Matrix(filas, columnas, datos), enteras
+
+
+def _detectar_delimitador(linea):
+    for d in DELIMITADORES:
+        if d is None or d in linea:
+            return d
+
+
+def _es_numerica(linea, delimitador):
+    try:
+        list(map(float, linea.split(delimitador)))
+        return True
+    except ValueError:
+        return False
+
+
+def _es_encabezado(linea, delimitador):
+    """Una línea es encabezado si ninguno de sus campos es un número."""
+    for campo in linea.split(delimitador):
+        try:
+            float(campo)
+            return False
+        except ValueError:
+            pass
+    return True
+
+
+def _describir_error(n, campos):
+    for j, campo in enumerate(campos):
+        try:
+            valor = float(campo)
+        except ValueError:
+            return f"Línea {n}, columna {j + 1}: valor inválido {campo.strip()!r}."
+        if not math.isfinite(valor):
+            return f"Línea {n}, columna {j + 1}: valor no finito {campo.strip()!r}."
+    return f"Línea {n}: valor inválido."
+
+
+def cargar(ruta):
+    """Carga una matriz en formato binario, de tripletes o de texto según la extensión."""
+    if es_binario(ruta):
+        return cargar_binario(ruta)
+    if es_tripletes(ruta):
+        return cargar_tripletes(ruta)
+    return cargar_texto(ruta)[0]
+
+
+# ======================= FORMATO DE TRIPLETES =======================
+def es_tripletes(ruta):
+    return str(ruta).lower().endswith(EXTENSIONES_TRIPLETES)
+
+
+def guardar_tripletes(M, ruta):
+    """
+    Guarda los no nulos de M como tripletes: en formato MatrixMarket (índices desde 1) si
+    la ruta termina en .mtx, y si no como "filas,columnas" seguido de "fila,columna,valor"
+    por línea (índices desde 0).
+    """
+    if not matrix_core.es_dispersa(M):
+        M = matrix_sparse.MatrizDispersa.desde_densa(M)
+    with open(ruta, "w", encoding="utf-8") as f:
+        if str(ruta).lower().endswith(".mtx"):
+            f.write(f"{CABECERA_MATRIX_MARKET}\n{M.filas} {M.columnas} {M.nnz}\n")
+            f.writelines(f"{i + 1} {j + 1} {v!r}\n" for i, j, v in M.tripletes())
+        else:
+            f.write(f"{M.filas},{M.columnas}\n")
+            f.writelines(f"{i},{j},{v!r}\n" for i, j, v in M.tripletes())
+
+
+def cargar_tripletes(ruta):
+    """
+    Carga una matriz dispersa de tripletes (fila, columna, valor) por lotes.
+    - MatrixMarket ("%%MatrixMarket matrix coordinate real general", comentarios '%'):
+      línea "filas columnas nnz" y tripletes separados por espacios con índices desde 1.
+    - En otro caso, índices desde 0, delimitador detectado como en cargar_texto y comentarios
+      '#'. Una primera línea "filas,columnas" fija la forma; sin ella se deduce de los índices.
+    Los tripletes repetidos se suman. Devuelve una MatrizDispersa.
+    Lanza ValueError indicando la línea del primer triplete inválido o fuera de la matriz.
+    """
+    with open(ruta, "r", encoding="utf-8") as f:
+        inicio = f.readline()
+        market = inicio.startswith("%%MatrixMarket")
+        if market:
+            if inicio.lower().split()[1:] not in (["matrix", "coordinate", "real", "general"],
+                                                  ["matrix", "coordinate", "integer", "general"]):
+                raise ValueError("Solo se admiten archivos MatrixMarket 'matrix coordinate real general'.")
+            lineas = enumerate(f, 2)
+        else:
+            lineas = itertools.chain([(1, inicio)], enumerate(f, 2))
+        comentario = "%" if market else "#"
+        lineas = ((n, linea) for n, linea in lineas
+                  if linea.strip() and not linea.lstrip().startswith(comentario))
+        primera = next(lineas, None)
+        if primera is None:
+            raise ValueError("El archivo está vacío.")
+        n, texto = primera
+        delimitador = None if market else _detectar_delimitador(texto)
+        base = 1 if market else 0
+        campos = texto.split(delimitador)
+        forma = None
+        if market or len(campos) == 2:
+            try:
+                forma = tuple(int(c) for c in campos[:2])
+            except ValueError:
+                raise ValueError(f"Línea {n}: tamaño inválido {texto.strip()!r}.") from None
+            if len(campos) != (3 if market else 2) or min(forma) <= 0:
+                raise ValueError(f"Línea {n}: tamaño inválido {texto.strip()!r}.")
+        elif _es_numerica(texto, delimitador):
+            lineas = itertools.chain([primera], lineas)
+
+        I, J, V = array("q"), array("q"), array("d")
+        while True:
+            lote = list(itertools.islice(lineas, TAM_LOTE))
+            if not lote:
+                break
+            for n, linea in lote:
+                campos = linea.split(delimitador)
+                if len(campos) != 3:
+                    raise ValueError(f"Línea {n}: tiene {len(campos)} valores y se esperaban 3 (fila, columna, valor).")
+                try:
+                    i, j, v = int(campos[0]) - base, int(campos[1]) - base, float(campos[2])
+                except ValueError:
+                    raise ValueError(f"Línea {n}: triplete inválido {linea.strip()!r}.") from None
+                if not math.isfinite(v):
+                    raise ValueError(f"Línea {n}: valor no finito {campos[2].strip()!r}.")
+                if i < 0 or j < 0 or (forma and (i >= forma[0] or j >= forma[1])):
+                    raise ValueError(f"Línea {n}: posición ({campos[0].strip()}, {campos[1].strip()}) fuera de la matriz.")
+                I.append(i)
+                J.append(j)
+                V.append(v)
+    if forma is None:
+        if not V:
+            raise ValueError("El archivo no contiene datos.")
+        forma = (max(I) + 1, max(J) + 1)
+    return matrix_sparse.MatrizDispersa.desde_coo(*forma, I, J, V)
+
+
+# ======================= FORMATO BINARIO =======================
+def es_binario(ruta):
+    return str(ruta).lower().endswith(EXTENSION_BINARIA)
+
+
+def guardar_binario(M, ruta, tipo="float64"):
+    """Guarda M en formato .matb ("float64" o "int64")."""
+    M = matrix_core.como_matriz(M)
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo no soportado: {tipo}. Use {', '.join(TIPOS)}.")
+    codigo = TIPOS[tipo]
+    if codigo == b"q" and not matrix_core.es_entera(M):
+        raise ValueError("La matriz tiene elementos no enteros; no se puede guardar como int64.")
+    with _escritura_atomica(ruta) as f:
+        _escribir_bloque(f, M, codigo)
+
+
+@contextlib.contextmanager
+def _escritura_atomica(ruta):
+    """
+    Abre un temporal junto a `ruta` y lo renombra sobre ella al terminar sin errores.
+    Las matrices cargadas antes desde `ruta` están mapeadas (copy-on-write) sobre el archivo
+    anterior: reescribirlo en el sitio cambiaría sus páginas aún no leídas (o daría SIGBUS
+    si el archivo nuevo es más corto); con el reemplazo siguen viendo el contenido original.
+    """
+    temporal = f"{ruta}.tmp"
+    try:
+        with open(temporal, "wb") as f:
+            yield f
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def _escribir_bloque(f, M, codigo=b"d"):
+    """Escribe cabecera .matb y datos de M en f. Devuelve los bytes escritos."""
+    datos = array("q", map(int, M.datos)) if codigo == b"q" else M.datos
+    if sys.byteorder == "big":
+        datos = array(datos.typecode if isinstance(datos, array) else "d", datos)
+        datos.byteswap()
+    f.write(CABECERA.pack(FIRMA, VERSION, codigo, M.filas, M.columnas))
+    f.write(memoryview(datos).cast("B"))
+    return CABECERA.size + 8 * M.filas * M.columnas
+
+
+def leer_cabecera(f):
+    """Lee y valida la cabecera .matb. Devuelve (codigo_tipo, filas, columnas)."""
+    bruto = f.read(CABECERA.size)
+    if len(bruto) < CABECERA.size:
+        raise ValueError("Archivo binario truncado: falta la cabecera.")
+    firma, version, codigo, filas, columnas = CABECERA.unpack(bruto)
+    if firma != FIRMA:
+        raise ValueError("El archivo no es una matriz binaria (.matb).")
+    if version != VERSION:
+        raise ValueError(f"Versión de formato no soportada: {version}.")
+    if codigo not in TIPOS.values():
+        raise ValueError(f"Tipo de dato desconocido en la cabecera: {codigo!r}.")
+    return codigo, filas, columnas
+
+
+def cargar_binario(ruta):
+    """
+    Carga una matriz .matb. Los datos float64 quedan mapeados en memoria (copy-on-write:
+    modificar la matriz no altera el archivo); int64 se convierte a float64.
+    """
+    with open(ruta, "rb") as f:
+        codigo, filas, columnas = leer_cabecera(f)
+        total = filas * columnas
+        if total == 0:
+            raise ValueError("La matriz está vacía.")
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    return _matriz_desde_mapa(mapa, CABECERA.size, codigo, filas, columnas)
+
+
+def _matriz_desde_mapa(mapa, inicio, codigo, filas, columnas):
+    total = filas * columnas
+    fin = inicio + 8 * total
+    if len(mapa) < fin:
+        raise ValueError(f"Archivo binario truncado: se esperaban {total} elementos.")
+    vista = memoryview(mapa)[inicio:fin].cast(codigo.decode())
+    if codigo == b"d" and sys.byteorder == "little":
+        return matrix_core.Matrix(filas, columnas, vista)
+    datos = array(codigo.decode(), vista)
+    if sys.byteorder == "big":
+        datos.byteswap()
+    return matrix_core.Matrix(filas, columnas, array("d", datos))
+
+
+# ======================= PILAS DE MATRICES =======================
+def es_pila(ruta):
+    return str(ruta).lower().endswith(EXTENSION_PILA)
+
+
+def guardar_pila(P, ruta):
+    """Guarda la pila en binario (.mats) o como texto (matrices separadas por una línea vacía)."""
+    if es_pila(ruta):
+        datos = P.datos
+        if sys.byteorder == "big":
+            datos = array("d", datos)
+            datos.byteswap()
+        with _escritura_atomica(ruta) as f:
+            f.write(CABECERA_PILA.pack(FIRMA_PILA, VERSION_PILA, b"d", P.n, P.filas, P.columnas))
+            f.write(memoryview(datos).cast("B"))
+        return
+    with open(ruta, "w", encoding="utf-8") as f:
+        for k, M in enumerate(P):
+            if k:
+                f.write("\n")
+            for fila in M:
+                f.write(",".join(map(repr, fila)) + "\n")
+
+
+def cargar_pila(ruta):
+    """Carga una pila de matrices de un archivo .mats, de un espacio de trabajo .matw o de texto."""
+    if es_pila(ruta):
+        return cargar_pila_binaria(ruta)
+    if es_espacio(ruta):
+        return matrix_stack.PilaMatrices.desde_matrices(cargar_espacio(ruta)[0].values())
+    return cargar_pila_texto(ruta)
+
+
+def cargar_pila_binaria(ruta):
+    """Carga una pila .mats; los datos quedan mapeados en memoria (copy-on-write), sin copiarlos."""
+    with open(ruta, "rb") as f:
+        bruto = f.read(CABECERA_PILA.size)
+        if len(bruto) < CABECERA_PILA.size:
+            raise ValueError("Archivo de pila truncado: falta la cabecera.")
+        firma, version, codigo, n, filas, columnas = CABECERA_PILA.unpack(bruto)
+        if firma != FIRMA_PILA:
+            raise ValueError(f"El archivo no es una pila de matrices ({EXTENSION_PILA}).")
+        if version != VERSION_PILA:
+            raise ValueError(f"Versión de formato no soportada: {version}.")
+        if codigo != b"d":
+            raise ValueError(f"Tipo de dato desconocido en la cabecera: {codigo!r}.")
+        if n * filas * columnas == 0:
+            raise ValueError("La pila está vacía.")
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    fin = CABECERA_PILA.size + 8 * n * filas * columnas
+    if len(mapa) < fin:
+        raise ValueError(f"Archivo de pila truncado: se esperaban {n} matrices de {filas}x{columnas}.")
+    vista = memoryview(mapa)[CABECERA_PILA.size:fin].cast("d")
+    if sys.byteorder == "big":
+        vista = array("d", vista)
+        vista.byteswap()
+    return matrix_stack.PilaMatrices(n, filas, columnas, vista)
+
+
+def cargar_pila_texto(ruta, delimitador="auto"):
+    """
+    Carga una pila de texto: matrices separadas por una o más líneas vacías, todas de la
+    misma forma. Las líneas que empiezan por '#' se ignoran. Se lee línea a línea al buffer
+    de la pila; los errores indican la línea.
+    """
+    datos = array("d")
+    forma = None  # (filas, columnas) de la primera matriz
+    filas = columnas = 0  # de la matriz en curso
+    n = numero = 0
+
+    def cerrar_matriz(linea):
+        nonlocal forma, filas, n
+        if not filas:
+            return
+        if forma is None:
+            forma = (filas, columnas)
+        elif (filas, columnas) != forma:
+            raise ValueError(f"Línea {linea}: la matriz {n} es {filas}x{columnas} y las anteriores "
+                             f"{forma[0]}x{forma[1]}.")
+        n += 1
+        filas = 0
+
+    with open(ruta, "r", encoding="utf-8") as f:
+        for numero, linea in enumerate(f, 1):
+            texto = linea.strip()
+            if not texto:
+                cerrar_matriz(numero)
+                continue
+            if texto.startswith("#"):
+                continue
+            if delimitador == "auto":
+                delimitador = _detectar_delimitador(texto)
+            campos = texto.split(delimitador)
+            if filas == 0:
+                columnas = len(campos)
+            elif len(campos) != columnas:
+                raise ValueError(f"Línea {numero}: tiene {len(campos)} valores y se esperaban {columnas}.")
+            try:
+                valores = list(map(float, campos))
+            except ValueError:
+                raise ValueError(_describir_error(numero, campos)) from None
+            if not all(map(math.isfinite, valores)):
+                raise ValueError(_describir_error(numero, campos))
+            datos.extend(valores)
+            filas += 1
+        cerrar_matriz(numero + 1)
+    if not n:
+        raise ValueError("El archivo no contiene matrices.")
+    return matrix_stack.PilaMatrices(n, *forma, datos)
+
+
+# ======================= ESPACIO DE TRABAJO =======================
+def es_espacio(ruta):
+    return str(ruta).lower().endswith(EXTENSION_ESPACIO)
+
+
+def guardar_espacio(matrices, historial, ruta):
+    """
+    Guarda todas las matrices (dict nombre → matriz) y el historial en un archivo .matw.
+    Cada matriz conserva su formato: las dispersas no se expanden y las exactas no pierden precisión.
+    Las entradas del historial con a_dict() (registros estructurados) se guardan como objetos JSON.
+    Se escribe en un temporal y se reemplaza al final, así que un espacio abierto
+    (con matrices mapeadas desde el archivo anterior) sigue siendo válido.
+    """
+    indice = {"matrices": {}, "historial": [h.a_dict() if hasattr(h, "a_dict") else h for h in historial]}
+    with _escritura_atomica(ruta) as f:
+        f.write(CABECERA_ESPACIO.pack(FIRMA_ESPACIO, VERSION_ESPACIO, 0, 0))
+        posicion = CABECERA_ESPACIO.size
+        for nombre, M in matrices.items():
+            entrada = {"posicion": posicion, "filas": M.filas, "columnas": M.columnas}
+            if matrix_core.es_dispersa(M):
+                entrada.update(formato="dispersa", nnz=M.nnz)
+                posicion += _escribir_arrays(f, array("q", M.indptr), array("q", M.indices),
+                                             array("d", M.valores))
+            elif matrix_core.es_exacta(M):
+                bruto = json.dumps([list(map(str, fila)) for fila in M]).encode("utf-8")
+                bruto += b" " * (-len(bruto) % 8)
+                entrada.update(formato="exacta", longitud=len(bruto))
+                f.write(bruto)
+                posicion += len(bruto)
+            else:
+                entrada["formato"] = "densa"
+                posicion += _escribir_bloque(f, matrix_core.como_matriz(M))
+            indice["matrices"][nombre] = entrada
+        bruto = json.dumps(indice, ensure_ascii=False).encode("utf-8")
+        f.write(bruto)
+        f.seek(0)
+        f.write(CABECERA_ESPACIO.pack(FIRMA_ESPACIO, VERSION_ESPACIO, posicion, len(bruto)))
+
+
+def _escribir_arrays(f, *arrays):
+    """Escribe los arrays seguidos en little-endian. Devuelve los bytes escritos."""
+    total = 0
+    for datos in arrays:
+        if sys.byteorder == "big":
+            datos.byteswap()
+        f.write(memoryview(datos).cast("B"))
+        total += 8 * len(datos)
+    return total
+
+
+def _leer_array(mapa, inicio, codigo, n):
+    datos = array(codigo, memoryview(mapa)[inicio:inicio + 8 * n].cast(codigo))
+    if sys.byteorder == "big":
+        datos.byteswap()
+    return datos
+
+
+class EspacioTrabajo:
+    """
+    Espacio de trabajo .matw abierto para lectura. Al abrirlo solo se leen la cabecera y
+    el índice; cargar(nombre) mapea únicamente el bloque de esa matriz (copy-on-write).
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with open(ruta, "rb") as f:
+            bruto = f.read(CABECERA_ESPACIO.size)
+            if len(bruto) < CABECERA_ESPACIO.size:
+                raise ValueError("Espacio de trabajo truncado: falta la cabecera.")
+            firma, version, posicion, longitud = CABECERA_ESPACIO.unpack(bruto)
+            if firma != FIRMA_ESPACIO:
+                raise ValueError(f"El archivo no es un espacio de trabajo ({EXTENSION_ESPACIO}).")
+            if version != VERSION_ESPACIO:
+                raise ValueError(f"Versión de formato no soportada: {version}.")
+            f.seek(posicion)
+            bruto = f.read(longitud)
+            if len(bruto) < longitud:
+                raise ValueError("Espacio de trabajo truncado: falta el índice.")
+            # Un espacio sin matrices no tiene bloques que mapear
+            self._mapa = None
+            if posicion > CABECERA_ESPACIO.size:
+                self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        try:
+            indice = json.loads(bruto.decode("utf-8"))
+        except ValueError:
+            raise ValueError("El índice del espacio de trabajo está dañado.") from None
+        self._entradas = indice["matrices"]
+        self.historial = indice["historial"]
+
+    @property
+    def nombres(self):
+        return list(self._entradas)
+
+    def forma(self, nombre):
+        entrada = self._entrada(nombre)
+        return entrada["filas"], entrada["columnas"]
+
+    def _entrada(self, nombre):
+        if nombre not in self._entradas:
+            raise ValueError(f"El espacio de trabajo no contiene la matriz '{nombre}'.")
+        return self._entradas[nombre]
+
+    def cargar(self, nombre):
+        entrada = self._entrada(nombre)
+        inicio = entrada["posicion"]
+        formato = entrada["formato"]
+        if formato == "dispersa":
+            filas, nnz = entrada["filas"], entrada["nnz"]
+            indptr = _leer_array(self._mapa, inicio, "q", filas + 1)
+            indices = _leer_array(self._mapa, inicio + 8 * (filas + 1), "q", nnz)
+            valores = _leer_array(self._mapa, inicio + 8 * (filas + 1 + nnz), "d", nnz)
+            return matrix_sparse.MatrizDispersa(filas, entrada["columnas"], indptr, indices, valores)
+        if formato == "exacta":
+            bruto = self._mapa[inicio:inicio + entrada["longitud"]]
+            return matrix_exact.MatrizExacta([list(map(matrix_exact.racional, fila))
+                                              for fila in json.loads(bruto.decode("utf-8"))])
+        cabecera = self._mapa[inicio:inicio + CABECERA.size]
+        firma, version, codigo, filas, columnas = CABECERA.unpack(cabecera)
+        if firma != FIRMA or (filas, columnas) != (entrada["filas"], entrada["columnas"]):
+            raise ValueError(f"El bloque de la matriz '{nombre}' está dañado.")
+        return _matriz_desde_mapa(self._mapa, inicio + CABECERA.size, codigo, filas, columnas)
+
+    def cargar_todas(self):
+        return {nombre: self.cargar(nombre) for nombre in self._entradas}
+
+
+def cargar_espacio(ruta):
+    """Carga un espacio de trabajo completo. Devuelve (matrices, historial)."""
+    espacio = EspacioTrabajo(ruta)
+    return espacio.cargar_todas(), espacio.historial
@@ -0,0 +1,259 @@
+"""
+Ejecución paralela de las operaciones pesadas de matrix_core en varios procesos.
+- Producto matricial: cada proceso calcula un bloque de filas del resultado.
+- Inversa y adjunta: la factorización LU se calcula una vez y cada proceso resuelve
+  un bloque de columnas de A⁻¹ (filas de la matriz de cofactores).
+Las matrices de entrada y el resultado se comparten mediante memoria compartida
+(multiprocessing.shared_memory), de modo que no se serializan en cada tarea.
+Por debajo de `umbral` elementos por lado (o con un solo proceso) se usa el cálculo serie.
+También ofrece TareaCancelable: una operación de matrix_core ejecutada en un proceso
+aparte que puede consultarse sin bloquear (p. ej. desde la GUI) y cancelarse.
+"""
+
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import matrix_core
+
+# Tamaño mínimo (filas/columnas) a partir del cual compensa repartir el trabajo
+UMBRAL_PARALELO = 128
+
+
+# ======================= MEMORIA COMPARTIDA =======================
+def _crear_compartida(*buffers, elementos=0):
+    """Crea un bloque compartido con el contenido de los buffers array('d') (o vacío de `elementos`)."""
+    total = sum(len(b) for b in buffers) or elementos
+    shm = shared_memory.SharedMemory(create=True, size=8 * total)
+    vista = shm.buf.cast("d")
+    inicio = 0
+    for b in buffers:
+        vista[inicio:inicio + len(b)] = b
+        inicio += len(b)
+    vista.release()
+    return shm
+
+
+def _abrir_compartida(nombre):
+    shm = shared_memory.SharedMemory(name=nombre)
+    return shm, shm.buf.cast("d")
+
+
+def _leer_compartida(shm, elementos):
+    datos = array("d")
+    datos.frombytes(shm.buf[:8 * elementos])
+    return datos
+
+
+def _liberar(shm, *vistas):
+    for vista in vistas:
+        vista.release()
+    shm.close()
+
+
+# ======================= TAREAS (se ejecutan en los procesos hijos) =======================
+def _tarea_producto(entrada, salida, filas_A, columnas_A, columnas_B, i0, i1, tam_bloque):
+    shm_e, datos = _abrir_compartida(entrada)
+    shm_s, resultado = _abrir_compartida(salida)
+    try:
+        desplazamiento = filas_A * columnas_A
+        filas = [datos[i * columnas_A:(i + 1) * columnas_A].tolist() for i in range(i0, i1)]
+        B = datos[desplazamiento:desplazamiento + columnas_A * columnas_B].tolist()
+        columnas = [B[j::columnas_B] for j in range(columnas_B)]
+        R = matrix_core._producto_bloques(filas, columnas, tam_bloque)
+        bloque = array("d")
+        for fila in R:
+            bloque.extend(fila)
+        resultado[i0 * columnas_B:i1 * columnas_B] = bloque
+    finally:
+        _liberar(shm_e, datos)
+        _liberar(shm_s, resultado)
+
+
+def _tarea_inversa(entrada, salida, n, permutacion, signo, j0, j1):
+    shm_e, datos = _abrir_compartida(entrada)
+    shm_s, resultado = _abrir_compartida(salida)
+    try:
+        lu = object.__new__(matrix_core.FactorizacionLU)
+        lu.n = n
+        lu.lu = [datos[i * n:(i + 1) * n].tolist() for i in range(n)]
+        lu.permutacion = permutacion
+        lu.signo = signo
+        for j in range(j0, j1):
+            # La columna j de A⁻¹ se guarda como fila j de la transpuesta
+            resultado[j * n:(j + 1) * n] = array("d", lu.columna_inversa(j))
+    finally:
+        _liberar(shm_e, datos)
+        _liberar(shm_s, resultado)
+
+
+# ======================= EJECUTOR =======================
+class EjecutorParalelo:
+    """
+    Ejecuta producto_matriz, inversa y adjunta repartiendo el trabajo en `trabajadores`
+    procesos. El pool se crea en el primer uso y se cierra con cerrar() (o con `with`).
+    """
+
+    def __init__(self, trabajadores=None, umbral=UMBRAL_PARALELO):
+        self.trabajadores = trabajadores or os.cpu_count() or 1
+        self.umbral = umbral
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _en_paralelo(self, *dimensiones):
+        # Con NumPy el producto y la inversa ya usan BLAS multihilo
+        return (self.trabajadores > 1 and min(dimensiones) >= self.umbral
+                and matrix_core.backend_activo() == "python")
+
+    def _obtener_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.trabajadores)
+        return self._pool
+
+    def _tramos(self, total):
+        tam = -(-total // self.trabajadores)
+        return [(i, min(i + tam, total)) for i in range(0, total, tam)]
+
+    def producto_matriz(self, A, B):
+        if matrix_core.es_alternativa(A) or matrix_core.es_alternativa(B):
+            # Producto disperso (depende de los no nulos) o exacto: se calcula en serie
+            return matrix_core.producto_matriz(A, B)
+        A, B = matrix_core.como_matriz(A), matrix_core.como_matriz(B)
+        if not self._en_paralelo(A.filas, A.columnas, B.columnas):
+            return matrix_core.producto_matriz(A, B)
+        if A.columnas != B.filas:
+            raise ValueError("Columnas de A ≠ Filas de B.")
+
+        entrada = _crear_compartida(A.datos, B.datos)
+        salida = _crear_compartida(elementos=A.filas * B.columnas)
+        try:
+            tareas = [self._obtener_pool().submit(_tarea_producto, entrada.name, salida.name,
+                                                  A.filas, A.columnas, B.columnas, i0, i1,
+                                                  matrix_core.TAM_BLOQUE)
+                      for i0, i1 in self._tramos(A.filas)]
+            for tarea in tareas:
+                tarea.result()
+            return matrix_core.Matrix(A.filas, B.columnas, _leer_compartida(salida, A.filas * B.columnas))
+        finally:
+            for shm in (entrada, salida):
+                shm.close()
+                shm.unlink()
+
+    def _inversa_y_determinante(self, A):
+        """Devuelve (A⁻¹, det) con la LU calculada una vez y la sustitución repartida por columnas."""
+        lu = matrix_core.FactorizacionLU(A)
+        n = lu.n
+        plano = array("d")
+        for fila in lu.lu:
+            plano.extend(fila)
+        entrada = _crear_compartida(plano)
+        salida = _crear_compartida(elementos=n * n)
+        try:
+            tareas = [self._obtener_pool().submit(_tarea_inversa, entrada.name, salida.name,
+                                                  n, lu.permutacion, lu.signo, j0, j1)
+                      for j0, j1 in self._tramos(n)]
+            for tarea in tareas:
+                tarea.result()
+            transpuesta = matrix_core.Matrix(n, n, _leer_compartida(salida, n * n))
+            return matrix_core.transpuesta(transpuesta), lu.determinante()
+        finally:
+            for shm in (entrada, salida):
+                shm.close()
+                shm.unlink()
+
+    def inversa(self, A):
+        return self.inversa_y_determinante(A)[0]
+
+    def inversa_y_determinante(self, A):
+        if matrix_core.es_exacta(A):
+            return matrix_core.inversa_y_determinante(A)
+        A = matrix_core.como_matriz(A)
+        if not A.es_cuadrada or not self._en_paralelo(A.filas):
+            return matrix_core.inversa_y_determinante(A)
+        try:
+            return self._inversa_y_determinante(A)
+        except ValueError:
+            raise ValueError("La matriz no tiene inversa.") from None
+
+    def adjunta(self, A):
+        if matrix_core.es_exacta(A):
+            return matrix_core.adjunta(A)
+        A = matrix_core.como_matriz(A)
+        if not A.es_cuadrada or not self._en_paralelo(A.filas):
+            return matrix_core.adjunta(A)
+        try:
+            inv, det = self._inversa_y_determinante(A)
+        except ValueError:
+            # Singular: la adjunta exacta se calcula en serie
+            return matrix_core.adjunta(A)
+        return matrix_core.escalar(inv, det)
+
+
+# ======================= TAREAS CANCELABLES =======================
+def _ejecutar_operacion(conexion, nombre, args, medicion):
+    try:
+        if medicion is None:
+            valor = getattr(matrix_core, nombre)(*args)
+        else:
+            with medicion:
+                valor = getattr(matrix_core, nombre)(*args)
+        conexion.send(("ok", valor, medicion))
+    except Exception as e:
+        conexion.send(("error", e, None))
+    finally:
+        conexion.close()
+
+
+class TareaCancelable:
+    """
+    Ejecuta matrix_core.<nombre>(*args) en un proceso independiente.
+    terminada() no bloquea; cancelar() detiene el proceso aunque esté a mitad de cálculo.
+    Si se indica `medicion` (matrix_history.Medicion), el cálculo se mide en el proceso
+    de cálculo y, al terminar, la medición completa queda en el atributo `medicion`.
+    """
+
+    def __init__(self, nombre, *args, medicion=None):
+        receptor, emisor = multiprocessing.Pipe(duplex=False)
+        self._conexion = receptor
+        self._respuesta = None
+        self.medicion = None
+        self._proceso = multiprocessing.Process(target=_ejecutar_operacion,
+                                                args=(emisor, nombre, args, medicion), daemon=True)
+        self._proceso.start()
+        emisor.close()
+
+    def terminada(self):
+        if self._respuesta is None and self._conexion.poll():
+            try:
+                self._respuesta = self._conexion.recv()
+            except EOFError:
+                self._respuesta = ("error", RuntimeError("El proceso de cálculo terminó inesperadamente."), None)
+            self.medicion = self._respuesta[2]
+            self._conexion.close()
+            self._proceso.join()
+        return self._respuesta is not None
+
+    def resultado(self):
+        """Resultado de la operación; relanza la excepción si la operación falló."""
+        estado, valor, _ = self._respuesta
+        if estado == "error":
+            raise valor
+        return valor
+
+    def cancelar(self):
+        if self._respuesta is None:
+            self._proceso.terminate()
+            self._proceso.join()
+            self._conexion.close()
@@ -0,0 +1,357 @@
+"""
+Modo por lotes: ejecuta un guion de operaciones sin menú ni preguntas.
+Cada línea es un comando (las líneas vacías y lo que sigue a # se ignoran):
+    cargar NOMBRE RUTA            matriz desde .txt/.csv, .matb o tripletes (.coo, .mtx)
+    guardar NOMBRE RUTA           guarda en el formato de la extensión
+    abrir RUTA [NOMBRE ...]       matrices de un espacio de trabajo .matw (todas, con su historial)
+    guardar_espacio RUTA          guarda todas las matrices y el historial
+    matriz NOMBRE FILA ...        matriz literal, una fila por argumento: matriz A 1,2 3,4
+    aleatoria NOMBRE FILAS COLUMNAS [MIN MAX]
+    eliminar NOMBRE ...
+    NOMBRE = EXPRESIÓN            evalúa una expresión (inv(A) * (B + C), A', det(A), ...) y
+                                  guarda el resultado
+    resolver NOMBRE A B           X = A⁻¹·B reutilizando la LU de A entre llamadas
+    mostrar EXPRESIÓN             escribe el valor (una fila por línea, separada por tabuladores)
+    exacto si|no   procesos N   perfil MODO|ninguno [UMBRAL]   memoria si|no
+    historial RUTA                exporta el historial (.jsonl registros, .txt texto)
+    cargar_pila NOMBRE RUTA       pila de matrices de la misma forma (.mats, texto o .matw)
+    guardar_pila NOMBRE RUTA
+    pila NOMBRE OPERACIÓN ARG ... operación sobre toda la pila; los argumentos son pilas,
+                                  matrices (se aplican a todas) o escalares:
+                                  pila T producto_matriz M P   (M·Pₖ para cada k)
+                                  pila D determinante P        (pila de N matrices 1x1)
+Las operaciones usan la misma calculadora que el menú (caché, paralelismo, modo exacto e
+historial), pero la salida es solo lo pedido con `mostrar`. Con --json cada comando escribe
+un objeto JSON por línea (línea, comando, ok, resultado, forma, segundos o error).
+Un error detiene el guion (código de salida 1) salvo con --continuar.
+Uso:
+    python matrix_script.py trabajo.txt
+    python matrix_script.py - --json < trabajo.txt
+"""
+
+import argparse
+import inspect
+import json
+import re
+import shlex
+import sys
+
+import matrix_core
+import matrix_exact
+import matrix_expr
+import matrix_history
+import matrix_io
+import matrix_stack
+from calculadora_consola import MatrixCalculator
+
+ASIGNACION = re.compile(r"^\s*([A-Za-z_]\w*)\s*=(?!=)\s*(.+)$")
+# Comandos cuyo argumento es una expresión: se pasa tal cual, sin separar en palabras
+COMANDOS_EXPRESION = ("mostrar",)
+VALORES_SI = ("si", "sí", "s", "1", "on")
+VALORES_NO = ("no", "n", "0", "off")
+
+
+class Guion:
+    """Intérprete de comandos por lotes sobre un MatrixCalculator."""
+
+    def __init__(self, calc=None, salida=sys.stdout, json_lineas=False):
+        self.calc = calc or MatrixCalculator()
+        self.salida = salida
+        self.json_lineas = json_lineas
+        self.pilas = {}
+
+    @property
+    def matrices(self):
+        return self.calc.matrices
+
+    @property
+    def historial(self):
+        return self.calc.historial
+
+    # ======================= EJECUCIÓN =======================
+    def ejecutar(self, lineas, continuar=False, errores=sys.stderr):
+        """
+        Ejecuta las líneas en orden (se leen de una en una: sirve para un flujo como stdin).
+        Devuelve el número de comandos con error; sin `continuar` se detiene en el primero.
+        """
+        fallos = 0
+        for n, linea in enumerate(lineas, 1):
+            try:
+                partes = self.analizar(linea)
+                if partes is None:
+                    continue
+                resultado = partes[0](self, *partes[1:]) or {}
+            except Exception as e:
+                fallos += 1
+                if self.json_lineas:
+                    self._escribir_json({"linea": n, "comando": linea.strip(), "ok": False, "error": str(e)})
+                else:
+                    print(f"línea {n}: {e}", file=errores)
+                if not continuar:
+                    break
+                continue
+            if self.json_lineas:
+                self._escribir_json({"linea": n, "comando": linea.strip(), "ok": True, **resultado})
+        return fallos
+
+    def analizar(self, linea):
+        """(función, *argumentos) del comando de la línea, o None si está vacía o es un comentario."""
+        asignacion = ASIGNACION.match(linea.split("#", 1)[0])
+        if asignacion:
+            return (Guion.asignar, *asignacion.groups())
+        palabras = linea.split(None, 1)
+        if not palabras or palabras[0].startswith("#"):
+            return None
+        nombre, resto = palabras[0].lower(), (palabras[1] if len(palabras) > 1 else "")
+        if nombre not in COMANDOS:
+            raise ValueError(f"Comando desconocido: {palabras[0]}.")
+        if nombre in COMANDOS_EXPRESION:
+            argumentos = [resto.split("#", 1)[0].strip()]
+        else:
+            argumentos = shlex.split(resto, comments=True)
+        funcion = COMANDOS[nombre]
+        try:
+            inspect.signature(funcion).bind(self, *argumentos)
+        except TypeError:
+            raise ValueError(f"Número de argumentos incorrecto para {nombre}.") from None
+        return (funcion, *argumentos)
+
+    def _escribir_json(self, registro):
+        self.salida.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+
+    def _matriz(self, nombre):
+        if nombre not in self.matrices:
+            raise ValueError(f"No existe la matriz '{nombre}'.")
+        return self.matrices[nombre]
+
+    def _guardar_resultado(self, nombre, R, descripcion, medicion=None):
+        self.matrices[nombre] = R
+        self.historial.registrar(descripcion, medicion, R)
+        resultado = {"resultado": nombre, "forma": list(R.forma)}
+        if medicion is not None and medicion.segundos is not None:
+            resultado["segundos"] = medicion.segundos
+        return resultado
+
+    # ======================= ARCHIVOS =======================
+    def cargar(self, nombre, ruta):
+        return self._guardar_resultado(nombre, matrix_io.cargar(ruta), f"Matriz '{nombre}' cargada desde {ruta}")
+
+    def guardar(self, nombre, ruta):
+        matrix_io.guardar(self._matriz(nombre), ruta)
+        return {"archivo": ruta}
+
+    def abrir(self, ruta, *nombres):
+        espacio = matrix_io.EspacioTrabajo(ruta)
+        if nombres:
+            for nombre in nombres:
+                self.matrices[nombre] = espacio.cargar(nombre)
+                self.historial.append(f"Matriz '{nombre}' cargada desde {ruta}")
+        else:
+            nombres = espacio.nombres
+            self.matrices.update(espacio.cargar_todas())
+            self.historial.extend(espacio.historial)
+        return {"matrices": list(nombres)}
+
+    def guardar_espacio(self, ruta):
+        matrix_io.guardar_espacio(self.matrices, self.historial, ruta)
+        return {"archivo": ruta, "matrices": list(self.matrices)}
+
+    def exportar_historial(self, ruta):
+        if ruta.lower().endswith(".txt"):
+            self.historial.exportar_texto(ruta)
+        else:
+            self.historial.exportar_jsonl(ruta)
+        return {"archivo": ruta, "registros": len(self.historial)}
+
+    # ======================= MATRICES =======================
+    def matriz(self, nombre, *filas):
+        if not filas:
+            raise ValueError("Indique al menos una fila (elementos separados por comas).")
+        listas = [[self.calc._leer_numero(x) for x in fila.replace(",", " ").split()] for fila in filas]
+        M = matrix_exact.MatrizExacta(listas) if self.calc.exacto else matrix_core.Matrix.desde_listas(listas)
+        return self._guardar_resultado(nombre, M, f"Matriz '{nombre}' creada")
+
+    def aleatoria(self, nombre, filas, columnas, minimo="0", maximo="9"):
+        filas, columnas, minimo, maximo = int(filas), int(columnas), int(minimo), int(maximo)
+        if filas <= 0 or columnas <= 0:
+            raise ValueError("Filas y columnas deben ser mayores que 0.")
+        if minimo > maximo:
+            raise ValueError("El mínimo no puede ser mayor que el máximo.")
+        M = matrix_core.Matrix.aleatoria(filas, columnas, minimo, maximo)
+        return self._guardar_resultado(nombre, M, f"Matriz '{nombre}' creada")
+
+    def eliminar(self, *nombres):
+        for nombre in nombres:
+            self._matriz(nombre)
+            del self.matrices[nombre]
+            self.historial.append(f"Matriz '{nombre}' eliminada")
+        return {"eliminadas": list(nombres)}
+
+    # ======================= OPERACIONES =======================
+    def _evaluar(self, texto):
+        expresion = matrix_expr.analizar(texto, self.matrices)
+        medicion = self.historial.medir("expresion", matrix_expr.hojas(expresion))
+        return medicion.ejecutar(matrix_expr.optimizar(expresion).evaluar, self.calc._operacion), medicion
+
+    def asignar(self, nombre, texto):
+        R, medicion = self._evaluar(texto)
+        if not isinstance(R, matrix_core.Matrix) and not matrix_core.es_alternativa(R):
+            raise ValueError(f"La expresión {texto} es un escalar ({R}), no una matriz.")
+        return self._guardar_resultado(nombre, R, f"Expresión {texto} → {nombre}", medicion)
+
+    def resolver(self, nombre, nombre_A, nombre_B):
+        A, B = self._matriz(nombre_A), self._matriz(nombre_B)
+        medicion = self.historial.medir("resolver", {nombre_A: A, nombre_B: B})
+        with medicion:
+            if A.es_cuadrada:
+                lu = self.calc.cache.obtener(nombre_A, "lu", lambda: matrix_core.factorizar(A))
+                X = matrix_core.resolver(A, B, lu)
+            else:
+                X = matrix_core.resolver(A, B)
+        return self._guardar_resultado(nombre, X, f"Sistema {nombre_A}·X = {nombre_B} → {nombre}", medicion)
+
+    def mostrar(self, texto):
+        R, medicion = self._evaluar(texto)
+        es_matriz = isinstance(R, matrix_core.Matrix) or matrix_core.es_alternativa(R)
+        if self.json_lineas:
+            return {"valor": R.a_listas() if es_matriz else R, "segundos": medicion.segundos}
+        if es_matriz:
+            for fila in R:
+                self.salida.write("\t".join(map(str, fila)) + "\n")
+        else:
+            self.salida.write(f"{R}\n")
+        return None
+
+    # ======================= PILAS =======================
+    def _pila(self, nombre):
+        if nombre not in self.pilas:
+            raise ValueError(f"No existe la pila '{nombre}'.")
+        return self.pilas[nombre]
+
+    def _guardar_pila(self, nombre, P, descripcion, medicion=None):
+        self.pilas[nombre] = P
+        self.historial.registrar(descripcion, medicion, P)
+        resultado = {"resultado": nombre, "forma": list(P.forma)}
+        if medicion is not None and medicion.segundos is not None:
+            resultado["segundos"] = medicion.segundos
+        return resultado
+
+    def _operando_pila(self, texto):
+        """Pila o matriz con ese nombre, o un escalar."""
+        if texto in self.pilas:
+            return self.pilas[texto]
+        if texto in self.matrices:
+            return self.matrices[texto]
+        try:
+            return float(texto)
+        except ValueError:
+            raise ValueError(f"No existe la pila o matriz '{texto}'.") from None
+
+    def cargar_pila(self, nombre, ruta):
+        return self._guardar_pila(nombre, matrix_io.cargar_pila(ruta), f"Pila '{nombre}' cargada desde {ruta}")
+
+    def guardar_pila(self, nombre, ruta):
+        matrix_io.guardar_pila(self._pila(nombre), ruta)
+        return {"archivo": ruta}
+
+    def pila(self, nombre, operacion, *argumentos):
+        if operacion not in matrix_stack.OPERACIONES:
+            raise ValueError(f"Operación de pila desconocida: {operacion}. "
+                             f"Use {', '.join(matrix_stack.OPERACIONES)}.")
+        valores = [self._operando_pila(a) for a in argumentos]
+        medicion = self.historial.medir(f"pila_{operacion}", {a: v for a, v in zip(argumentos, valores)
+                                                               if not isinstance(v, float)})
+        R = medicion.ejecutar(matrix_stack.OPERACIONES[operacion], *valores)
+        if operacion == "determinante":
+            R = matrix_stack.PilaMatrices.desde_valores(R)
+        return self._guardar_pila(nombre, R, f"Pila {operacion} {' '.join(argumentos)} → {nombre}", medicion)
+
+    # ======================= CONFIGURACIÓN =======================
+    def exacto(self, valor):
+        self.calc.establecer_modo_exacto(_si_no(valor))
+        return {"exacto": self.calc.exacto}
+
+    def procesos(self, trabajadores):
+        self.calc.establecer_procesos(int(trabajadores))
+        return {"procesos": int(trabajadores)}
+
+    def perfil(self, modo, umbral=None):
+        modo = None if modo.lower() in ("ninguno", "no") else modo.lower()
+        if modo is not None and modo not in matrix_history.PERFILES:
+            raise ValueError(f"Perfil desconocido: {modo}. Use {', '.join(matrix_history.PERFILES)} o ninguno.")
+        self.historial.perfil = modo
+        if umbral is not None:
+            self.historial.umbral_perfil = float(umbral)
+        return {"perfil": modo, "umbral": self.historial.umbral_perfil}
+
+    def memoria(self, valor):
+        self.historial.memoria = _si_no(valor)
+        return {"memoria": self.historial.memoria}
+
+    def cerrar(self):
+        if self.calc.paralelo:
+            self.calc.paralelo.cerrar()
+            self.calc.paralelo = None
+
+
+def _si_no(valor):
+    valor = valor.lower()
+    if valor in VALORES_SI:
+        return True
+    if valor in VALORES_NO:
+        return False
+    raise ValueError(f"Se esperaba si o no, no {valor!r}.")
+
+
+COMANDOS = {
+    "cargar": Guion.cargar,
+    "guardar": Guion.guardar,
+    "abrir": Guion.abrir,
+    "guardar_espacio": Guion.guardar_espacio,
+    "historial": Guion.exportar_historial,
+    "matriz": Guion.matriz,
+    "aleatoria": Guion.aleatoria,
+    "eliminar": Guion.eliminar,
+    "resolver": Guion.resolver,
+    "mostrar": Guion.mostrar,
+    "exacto": Guion.exacto,
+    "procesos": Guion.procesos,
+    "perfil": Guion.perfil,
+    "memoria": Guion.memoria,
+    "cargar_pila": Guion.cargar_pila,
+    "guardar_pila": Guion.guardar_pila,
+    "pila": Guion.pila,
+}
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Ejecuta un guion de operaciones de la calculadora de matrices.")
+    parser.add_argument("guion", help="archivo de comandos, o - para leerlos de la entrada estándar")
+    parser.add_argument("--json", action="store_true", help="un objeto JSON por comando en la salida estándar")
+    parser.add_argument("--continuar", action="store_true", help="seguir tras un comando con error")
+    parser.add_argument("--procesos", type=int, default=1, help="procesos para las operaciones pesadas")
+    parser.add_argument("--exacto", action="store_true", help="empezar en modo exacto (fracciones)")
+    parser.add_argument("--historial", help="exportar el historial al terminar (.jsonl o .txt)")
+    args = parser.parse_args(argumentos)
+
+    guion = Guion(json_lineas=args.json)
+    try:
+        guion.procesos(args.procesos)
+        guion.exacto("si" if args.exacto else "no")
+        if args.guion == "-":
+            fallos = guion.ejecutar(sys.stdin, args.continuar)
+        else:
+            with open(args.guion, "r", encoding="utf-8") as f:
+                fallos = guion.ejecutar(f, args.continuar)
+        if args.historial:
+            guion.exportar_historial(args.historial)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ {e}", file=sys.stderr)
+        return 1
+    finally:
+        guion.cerrar()
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,557 @@
+"""
+Servicio local de cálculo de matrices sobre asyncio (JSON por líneas sobre TCP).
+Cada petición es un objeto JSON en una línea:
+    {"id": 1, "operacion": "producto_matriz", "argumentos": [[[1, 2], [3, 4]], [[5], [6]]]}
+    {"id": 2, "operacion": "expresion", "expresion": "inv(A) * B", "matrices": {"A": ..., "B": ...}}
+    {"id": 3, "operacion": "estadisticas"}
+Las matrices son listas de filas; si algún elemento es texto ("3/4") la matriz es exacta.
+Las respuestas llevan el mismo id (pueden llegar en otro orden que las peticiones):
+    {"id": 1, "ok": true, "forma": [2, 1], "filas": [[17.0], [39.0]]}
+    {"id": 2, "ok": true, "valor": 5.0}                      (resultados escalares)
+    {"id": 3, "ok": false, "error": "..."}
+Los resultados exactos llevan "exacta": true y sus fracciones como texto ("3/4"); en los
+demás, el texto solo aparece para los valores no finitos ("inf", "-inf", "nan").
+Un resultado de más de ELEMENTOS_FRAGMENTO elementos se envía por partes: primero
+{"id", "ok", "forma", "fragmentos": k} y después k líneas {"id", "fragmento": i, "filas": [...]}.
+- El cálculo se hace en un pool de procesos, así que el bucle de eventos sigue atendiendo.
+- Las peticiones pequeñas (hasta LIMITE_LOTE elementos por matriz) de la misma operación y
+  formas que llegan a la vez se agrupan en un lote: un único envío al pool. Si la operación
+  existe para pilas de matrices y todas son densas, el lote se apila en una PilaMatrices y se
+  calcula con una sola llamada de matrix_stack; si no, se calculan una a una en ese envío.
+- "estadisticas" devuelve las peticiones en cola (y su máximo), los lotes (y cuántos se
+  apilaron) y los percentiles de latencia (p50, p90, p99) de las últimas MUESTRAS_LATENCIA peticiones.
+ClienteMatrices es un cliente asyncio que reúne los fragmentos y admite peticiones concurrentes.
+Uso:
+    python matrix_server.py --puerto 8765 --procesos 4
+"""
+
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+
+import matrix_core
+import matrix_exact
+import matrix_expr
+import matrix_sparse
+import matrix_stack
+
+PUERTO = 8765
+# Tamaño máximo de una línea (petición o respuesta)
+LIMITE_LINEA = 2**28
+# Peticiones con matrices de hasta este número de elementos se agrupan en lotes
+LIMITE_LOTE = 64 * 64
+# Espera máxima para completar un lote y número máximo de peticiones por lote
+ESPERA_LOTE = 0.002
+TAM_LOTE = 64
+ELEMENTOS_FRAGMENTO = 65536
+MUESTRAS_LATENCIA = 1000
+
+OPERACIONES = {
+    "suma": matrix_core.suma,
+    "resta": matrix_core.resta,
+    "producto_matriz": matrix_core.producto_matriz,
+    "producto_hadamard": matrix_core.producto_hadamard,
+    "division_elemento": matrix_core.division_elemento,
+    "transpuesta": matrix_core.transpuesta,
+    "escalar": matrix_core.escalar,
+    "determinante": matrix_core.determinante,
+    "inversa": matrix_core.inversa,
+    "adjunta": matrix_core.adjunta,
+    "resolver": matrix_core.resolver,
+}
+
+
+# ======================= CÁLCULO (en los procesos del pool) =======================
+def calcular(operacion, argumentos):
+    """Resultado de una petición ya convertida: `operacion` de OPERACIONES o "expresion"."""
+    if operacion == "expresion":
+        texto, matrices = argumentos
+        return matrix_expr.optimizar(matrix_expr.analizar(texto, matrices)).evaluar()
+    return OPERACIONES[operacion](*argumentos)
+
+
+def calcular_lote(operacion, lote):
+    """
+    Calcula varias peticiones de la misma operación y formas. Devuelve (apilado, resultados),
+    con (ok, resultado o error) por petición.
+    """
+    if len(lote) > 1 and operacion in matrix_stack.OPERACIONES:
+        try:
+            return True, [(True, R) for R in _calcular_apilado(operacion, lote)]
+        except Exception:
+            # P. ej. una matriz singular: cada petición recibe su propio resultado o error
+            pass
+    resultados = []
+    for argumentos in lote:
+        try:
+            resultados.append((True, calcular(operacion, argumentos)))
+        except Exception as e:
+            resultados.append((False, e))
+    return False, resultados
+
+
+def _calcular_apilado(operacion, lote):
+    """
+    Apila el lote: cada argumento matricial en una PilaMatrices y los escalares, que deben
+    coincidir en todas las peticiones, tal cual. Devuelve el resultado de cada petición.
+    """
+    argumentos = []
+    for valores in zip(*lote):
+        if all(type(v) is matrix_core.Matrix for v in valores):
+            argumentos.append(matrix_stack.PilaMatrices.desde_matrices(valores))
+        elif all(isinstance(v, (int, float)) and v == valores[0] for v in valores):
+            argumentos.append(valores[0])
+        else:
+            raise ValueError("Las peticiones del lote no se pueden apilar.")
+    return list(matrix_stack.OPERACIONES[operacion](*argumentos))
+
+
+# ======================= CONVERSIÓN JSON =======================
+def _es_matriz(valor):
+    return isinstance(valor, matrix_core.Matrix) or matrix_core.es_alternativa(valor)
+
+
+def matriz_desde_json(filas):
+    """Matriz de una lista de filas: exacta si algún elemento es texto, densa o dispersa si no."""
+    if not isinstance(filas, list) or not filas or not all(isinstance(f, list) for f in filas):
+        raise ValueError("Una matriz debe ser una lista no vacía de filas.")
+    if any(isinstance(x, str) for fila in filas for x in fila):
+        return matrix_exact.como_exacta(filas)
+    return matrix_sparse.formato_automatico(matrix_core.Matrix.desde_listas(filas))
+
+
+def _argumento(valor):
+    if isinstance(valor, list):
+        return matriz_desde_json(valor)
+    if isinstance(valor, str):
+        return matrix_exact.racional(valor)
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return valor
+    raise ValueError(f"Argumento no válido: {valor!r}.")
+
+
+def argumentos_desde_json(peticion):
+    """(operacion, argumentos) de una petición, comprobando la operación y convirtiendo las matrices."""
+    operacion = peticion.get("operacion")
+    if operacion == "expresion":
+        texto, matrices = peticion.get("expresion"), peticion.get("matrices", {})
+        if not isinstance(texto, str) or not isinstance(matrices, dict):
+            raise ValueError("Una expresión necesita \"expresion\" (texto) y \"matrices\" (nombre → filas).")
+        return operacion, (texto, {nombre: matriz_desde_json(M) for nombre, M in matrices.items()})
+    if operacion not in OPERACIONES:
+        raise ValueError(f"Operación desconocida: {operacion}.")
+    argumentos = peticion.get("argumentos", [])
+    if not isinstance(argumentos, list):
+        raise ValueError("\"argumentos\" debe ser una lista.")
+    return operacion, tuple(_argumento(a) for a in argumentos)
+
+
+def _valor_json(x):
+    if isinstance(x, Fraction):
+        return str(x)
+    if isinstance(x, float) and not math.isfinite(x):
+        return str(x)
+    return x
+
+
+def _filas_json(M, i0, i1):
+    return [[_valor_json(x) for x in M.fila(i)] for i in range(i0, i1)]
+
+
+def _firma(valor):
+    """Parte de la clave de lote de un argumento: la forma de las matrices, el tipo de los escalares."""
+    if _es_matriz(valor):
+        return valor.forma
+    if isinstance(valor, dict):
+        return tuple((nombre, _firma(M)) for nombre, M in sorted(valor.items()))
+    if isinstance(valor, str):
+        return valor
+    return type(valor).__name__
+
+
+def _elementos(valor):
+    if _es_matriz(valor):
+        return valor.filas * valor.columnas
+    if isinstance(valor, dict):
+        return max(map(_elementos, valor.values()), default=0)
+    return 0
+
+
+def _milisegundos(segundos):
+    return None if segundos is None else segundos * 1000
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) por el método del rango más cercano; None si no hay valores."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+# ======================= SERVIDOR =======================
+class _Lote:
+    __slots__ = ("peticiones", "temporizador")
+
+    def __init__(self):
+        self.peticiones = []  # (argumentos, futuro)
+        self.temporizador = None
+
+
+class ServidorMatrices:
+    """Servidor asyncio de operaciones de matrices. Se usa con `async with` o iniciar()/cerrar()."""
+
+    def __init__(self, host="127.0.0.1", puerto=PUERTO, procesos=None, espera_lote=ESPERA_LOTE,
+                 tam_lote=TAM_LOTE, limite_lote=LIMITE_LOTE, elementos_fragmento=ELEMENTOS_FRAGMENTO):
+        self.host = host
+        self.puerto = puerto
+        self.procesos = procesos or os.cpu_count() or 1
+        self.espera_lote = espera_lote
+        self.tam_lote = tam_lote
+        self.limite_lote = limite_lote
+        self.elementos_fragmento = elementos_fragmento
+        self._pool = None
+        self._servidor = None
+        self._lotes = {}
+        self._tareas = set()
+        self._conexiones = {}  # tarea que atiende cada conexión → escritor
+        self.pendientes = 0
+        self.max_pendientes = 0
+        self.atendidas = 0
+        self.errores = 0
+        self.lotes = 0
+        self.lotes_apilados = 0
+        self.peticiones_en_lote = 0
+        self._latencias = collections.deque(maxlen=MUESTRAS_LATENCIA)
+
+    async def iniciar(self):
+        self._pool = ProcessPoolExecutor(self.procesos)
+        # Los procesos se crean antes de abrir sockets: con fork heredarían las conexiones
+        # abiertas y cerrarlas en el servidor no llegaría a cerrarlas de verdad
+        await asyncio.get_running_loop().run_in_executor(self._pool, os.getpid)
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.puerto, limit=LIMITE_LINEA)
+        # Con puerto 0 el sistema elige uno libre
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        return self
+
+    async def cerrar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+        # Cerrar las conexiones abiertas termina su lectura; se esperan sus peticiones en curso
+        for escritor in self._conexiones.values():
+            escritor.close()
+        if self._conexiones:
+            await asyncio.gather(*self._conexiones, return_exceptions=True)
+        for clave in list(self._lotes):
+            self._despachar(clave)
+        if self._tareas:
+            await asyncio.gather(*self._tareas, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    async def __aenter__(self):
+        return await self.iniciar()
+
+    async def __aexit__(self, *exc):
+        await self.cerrar()
+
+    async def servir(self):
+        await self._servidor.serve_forever()
+
+    def estadisticas(self):
+        latencias = list(self._latencias)
+        return {
+            "pendientes": self.pendientes,
+            "max_pendientes": self.max_pendientes,
+            "atendidas": self.atendidas,
+            "errores": self.errores,
+            "lotes": self.lotes,
+            "lotes_apilados": self.lotes_apilados,
+            "peticiones_en_lote": self.peticiones_en_lote,
+            "procesos": self.procesos,
+            "latencia_ms": {f"p{p}": _milisegundos(percentil(latencias, p)) for p in (50, 90, 99)},
+        }
+
+    # ----------------------- conexiones -----------------------
+    async def _atender(self, lector, escritor):
+        """Lee peticiones de una conexión; cada una se atiende en su propia tarea."""
+        escritura = asyncio.Lock()
+        tareas = set()
+        self._conexiones[asyncio.current_task()] = escritor
+        try:
+            while True:
+                try:
+                    linea = await lector.readline()
+                except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if not linea:
+                    break
+                if not linea.strip():
+                    continue
+                tarea = asyncio.create_task(self._peticion(linea, escritor, escritura))
+                tareas.add(tarea)
+                tarea.add_done_callback(tareas.discard)
+            if tareas:
+                await asyncio.gather(*tareas, return_exceptions=True)
+        finally:
+            del self._conexiones[asyncio.current_task()]
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _peticion(self, linea, escritor, escritura):
+        inicio = time.perf_counter()
+        self.pendientes += 1
+        self.max_pendientes = max(self.max_pendientes, self.pendientes)
+        identificador = None
+        try:
+            try:
+                peticion = json.loads(linea)
+                if not isinstance(peticion, dict):
+                    raise ValueError("La petición debe ser un objeto JSON.")
+                identificador = peticion.get("id")
+                if peticion.get("operacion") == "estadisticas":
+                    respuesta = {"ok": True, "valor": self.estadisticas()}
+                else:
+                    resultado = await self.calcular(*argumentos_desde_json(peticion))
+                    respuesta = None
+            except Exception as e:
+                self.errores += 1
+                respuesta = {"ok": False, "error": str(e)}
+            async with escritura:
+                if respuesta is not None:
+                    await self._escribir(escritor, {"id": identificador, **respuesta})
+                else:
+                    await self._enviar_resultado(escritor, identificador, resultado)
+        except ConnectionError:
+            pass
+        finally:
+            self.pendientes -= 1
+            self.atendidas += 1
+            self._latencias.append(time.perf_counter() - inicio)
+
+    @staticmethod
+    async def _escribir(escritor, mensaje):
+        escritor.write(json.dumps(mensaje, ensure_ascii=False).encode("utf-8") + b"\n")
+        await escritor.drain()
+
+    async def _enviar_resultado(self, escritor, identificador, R):
+        cabecera = {"id": identificador, "ok": True}
+        if isinstance(R, Fraction) or matrix_core.es_exacta(R):
+            cabecera["exacta"] = True
+        if not _es_matriz(R):
+            await self._escribir(escritor, {**cabecera, "valor": _valor_json(R)})
+            return
+        filas, columnas = R.forma
+        cabecera["forma"] = [filas, columnas]
+        if filas * columnas <= self.elementos_fragmento:
+            await self._escribir(escritor, {**cabecera, "filas": _filas_json(R, 0, filas)})
+            return
+        # Se serializa y envía un fragmento cada vez: drain() frena al servidor si el cliente lee despacio
+        por_fragmento = max(1, self.elementos_fragmento // columnas)
+        fragmentos = math.ceil(filas / por_fragmento)
+        await self._escribir(escritor, {**cabecera, "fragmentos": fragmentos})
+        for k, i0 in enumerate(range(0, filas, por_fragmento)):
+            await self._escribir(escritor, {"id": identificador, "fragmento": k,
+                                            "filas": _filas_json(R, i0, min(filas, i0 + por_fragmento))})
+
+    # ----------------------- cálculo y lotes -----------------------
+    async def calcular(self, operacion, argumentos):
+        """Calcula la operación en el pool; las peticiones pequeñas esperan a completar un lote."""
+        bucle = asyncio.get_running_loop()
+        if max(map(_elementos, argumentos), default=0) > self.limite_lote:
+            return await bucle.run_in_executor(self._pool, calcular, operacion, argumentos)
+        clave = (operacion, tuple(map(_firma, argumentos)))
+        lote = self._lotes.get(clave)
+        if lote is None:
+            lote = self._lotes[clave] = _Lote()
+            lote.temporizador = bucle.call_later(self.espera_lote, self._despachar, clave)
+        futuro = bucle.create_future()
+        lote.peticiones.append((argumentos, futuro))
+        if len(lote.peticiones) >= self.tam_lote:
+            self._despachar(clave)
+        return await futuro
+
+    def _despachar(self, clave):
+        lote = self._lotes.pop(clave, None)
+        if lote is None:
+            return
+        lote.temporizador.cancel()
+        tarea = asyncio.ensure_future(self._calcular_lote(clave[0], lote.peticiones))
+        self._tareas.add(tarea)
+        tarea.add_done_callback(self._tareas.discard)
+
+    async def _calcular_lote(self, operacion, peticiones):
+        self.lotes += 1
+        self.peticiones_en_lote += len(peticiones)
+        bucle = asyncio.get_running_loop()
+        try:
+            apilado, resultados = await bucle.run_in_executor(
+                self._pool, calcular_lote, operacion, [argumentos for argumentos, _ in peticiones])
+            self.lotes_apilados += apilado
+        except Exception as e:
+            resultados = [(False, e)] * len(peticiones)
+        for (_, futuro), (ok, valor) in zip(peticiones, resultados):
+            if futuro.done():
+                continue
+            if ok:
+                futuro.set_result(valor)
+            else:
+                futuro.set_exception(valor)
+
+
+# ======================= CLIENTE =======================
+class ClienteMatrices:
+    """
+    Cliente asyncio del servicio: `async with ClienteMatrices(puerto=...) as c: R = await c.calcular("suma", A, B)`.
+    Las matrices se envían como Matrix, MatrizExacta o listas de filas y se reciben como
+    Matrix (o MatrizExacta si el resultado es exacto). Admite varias peticiones a la vez;
+    una respuesta que no se puede interpretar solo hace fallar su propia petición.
+    """
+
+    def __init__(self, host="127.0.0.1", puerto=PUERTO):
+        self.host = host
+        self.puerto = puerto
+        self._ids = itertools.count(1)
+        self._esperando = {}  # id → (futuro, cabecera, filas recibidas)
+        self._lector = self._escritor = self._tarea = None
+
+    async def conectar(self):
+        self._lector, self._escritor = await asyncio.open_connection(self.host, self.puerto, limit=LIMITE_LINEA)
+        self._tarea = asyncio.create_task(self._recibir())
+        return self
+
+    async def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            try:
+                await self._escritor.wait_closed()
+            except ConnectionError:
+                pass
+            await self._tarea
+
+    async def __aenter__(self):
+        return await self.conectar()
+
+    async def __aexit__(self, *exc):
+        await self.cerrar()
+
+    async def calcular(self, operacion, *argumentos):
+        return await self._pedir({"operacion": operacion,
+                                  "argumentos": [_argumento_json(a) for a in argumentos]})
+
+    async def expresion(self, texto, matrices):
+        return await self._pedir({"operacion": "expresion", "expresion": texto,
+                                  "matrices": {n: _argumento_json(M) for n, M in matrices.items()}})
+
+    async def estadisticas(self):
+        return await self._pedir({"operacion": "estadisticas"})
+
+    async def _pedir(self, peticion):
+        identificador = next(self._ids)
+        futuro = asyncio.get_running_loop().create_future()
+        self._esperando[identificador] = [futuro, None, []]
+        self._escritor.write(json.dumps({"id": identificador, **peticion}).encode("utf-8") + b"\n")
+        await self._escritor.drain()
+        return await futuro
+
+    async def _recibir(self):
+        try:
+            while linea := await self._lector.readline():
+                try:
+                    mensaje = json.loads(linea)
+                except ValueError:
+                    # Sin poder leer el id no hay petición a la que atribuir la línea
+                    continue
+                identificador = mensaje.get("id") if isinstance(mensaje, dict) else None
+                espera = self._esperando.get(identificador)
+                if espera is None:
+                    continue
+                futuro, cabecera, filas = espera
+                try:
+                    if cabecera is None:
+                        espera[1] = cabecera = mensaje
+                    if "filas" in mensaje:
+                        filas.extend(mensaje["filas"])
+                    if not cabecera.get("ok"):
+                        raise ValueError(cabecera.get("error"))
+                    if "valor" in cabecera:
+                        resultado = _valor_respuesta(cabecera["valor"], cabecera.get("exacta"))
+                    elif len(filas) < cabecera["forma"][0]:
+                        continue
+                    else:
+                        resultado = _matriz_respuesta(filas, cabecera.get("exacta"))
+                except Exception as e:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                else:
+                    if not futuro.done():
+                        futuro.set_result(resultado)
+                del self._esperando[identificador]
+        except ConnectionError:
+            pass
+        finally:
+            for futuro, _, _ in self._esperando.values():
+                if not futuro.done():
+                    futuro.set_exception(ConnectionError("Conexión cerrada por el servidor."))
+
+
+def _argumento_json(valor):
+    if matrix_core.es_exacta(valor):
+        # Todo como texto: así el servidor la reconoce como exacta aunque sus elementos sean enteros
+        return [[str(x) for x in fila] for fila in valor]
+    if _es_matriz(valor):
+        return [[_valor_json(x) for x in fila] for fila in valor]
+    return _valor_json(valor)
+
+
+def _valor_respuesta(valor, exacta):
+    """Valor escalar de una respuesta: el texto es una fracción si es exacta, "inf"/"nan" si no."""
+    if isinstance(valor, str):
+        return matrix_exact.racional(valor) if exacta else float(valor)
+    return valor
+
+
+def _matriz_respuesta(filas, exacta):
+    if exacta:
+        return matrix_exact.como_exacta(filas)
+    return matrix_core.Matrix.desde_listas([[float(x) for x in fila] for fila in filas])
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Servicio local de cálculo de matrices (JSON por líneas).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--procesos", type=int, default=None, help="procesos de cálculo (por defecto, uno por CPU)")
+    parser.add_argument("--espera-lote", type=float, default=ESPERA_LOTE,
+                        help="segundos que se espera para agrupar peticiones pequeñas")
+    args = parser.parse_args(argumentos)
+
+    async def servir():
+        async with ServidorMatrices(args.host, args.puerto, args.procesos, args.espera_lote) as servidor:
+            print(f"✅ Servicio de matrices en {servidor.host}:{servidor.puerto} "
+                  f"({servidor.procesos} procesos, backend {matrix_core.backend_activo()}).", file=sys.stderr)
+            await servidor.servir()
+
+    try:
+        asyncio.run(servir())
+    except KeyboardInterrupt:
+        print("👋 Servicio detenido.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
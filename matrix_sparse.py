@@ -0,0 +1,385 @@
+"""
+Matrices dispersas en formato CSR (filas comprimidas), con operaciones cuyo coste depende
+del número de elementos no nulos (nnz) y no de filas x columnas.
+- MatrizDispersa: tres buffers contiguos, `indptr` (inicio de cada fila en los otros dos),
+  `indices` (columna de cada no nulo) y `valores`; unos 16 bytes por no nulo.
+- COO (tripletes fila, columna, valor) como formato de intercambio: desde_coo / tripletes.
+- formato_automatico(M): dispersa si su densidad no supera UMBRAL_DENSIDAD, densa si no.
+- Operaciones con cualquier combinación de matrices densas y dispersas: suma, resta,
+  producto_hadamard, division_elemento, producto_matriz, transpuesta y escalar.
+Al importarse, el módulo se registra en matrix_core: sus funciones usan estas operaciones
+en cuanto algún operando es disperso, y convierten a densa en el resto de operaciones.
+"""
+
+import operator
+from array import array
+from bisect import bisect_left
+from itertools import compress
+
+import matrix_core
+
+# Densidad máxima (no nulos / elementos) para guardar una matriz como dispersa
+UMBRAL_DENSIDAD = 0.1
+# Las matrices con menos elementos se guardan siempre densas
+ELEMENTOS_MINIMOS = 1024
+
+
+class MatrizDispersa:
+    """
+    Matriz dispersa CSR: los no nulos de la fila i son valores[indptr[i]:indptr[i+1]], en las
+    columnas indices[indptr[i]:indptr[i+1]] (ordenadas). Ofrece la misma interfaz de acceso
+    que Matrix (forma, [i, j], fila, recorte, iteración por filas...).
+    """
+
+    __slots__ = ("filas", "columnas", "indptr", "indices", "valores")
+
+    def __init__(self, filas, columnas, indptr=None, indices=None, valores=None):
+        if filas <= 0 or columnas <= 0:
+            raise ValueError("Filas y columnas deben ser mayores que 0.")
+        self.filas = filas
+        self.columnas = columnas
+        self.indptr = array("q", bytes(8 * (filas + 1))) if indptr is None else indptr
+        self.indices = array("q") if indices is None else indices
+        self.valores = array("d") if valores is None else valores
+        if (len(self.indptr) != filas + 1 or len(self.indices) != len(self.valores)
+                or self.indptr[-1] != len(self.valores)):
+            raise ValueError("Estructura CSR inconsistente.")
+
+    @classmethod
+    def desde_densa(cls, M):
+        M = matrix_core.como_matriz(M)
+        indptr, indices, valores = array("q", [0]), array("q"), array("d")
+        columnas = range(M.columnas)
+        for i in range(M.filas):
+            fila = M.fila(i)
+            js = list(compress(columnas, fila))
+            indices.extend(js)
+            valores.extend([fila[j] for j in js])
+            indptr.append(len(valores))
+        return cls(M.filas, M.columnas, indptr, indices, valores)
+
+    @classmethod
+    def desde_coo(cls, filas, columnas, I, J, V):
+        """
+        Crea la matriz a partir de tripletes COO (I[k], J[k], V[k]), en cualquier orden.
+        Los tripletes repetidos se suman y los ceros se descartan.
+        """
+        for k in range(len(V)):
+            if not (0 <= I[k] < filas and 0 <= J[k] < columnas):
+                raise ValueError(f"Posición ({I[k]}, {J[k]}) fuera de una matriz {filas}x{columnas}.")
+        claves = array("q", [i * columnas + j for i, j in zip(I, J)])
+        orden = sorted(range(len(claves)), key=claves.__getitem__)
+        indptr, indices, valores = array("q", bytes(8 * (filas + 1))), array("q"), array("d")
+        anterior = -1
+        for k in orden:
+            if claves[k] == anterior:
+                valores[-1] += V[k]
+            else:
+                indices.append(J[k])
+                valores.append(V[k])
+                indptr[I[k] + 1] += 1
+                anterior = claves[k]
+        for i in range(filas):
+            indptr[i + 1] += indptr[i]
+        M = cls(filas, columnas, indptr, indices, valores)
+        return M._sin_ceros() if 0.0 in valores else M
+
+    def _sin_ceros(self):
+        filas = ([(j, v) for j, v in self._fila_dispersa(i) if v != 0] for i in range(self.filas))
+        return _desde_filas(self.filas, self.columnas, filas)
+
+    def _fila_dispersa(self, i):
+        a, b = self.indptr[i], self.indptr[i + 1]
+        return zip(self.indices[a:b], self.valores[a:b])
+
+    def tripletes(self):
+        """Itera los no nulos como tripletes (fila, columna, valor)."""
+        for i in range(self.filas):
+            for j, v in self._fila_dispersa(i):
+                yield i, j, v
+
+    @property
+    def nnz(self):
+        return len(self.valores)
+
+    @property
+    def densidad(self):
+        return self.nnz / (self.filas * self.columnas)
+
+    @property
+    def forma(self):
+        return self.filas, self.columnas
+
+    @property
+    def es_cuadrada(self):
+        return self.filas == self.columnas
+
+    def _posicion(self, i, j):
+        if not (0 <= i < self.filas and 0 <= j < self.columnas):
+            raise IndexError(f"Posición ({i}, {j}) fuera de la matriz.")
+        a, b = self.indptr[i], self.indptr[i + 1]
+        return bisect_left(self.indices, j, a, b), b
+
+    def __getitem__(self, posicion):
+        i, j = posicion
+        k, fin = self._posicion(i, j)
+        return self.valores[k] if k < fin and self.indices[k] == j else 0.0
+
+    def __setitem__(self, posicion, valor):
+        """Asigna un elemento: O(1) si ya era no nulo; insertar o borrar cuesta O(nnz + filas)."""
+        i, j = posicion
+        k, fin = self._posicion(i, j)
+        existe = k < fin and self.indices[k] == j
+        if existe and valor != 0:
+            self.valores[k] = valor
+            return
+        if existe:
+            del self.indices[k], self.valores[k]
+            cambio = -1
+        elif valor != 0:
+            self.indices.insert(k, j)
+            self.valores.insert(k, valor)
+            cambio = 1
+        else:
+            return
+        for r in range(i + 1, self.filas + 1):
+            self.indptr[r] += cambio
+
+    def fila(self, i):
+        """Copia densa de la fila i como array('d')."""
+        fila = array("d", bytes(8 * self.columnas))
+        for j, v in self._fila_dispersa(i):
+            fila[j] = v
+        return fila
+
+    def __iter__(self):
+        for i in range(self.filas):
+            yield self.fila(i)
+
+    def a_listas(self):
+        return [fila.tolist() for fila in self]
+
+    def a_densa(self):
+        datos = array("d", bytes(8 * self.filas * self.columnas))
+        for i in range(self.filas):
+            inicio = i * self.columnas
+            for j, v in self._fila_dispersa(i):
+                datos[inicio + j] = v
+        return matrix_core.Matrix(self.filas, self.columnas, datos)
+
+    def recorte(self, filas, columnas):
+        """Vista previa densa con las primeras `filas` x `columnas`."""
+        filas, columnas = min(filas, self.filas), min(columnas, self.columnas)
+        datos = array("d")
+        for i in range(filas):
+            datos.extend(self.fila(i)[:columnas])
+        return matrix_core.Matrix(filas, columnas, datos)
+
+    def copia(self):
+        return MatrizDispersa(self.filas, self.columnas, array("q", self.indptr),
+                              array("q", self.indices), array("d", self.valores))
+
+    def __eq__(self, otra):
+        if isinstance(otra, MatrizDispersa):
+            return (self.forma == otra.forma and self.indptr == otra.indptr
+                    and self.indices == otra.indices and self.valores == otra.valores)
+        if isinstance(otra, matrix_core.Matrix):
+            return self.a_densa() == otra
+        return NotImplemented
+
+    def __repr__(self):
+        return f"MatrizDispersa({self.filas}x{self.columnas}, nnz={self.nnz})"
+
+
+def _desde_filas(filas, columnas, filas_dispersas):
+    """Construye una MatrizDispersa a partir de un iterable de filas [(columna, valor), ...] ordenadas."""
+    indptr, indices, valores = array("q", [0]), array("q"), array("d")
+    for fila in filas_dispersas:
+        for j, v in fila:
+            indices.append(j)
+            valores.append(v)
+        indptr.append(len(valores))
+    return MatrizDispersa(filas, columnas, indptr, indices, valores)
+
+
+def _fila_acumulada(acumulador):
+    return sorted((j, v) for j, v in acumulador.items() if v != 0)
+
+
+def formato_automatico(M):
+    """
+    Devuelve M en el formato más compacto: MatrizDispersa si tiene al menos ELEMENTOS_MINIMOS
+    elementos y densidad <= UMBRAL_DENSIDAD, Matrix densa en otro caso.
+    """
+    total = M.filas * M.columnas
+    if isinstance(M, MatrizDispersa):
+        return M.a_densa() if total < ELEMENTOS_MINIMOS or M.densidad > UMBRAL_DENSIDAD else M
+    M = matrix_core.como_matriz(M)
+    if total < ELEMENTOS_MINIMOS:
+        return M
+    datos = M.datos
+    ceros = datos.count(0.0) if isinstance(datos, array) else total - sum(map(bool, datos))
+    return MatrizDispersa.desde_densa(M) if total - ceros <= UMBRAL_DENSIDAD * total else M
+
+
+def _densa(M):
+    return M.a_densa() if isinstance(M, MatrizDispersa) else matrix_core.como_matriz(M)
+
+
+# ======================= OPERACIONES =======================
+def _combinar(A, B, op, operacion):
+    """Suma o resta: O(nnz) si ambas son dispersas; con una densa el resultado es denso."""
+    matrix_core._mismas_dimensiones(A, B, operacion)
+    if isinstance(A, MatrizDispersa) and isinstance(B, MatrizDispersa):
+        def filas():
+            for i in range(A.filas):
+                acumulador = dict(A._fila_dispersa(i))
+                for j, v in B._fila_dispersa(i):
+                    acumulador[j] = op(acumulador.get(j, 0.0), v)
+                yield _fila_acumulada(acumulador)
+        return formato_automatico(_desde_filas(A.filas, A.columnas, filas()))
+    n = A.columnas
+    if isinstance(A, MatrizDispersa):
+        D = matrix_core.como_matriz(B)
+        datos = array("d", [op(0.0, x) for x in D.datos])
+        for i, j, v in A.tripletes():
+            datos[i * n + j] = op(v, D.datos[i * n + j])
+    else:
+        D = matrix_core.como_matriz(A)
+        datos = array("d", D.datos)
+        for i, j, v in B.tripletes():
+            datos[i * n + j] = op(D.datos[i * n + j], v)
+    return formato_automatico(matrix_core.Matrix(A.filas, n, datos))
+
+
+def suma(A, B):
+    return _combinar(A, B, operator.add, "la suma")
+
+
+def resta(A, B):
+    return _combinar(A, B, operator.sub, "la resta")
+
+
+def producto_hadamard(A, B):
+    """El resultado solo puede ser no nulo donde lo es el operando disperso: O(nnz)."""
+    matrix_core._mismas_dimensiones(A, B, "Hadamard")
+    if not isinstance(A, MatrizDispersa):
+        A, B = B, A
+    if isinstance(B, MatrizDispersa):
+        if B.nnz < A.nnz:
+            A, B = B, A
+
+        def filas():
+            for i in range(A.filas):
+                otra = dict(B._fila_dispersa(i))
+                yield [(j, p) for j, v in A._fila_dispersa(i) if j in otra for p in (v * otra[j],) if p != 0]
+    else:
+        B = matrix_core.como_matriz(B)
+
+        def filas():
+            for i in range(A.filas):
+                inicio = i * A.columnas
+                yield [(j, p) for j, v in A._fila_dispersa(i) for p in (v * B.datos[inicio + j],) if p != 0]
+    return formato_automatico(_desde_filas(A.filas, A.columnas, filas()))
+
+
+def division_elemento(A, B, por_cero=float("inf")):
+    """
+    A./B con A dispersa y B densa: O(nnz(A)) más un recorrido de B para localizar sus ceros.
+    Si B es dispersa casi todas las divisiones son entre 0 y se calcula en denso.
+    """
+    matrix_core._mismas_dimensiones(A, B, "división")
+    if isinstance(B, MatrizDispersa):
+        return matrix_core.division_elemento(_densa(A), B.a_densa(), por_cero)
+    B = matrix_core.como_matriz(B)
+    columnas = range(A.columnas)
+
+    def filas():
+        for i in range(A.filas):
+            fila_B = B.fila(i)
+            acumulador = {j: (v / fila_B[j] if fila_B[j] != 0 else por_cero) for j, v in A._fila_dispersa(i)}
+            for j in compress(columnas, map(operator.not_, fila_B)):
+                acumulador.setdefault(j, por_cero)
+            yield _fila_acumulada(acumulador)
+    return formato_automatico(_desde_filas(A.filas, A.columnas, filas()))
+
+
+def producto_matriz(A, B):
+    """
+    - Dispersa · dispersa: algoritmo de Gustavson por filas, O(multiplicaciones no nulas).
+    - Dispersa · densa: cada no nulo A[i, k] suma A[i, k]·B[k, :] a la fila i, O(nnz(A)·columnas).
+    - Densa · dispersa: cada A[i, k] no nulo suma A[i, k]·B[k, :] (fila dispersa), O(nnz(A)·nnz por fila de B).
+    """
+    if A.columnas != B.filas:
+        raise ValueError("Columnas de A ≠ Filas de B.")
+    if isinstance(A, MatrizDispersa) and isinstance(B, MatrizDispersa):
+        filas_B = [dict(B._fila_dispersa(k)) for k in range(B.filas)]
+
+        def filas():
+            for i in range(A.filas):
+                acumulador = {}
+                for k, a in A._fila_dispersa(i):
+                    for j, b in filas_B[k].items():
+                        acumulador[j] = acumulador.get(j, 0.0) + a * b
+                yield _fila_acumulada(acumulador)
+        return formato_automatico(_desde_filas(A.filas, B.columnas, filas()))
+
+    datos = array("d")
+    if isinstance(A, MatrizDispersa):
+        B = matrix_core.como_matriz(B)
+        filas_B = [B.fila(k) for k in range(B.filas)]
+        for i in range(A.filas):
+            fila = [0.0] * B.columnas
+            for k, a in A._fila_dispersa(i):
+                fila = [x + a * y for x, y in zip(fila, filas_B[k])]
+            datos.extend(fila)
+    else:
+        A = matrix_core.como_matriz(A)
+        filas_B = [list(B._fila_dispersa(k)) for k in range(B.filas)]
+        for i in range(A.filas):
+            fila_A = A.fila(i)
+            fila = [0.0] * B.columnas
+            for k in compress(range(A.columnas), fila_A):
+                a = fila_A[k]
+                for j, b in filas_B[k]:
+                    fila[j] += a * b
+            datos.extend(fila)
+    return formato_automatico(matrix_core.Matrix(A.filas, B.columnas, datos))
+
+
+def transpuesta(A):
+    """CSR → CSR de la transpuesta por recuento de columnas: O(nnz + columnas)."""
+    indptr = array("q", bytes(8 * (A.columnas + 1)))
+    for j in A.indices:
+        indptr[j + 1] += 1
+    for j in range(A.columnas):
+        indptr[j + 1] += indptr[j]
+    siguiente = array("q", indptr[:-1])
+    indices = array("q", bytes(8 * A.nnz))
+    valores = array("d", bytes(8 * A.nnz))
+    for i in range(A.filas):
+        for j, v in A._fila_dispersa(i):
+            k = siguiente[j]
+            indices[k], valores[k] = i, v
+            siguiente[j] = k + 1
+    return MatrizDispersa(A.columnas, A.filas, indptr, indices, valores)
+
+
+def escalar(A, k):
+    if k == 0:
+        return MatrizDispersa(A.filas, A.columnas)
+    return MatrizDispersa(A.filas, A.columnas, array("q", A.indptr), array("q", A.indices),
+                          array("d", [v * k for v in A.valores]))
+
+
+OPERACIONES = {
+    "suma": suma,
+    "resta": resta,
+    "producto_hadamard": producto_hadamard,
+    "division_elemento": division_elemento,
+    "producto_matriz": producto_matriz,
+    "transpuesta": transpuesta,
+    "escalar": escalar,
+}
+
+matrix_core.registrar_formato("dispersa", MatrizDispersa, OPERACIONES)
@@ -0,0 +1,359 @@
+"""
+Pilas de matrices: N matrices de la misma forma en un único buffer contiguo array('d')
+(la matriz k ocupa datos[k*filas*columnas:(k+1)*filas*columnas], por filas).
+Las operaciones se aplican a toda la pila de una vez. Para formas pequeñas (hasta
+LIMITE_VECTORIAL filas y columnas, p. ej. transformaciones 3x3/4x4) se recorren los
+elementos (i, j) de la forma y cada uno se calcula para las N matrices a la vez con
+map() sobre el componente (i, j) de la pila (datos[i*columnas + j::filas*columnas]):
+el bucle en Python depende del tamaño de la forma, no de N, y el bucle sobre N lo hace map.
+- Elemento a elemento, escalar y transpuesta: una pasada sobre el buffer completo.
+- Producto: cada elemento del resultado es una suma de productos de componentes.
+- Determinante e inversa (hasta LIMITE_MENORES): por menores (cofactores), calculando cada
+  menor una sola vez para toda la pila; A⁻¹ = adj(A) / det(A).
+Las formas mayores se calculan matriz a matriz con matrix_core.
+Con el backend NumPy activo, el producto, el determinante y la inversa se calculan sobre
+una vista (N, filas, columnas) del buffer con las funciones por lotes de NumPy (@,
+linalg.det, linalg.inv), para cualquier forma.
+El segundo operando de las operaciones binarias puede ser otra pila de N matrices o una
+sola matriz, que se aplica a todas (p. ej. la misma transformación para N puntos).
+"""
+
+import operator
+from array import array
+from itertools import chain, repeat
+
+import matrix_core
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él las pilas se calculan en Python puro
+    np = None
+
+# Formas hasta este tamaño se calculan por componentes sobre toda la pila
+LIMITE_VECTORIAL = 8
+# Determinante e inversa por menores hasta este tamaño (el número de menores crece como 2ⁿ)
+LIMITE_MENORES = 4
+
+
+class PilaMatrices:
+    """N matrices filas x columnas guardadas en un único buffer array('d')."""
+
+    __slots__ = ("n", "filas", "columnas", "datos")
+
+    def __init__(self, n, filas, columnas, datos=None):
+        if n <= 0 or filas <= 0 or columnas <= 0:
+            raise ValueError("La pila debe tener al menos una matriz, y filas y columnas mayores que 0.")
+        if datos is None:
+            datos = array("d", bytes(8 * n * filas * columnas))
+        elif isinstance(datos, memoryview):
+            if datos.format != "d":
+                raise ValueError("El buffer de datos debe ser de tipo 'd' (float64).")
+        elif not isinstance(datos, array):
+            datos = array("d", datos)
+        if len(datos) != n * filas * columnas:
+            raise ValueError(f"Se esperaban {n * filas * columnas} elementos y hay {len(datos)}.")
+        self.n = n
+        self.filas = filas
+        self.columnas = columnas
+        self.datos = datos
+
+    @classmethod
+    def desde_matrices(cls, matrices):
+        """Pila con las matrices dadas (Matrix, dispersas o exactas), que deben tener la misma forma."""
+        datos = array("d")
+        forma = None
+        n = 0
+        for M in matrices:
+            M = matrix_core.como_matriz(M)
+            if forma is None:
+                forma = M.forma
+            elif M.forma != forma:
+                raise ValueError(f"La matriz {n} es {M.filas}x{M.columnas} y las anteriores "
+                                 f"{forma[0]}x{forma[1]}: una pila necesita matrices de la misma forma.")
+            datos.extend(M.datos)
+            n += 1
+        if forma is None:
+            raise ValueError("La pila está vacía.")
+        return cls(n, *forma, datos)
+
+    @classmethod
+    def desde_valores(cls, valores):
+        """Pila de matrices 1x1 con los valores dados (p. ej. los determinantes), para guardarlos como una pila."""
+        valores = array("d", valores)
+        return cls(len(valores), 1, 1, valores)
+
+    @property
+    def forma(self):
+        return self.n, self.filas, self.columnas
+
+    @property
+    def es_cuadrada(self):
+        return self.filas == self.columnas
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, k):
+        """Copia de la matriz k como Matrix."""
+        if not -self.n <= k < self.n:
+            raise IndexError(f"La pila tiene {self.n} matrices.")
+        tam = self.filas * self.columnas
+        inicio = (k % self.n) * tam
+        return matrix_core.Matrix(self.filas, self.columnas, array("d", self.datos[inicio:inicio + tam]))
+
+    def __iter__(self):
+        for k in range(self.n):
+            yield self[k]
+
+    def tam_bytes(self):
+        return 8 * len(self.datos)
+
+    def copia(self):
+        return PilaMatrices(self.n, self.filas, self.columnas, array("d", self.datos))
+
+    def __reduce__(self):
+        return PilaMatrices, (self.n, self.filas, self.columnas, array("d", self.datos))
+
+    def __eq__(self, otra):
+        if not isinstance(otra, PilaMatrices):
+            return NotImplemented
+        return self.forma == otra.forma and self.datos == otra.datos
+
+    def __repr__(self):
+        return f"PilaMatrices({self.n} x {self.filas}x{self.columnas})"
+
+
+# ======================= COMPONENTES =======================
+def _vectorial(*formas):
+    return max(max(f) for f in formas) <= LIMITE_VECTORIAL
+
+
+def _componentes(X):
+    """
+    Componentes (i, j) de X sobre la pila: cada uno es un iterable de n valores.
+    Para una sola matriz, repeat(x) sin límite y sin copias: no se agota, así que se puede
+    usar en varios map, que terminan con el componente de la pila (el otro operando).
+    """
+    if isinstance(X, PilaMatrices):
+        paso = X.filas * X.columnas
+        datos = X.datos
+        return [[datos[i * X.columnas + j::paso] for j in range(X.columnas)] for i in range(X.filas)]
+    return [[repeat(x) for x in fila] for fila in X]
+
+
+def _desde_componentes(n, componentes):
+    """Pila n x filas x columnas a partir de sus componentes (lista de filas de iterables)."""
+    filas, columnas = len(componentes), len(componentes[0])
+    planos = [c for fila in componentes for c in fila]
+    return PilaMatrices(n, filas, columnas, array("d", chain.from_iterable(zip(*planos))))
+
+
+def _con_numpy():
+    return np is not None and matrix_core.backend_activo() == "numpy"
+
+
+def _nd(X):
+    """Vista sin copia (N, filas, columnas) de una pila, o (filas, columnas) de una matriz."""
+    a = np.frombuffer(X.datos, dtype=np.float64)
+    if isinstance(X, PilaMatrices):
+        return a.reshape(X.n, X.filas, X.columnas)
+    return a.reshape(X.filas, X.columnas)
+
+
+def _pila(R):
+    R = np.ascontiguousarray(R, dtype=np.float64)
+    return PilaMatrices(*R.shape, array("d", R.tobytes()))
+
+
+def _operandos(A, B, operacion):
+    """Comprueba que B sea una pila de la misma longitud que A o una sola matriz (que se repite)."""
+    if not isinstance(A, PilaMatrices):
+        raise ValueError(f"El primer operando de {operacion} debe ser una pila de matrices.")
+    if isinstance(B, PilaMatrices):
+        if B.n != A.n:
+            raise ValueError(f"Las pilas tienen distinto número de matrices ({A.n} y {B.n}).")
+        return B
+    return matrix_core.como_matriz(B)
+
+
+# ======================= OPERACIONES ELEMENTO A ELEMENTO =======================
+def _elemento_a_elemento(A, B, funcion, operacion):
+    B = _operandos(A, B, operacion)
+    if (A.filas, A.columnas) != (B.filas, B.columnas):
+        raise ValueError(f"Las matrices deben tener las mismas dimensiones para {operacion}.")
+    datos_B = B.datos if isinstance(B, PilaMatrices) else array("d", B.datos) * A.n
+    return PilaMatrices(A.n, A.filas, A.columnas, array("d", map(funcion, A.datos, datos_B)))
+
+
+def suma(A, B):
+    return _elemento_a_elemento(A, B, operator.add, "la suma")
+
+
+def resta(A, B):
+    return _elemento_a_elemento(A, B, operator.sub, "la resta")
+
+
+def producto_hadamard(A, B):
+    return _elemento_a_elemento(A, B, operator.mul, "Hadamard")
+
+
+def division_elemento(A, B, por_cero=float("inf")):
+    return _elemento_a_elemento(A, B, lambda a, b: a / b if b != 0 else por_cero, "división")
+
+
+def escalar(A, k):
+    k = float(k)
+    return PilaMatrices(A.n, A.filas, A.columnas, array("d", [x * k for x in A.datos]))
+
+
+def transpuesta(A):
+    if _vectorial((A.filas, A.columnas)):
+        componentes = _componentes(A)
+        return _desde_componentes(A.n, [list(columna) for columna in zip(*componentes)])
+    return PilaMatrices.desde_matrices(matrix_core.transpuesta(M) for M in A)
+
+
+# ======================= PRODUCTO =======================
+def producto_matriz(A, B):
+    """
+    Producto matricial de cada matriz de A por la correspondiente de B (o por B si es una
+    sola matriz). Si A es una sola matriz y B una pila, calcula A·Bₖ para cada k.
+    """
+    if not isinstance(A, PilaMatrices):
+        if not isinstance(B, PilaMatrices):
+            raise ValueError("Al menos un operando del producto debe ser una pila de matrices.")
+        A = matrix_core.como_matriz(A)
+        n = B.n
+    else:
+        B = _operandos(A, B, "el producto")
+        n = A.n
+    if A.columnas != B.filas:
+        raise ValueError("Columnas de A ≠ Filas de B.")
+    if _con_numpy():
+        # Una sola matriz se difunde sobre la pila
+        return _pila(_nd(A) @ _nd(B))
+    if not _vectorial((A.filas, A.columnas), (B.filas, B.columnas)):
+        izquierda = A if isinstance(A, PilaMatrices) else [A] * n
+        derecha = B if isinstance(B, PilaMatrices) else [B] * n
+        return PilaMatrices.desde_matrices(map(matrix_core.producto_matriz, izquierda, derecha))
+    a, b = _componentes(A), _componentes(B)
+    mul, add = operator.mul, operator.add
+    resultado = []
+    for fila in a:
+        componentes = []
+        for j in range(B.columnas):
+            # R[:, i, j] = Σₗ A[:, i, l]·B[:, l, j], encadenando map (se evalúa al construir la pila)
+            c = map(mul, fila[0], b[0][j])
+            for l in range(1, A.columnas):
+                c = map(add, c, map(mul, fila[l], b[l][j]))
+            componentes.append(c)
+        resultado.append(componentes)
+    return _desde_componentes(n, resultado)
+
+
+# ======================= DETERMINANTE E INVERSA =======================
+def _cuadrada(A):
+    if not isinstance(A, PilaMatrices):
+        raise ValueError("La operación necesita una pila de matrices.")
+    if not A.es_cuadrada:
+        raise ValueError("La operación solo está definida para matrices cuadradas.")
+    return A
+
+
+class _Menores:
+    """
+    Menores de las matrices de la pila por (filas, columnas), como listas de N valores.
+    Cada menor se desarrolla por su primera fila y se guarda: el determinante y todos los
+    cofactores comparten los menores más pequeños.
+    """
+
+    def __init__(self, A):
+        self.componentes = _componentes(A)
+        self.calculados = {}
+
+    def __call__(self, filas, columnas):
+        clave = (filas, columnas)
+        if clave not in self.calculados:
+            if len(filas) == 1:
+                valor = self.componentes[filas[0]][columnas[0]]
+            else:
+                i, resto = filas[0], filas[1:]
+                valor = None
+                for t, j in enumerate(columnas):
+                    termino = map(operator.mul, self.componentes[i][j], self(resto, columnas[:t] + columnas[t + 1:]))
+                    valor = termino if valor is None else map(operator.sub if t % 2 else operator.add, valor, termino)
+                valor = list(valor)
+            self.calculados[clave] = valor
+        return self.calculados[clave]
+
+
+def determinante(A):
+    """Determinantes de las N matrices de la pila, como array('d')."""
+    A = _cuadrada(A)
+    if _con_numpy():
+        return array("d", np.linalg.det(_nd(A)).tolist())
+    if A.filas <= LIMITE_MENORES:
+        indices = tuple(range(A.filas))
+        return array("d", _Menores(A)(indices, indices))
+    return array("d", (matrix_core.determinante_lu(M.a_listas()) for M in A))
+
+
+def inversa_y_determinante(A):
+    """
+    (pila de inversas, array de determinantes). Lanza ValueError indicando la primera matriz
+    singular de la pila.
+    """
+    A = _cuadrada(A)
+    n = A.filas
+    if _con_numpy():
+        a = _nd(A)
+        dets = np.linalg.det(a)
+        singulares = np.flatnonzero(dets == 0)
+        if singulares.size:
+            raise ValueError(f"La matriz {singulares[0]} de la pila no tiene inversa.")
+        try:
+            inversas = np.linalg.inv(a)
+        except np.linalg.LinAlgError:
+            raise ValueError("Alguna matriz de la pila no tiene inversa.") from None
+        return _pila(inversas), array("d", dets.tolist())
+    if n > LIMITE_MENORES:
+        inversas, dets = [], array("d")
+        for k, M in enumerate(A):
+            try:
+                inv, det = matrix_core.inversa_y_determinante(M)
+            except ValueError:
+                raise ValueError(f"La matriz {k} de la pila no tiene inversa.") from None
+            inversas.append(inv)
+            dets.append(det)
+        return PilaMatrices.desde_matrices(inversas), dets
+    menor = _Menores(A)
+    indices = tuple(range(n))
+    dets = menor(indices, indices)
+    if 0 in dets:
+        raise ValueError(f"La matriz {dets.index(0)} de la pila no tiene inversa.")
+    if n == 1:
+        return PilaMatrices(A.n, 1, 1, array("d", [1 / d for d in dets])), array("d", dets)
+    # A⁻¹[r][s] = (-1)^(r+s) · menor(sin la fila s, sin la columna r) / det
+    inversos = [1 / d for d in dets]
+    signos = (inversos, [-x for x in inversos])
+    sin = [indices[:k] + indices[k + 1:] for k in indices]
+    componentes = [[map(operator.mul, menor(sin[s], sin[r]), signos[(r + s) % 2]) for s in indices]
+                   for r in indices]
+    return _desde_componentes(A.n, componentes), array("d", dets)
+
+
+def inversa(A):
+    return inversa_y_determinante(A)[0]
+
+
+OPERACIONES = {
+    "suma": suma,
+    "resta": resta,
+    "producto_matriz": producto_matriz,
+    "producto_hadamard": producto_hadamard,
+    "division_elemento": division_elemento,
+    "transpuesta": transpuesta,
+    "escalar": escalar,
+    "determinante": determinante,
+    "inversa": inversa,
+}
@@ -0,0 +1,49 @@
+"""Configuración de pytest: los módulos de la calculadora están en la raíz del repositorio."""
+
+import os
+import random
+import sys
+from fractions import Fraction
+from itertools import permutations
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def determinante_leibniz(M):
+    """Determinante exacto por la fórmula de Leibniz (suma sobre permutaciones): referencia O(n!·n)."""
+    n = len(M)
+    total = Fraction(0)
+    for p in permutations(range(n)):
+        inversiones = sum(p[i] > p[j] for i in range(n) for j in range(i + 1, n))
+        producto = Fraction(1)
+        for i in range(n):
+            producto *= Fraction(M[i][p[i]])
+        total += -producto if inversiones % 2 else producto
+    return total
+
+
+def menor(M, i, j):
+    return [fila[:j] + fila[j + 1:] for k, fila in enumerate(M) if k != i]
+
+
+def adjunta_cofactores(M):
+    """Adjunta exacta por definición: adj(M)[j][i] = (-1)^(i+j)·det(menor(M, i, j))."""
+    n = len(M)
+    if n == 1:
+        return [[Fraction(1)]]
+    return [[(-1) ** (i + j) * determinante_leibniz(menor(M, i, j)) for i in range(n)] for j in range(n)]
+
+
+def aleatoria_entera(rnd, n, minimo=-9, maximo=9):
+    return [[rnd.randint(minimo, maximo) for _ in range(n)] for _ in range(n)]
+
+
+def cerca(a, b, tolerancia=1e-9):
+    return abs(a - b) <= tolerancia * max(1.0, abs(a), abs(b))
+
+
+@pytest.fixture
+def rnd():
+    return random.Random(12345)
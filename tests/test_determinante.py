@@ -0,0 +1,50 @@
+from fractions import Fraction
+
+import pytest
+
+import matrix_core
+from conftest import aleatoria_entera, cerca, determinante_leibniz
+
+
+@pytest.mark.parametrize("n", range(1, 7))
+def test_bareiss_es_exacto(rnd, n):
+    for _ in range(20):
+        M = aleatoria_entera(rnd, n)
+        assert matrix_core.determinante_bareiss(M) == determinante_leibniz(M)
+
+
+def test_bareiss_con_pivote_nulo_y_singular():
+    assert matrix_core.determinante_bareiss([[0, 1], [1, 0]]) == -1
+    assert matrix_core.determinante_bareiss([[0, 2, 1], [0, 3, 4], [5, 6, 7]]) == determinante_leibniz(
+        [[0, 2, 1], [0, 3, 4], [5, 6, 7]])
+    assert matrix_core.determinante_bareiss([[1, 2, 3], [2, 4, 6], [1, 0, 1]]) == 0
+
+
+@pytest.mark.parametrize("n", range(1, 7))
+def test_lu_coincide_con_leibniz(rnd, n):
+    for _ in range(20):
+        M = [[rnd.uniform(-5, 5) for _ in range(n)] for _ in range(n)]
+        assert cerca(matrix_core.determinante_lu(M), float(determinante_leibniz(M)))
+
+
+def test_lu_singular():
+    assert matrix_core.determinante_lu([[1.0, 2.0], [2.0, 4.0]]) == 0.0
+
+
+def test_determinante_entero_grande_sin_desbordar(rnd):
+    M = aleatoria_entera(rnd, 6, -10**12, 10**12)
+    assert matrix_core.determinante(M) == determinante_leibniz(M)
+
+
+def test_determinante_cofactores_y_fachada(rnd):
+    M = aleatoria_entera(rnd, 5)
+    assert matrix_core.determinante_cofactores(M) == determinante_leibniz(M)
+    assert matrix_core.determinante(M) == determinante_leibniz(M)
+    F = [[Fraction(x, 3) + Fraction(1, 7) for x in fila] for fila in M]
+    assert cerca(matrix_core.determinante(matrix_core.Matrix.desde_listas([list(map(float, f)) for f in F])),
+                 float(determinante_leibniz(F)))
+
+
+def test_determinante_no_cuadrada():
+    with pytest.raises(ValueError):
+        matrix_core.determinante(matrix_core.Matrix.desde_listas([[1, 2, 3], [4, 5, 6]]))
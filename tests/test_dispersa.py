@@ -0,0 +1,95 @@
+import operator
+
+import pytest
+
+import matrix_core
+import matrix_sparse
+from matrix_sparse import MatrizDispersa
+
+
+def dispersa(rnd, filas, columnas, nnz):
+    I = [rnd.randrange(filas) for _ in range(nnz)]
+    J = [rnd.randrange(columnas) for _ in range(nnz)]
+    V = [float(rnd.randint(-4, 4)) for _ in range(nnz)]
+    return MatrizDispersa.desde_coo(filas, columnas, I, J, V), (I, J, V)
+
+
+def densa_coo(filas, columnas, I, J, V):
+    M = [[0.0] * columnas for _ in range(filas)]
+    for i, j, v in zip(I, J, V):
+        M[i][j] += v
+    return M
+
+
+def elemento_a_elemento(A, B, op):
+    return [[op(a, b) for a, b in zip(fa, fb)] for fa, fb in zip(A, B)]
+
+
+def producto(A, B):
+    return [[sum(a * b for a, b in zip(fila, col)) for col in zip(*B)] for fila in A]
+
+
+def test_desde_coo_suma_repetidos_y_quita_ceros(rnd):
+    M, coo = dispersa(rnd, 30, 40, 300)
+    assert M.a_listas() == densa_coo(30, 40, *coo)
+    assert 0.0 not in M.valores
+    for i in range(M.filas):
+        fila = M.indices[M.indptr[i]:M.indptr[i + 1]]
+        assert list(fila) == sorted(set(fila))
+
+
+@pytest.mark.parametrize("op, nombre", [(operator.add, "suma"), (operator.sub, "resta"),
+                                        (operator.mul, "producto_hadamard")])
+def test_elemento_a_elemento(rnd, op, nombre):
+    A, _ = dispersa(rnd, 40, 35, 90)
+    B, _ = dispersa(rnd, 40, 35, 120)
+    D = matrix_core.Matrix.aleatoria(40, 35, -3, 3, rnd)
+    funcion = getattr(matrix_core, nombre)
+    for X, Y in ((A, B), (A, D), (D, B)):
+        assert funcion(X, Y).a_listas() == elemento_a_elemento(X.a_listas(), Y.a_listas(), op)
+
+
+def test_division_elemento(rnd):
+    A, _ = dispersa(rnd, 40, 35, 90)
+    D = matrix_core.Matrix.aleatoria(40, 35, -3, 3, rnd)
+    esperado = [[a / b if b else -1.0 for a, b in zip(fa, fb)] for fa, fb in zip(A.a_listas(), D.a_listas())]
+    assert matrix_core.division_elemento(A, D, -1.0).a_listas() == esperado
+
+
+@pytest.mark.parametrize("formas", [("s", "s"), ("s", "d"), ("d", "s")])
+def test_producto_matriz(rnd, formas):
+    A, _ = dispersa(rnd, 33, 40, 120)
+    B, _ = dispersa(rnd, 40, 37, 150)
+    if formas[0] == "d":
+        A = A.a_densa()
+    if formas[1] == "d":
+        B = B.a_densa()
+    assert matrix_core.producto_matriz(A, B).a_listas() == producto(A.a_listas(), B.a_listas())
+
+
+def test_transpuesta_y_escalar(rnd):
+    A, _ = dispersa(rnd, 33, 40, 120)
+    T = matrix_core.transpuesta(A)
+    assert isinstance(T, MatrizDispersa)
+    assert T.a_listas() == [list(c) for c in zip(*A.a_listas())]
+    assert matrix_core.escalar(A, 2.5).a_listas() == [[2.5 * x for x in fila] for fila in A.a_listas()]
+    assert matrix_core.escalar(A, 0).nnz == 0
+
+
+def test_asignar_elementos(rnd):
+    A, _ = dispersa(rnd, 10, 12, 20)
+    referencia = A.a_listas()
+    for _ in range(200):
+        i, j, v = rnd.randrange(10), rnd.randrange(12), float(rnd.choice([0, 0, 1, -2, 3]))
+        A[i, j] = v
+        referencia[i][j] = v
+    assert A.a_listas() == referencia
+    assert A == MatrizDispersa.desde_densa(matrix_core.Matrix.desde_listas(referencia))
+
+
+def test_formato_automatico(rnd):
+    A, _ = dispersa(rnd, 40, 40, 50)
+    assert isinstance(matrix_sparse.formato_automatico(A.a_densa()), MatrizDispersa)
+    assert isinstance(matrix_sparse.formato_automatico(A), MatrizDispersa)
+    densa = matrix_core.Matrix.aleatoria(40, 40, 1, 3, rnd)
+    assert isinstance(matrix_sparse.formato_automatico(densa), matrix_core.Matrix)
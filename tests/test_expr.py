@@ -0,0 +1,47 @@
+import pytest
+
+import matrix_core
+import matrix_expr
+from matrix_expr import Matriz, Producto, Resolver, inv
+
+
+def parentizaciones(factores):
+    """Todos los árboles de producto posibles, con inv(A)·X → resolver(A, X) como en optimizar()."""
+    if len(factores) == 1:
+        yield factores[0]
+        return
+    for k in range(1, len(factores)):
+        for izq in parentizaciones(factores[:k]):
+            for der in parentizaciones(factores[k:]):
+                yield Resolver(izq.hijo, der) if matrix_expr._es_inversa(izq) else Producto(izq, der)
+
+
+def cadena(rnd, dims, inversas):
+    factores = []
+    for k in range(len(dims) - 1):
+        if k in inversas:
+            n = dims[k]
+            dims[k + 1] = n
+            factores.append(inv(Matriz(matrix_core.Matrix.aleatoria(n, n, -5, 5, rnd))))
+        else:
+            factores.append(Matriz(matrix_core.Matrix.aleatoria(dims[k], dims[k + 1], -5, 5, rnd)))
+    return factores
+
+
+@pytest.mark.parametrize("inversas", [{0}, {1}, {2}, {0, 2}, {1, 3}, {3}])
+def test_cadena_optima_es_la_de_menor_coste(rnd, inversas):
+    for _ in range(10):
+        dims = [rnd.choice([1, 2, 5, 20, 60]) for _ in range(5)]
+        factores = cadena(rnd, dims, inversas)
+        elegida = matrix_expr._cadena_optima(factores)
+        assert matrix_expr.flops(elegida) == min(map(matrix_expr.flops, parentizaciones(factores)))
+
+
+def test_optimizar_conserva_el_valor(rnd):
+    A = Matriz(matrix_core.Matrix.aleatoria(4, 4, -5, 5, rnd))
+    B = Matriz(matrix_core.Matrix.aleatoria(4, 3, -5, 5, rnd))
+    C = Matriz(matrix_core.Matrix.aleatoria(3, 1, -5, 5, rnd))
+    expr = B.T @ inv(A) @ B @ C
+    esperado = expr.evaluar().a_listas()
+    obtenido = matrix_expr.optimizar(expr).evaluar().a_listas()
+    assert all(abs(a - b) <= 1e-8 * max(1, abs(a)) for fa, fb in zip(esperado, obtenido) for a, b in zip(fa, fb))
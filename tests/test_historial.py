@@ -0,0 +1,18 @@
+import tracemalloc
+
+from matrix_history import Medicion
+
+
+def test_medicion_descuenta_memoria_previa():
+    previa = [bytes(1000) for _ in range(3000)]
+    tracemalloc.start()
+    try:
+        retenida = [bytes(1000) for _ in range(3000)]
+        medicion = Medicion("prueba", memoria=True, perfil="tracemalloc", umbral_perfil=0)
+        with medicion:
+            resultado = [bytearray(100) for _ in range(1000)]
+    finally:
+        tracemalloc.stop()
+    assert 100 * 1000 <= medicion.bytes < 1000 * 1000
+    assert medicion.perfil and medicion.perfil[0]["bytes"] < 1000 * 1000
+    assert len(previa) == len(retenida) == 3000 and len(resultado) == 1000
@@ -0,0 +1,115 @@
+from fractions import Fraction
+
+import pytest
+
+import matrix_core
+from conftest import adjunta_cofactores, aleatoria_entera, cerca, determinante_leibniz
+
+
+def iguales(A, B, tolerancia=1e-9):
+    return all(cerca(float(a), float(b), tolerancia) for fa, fb in zip(A, B) for a, b in zip(fa, fb))
+
+
+def invertible(rnd, n):
+    while True:
+        M = aleatoria_entera(rnd, n)
+        det = determinante_leibniz(M)
+        if det:
+            return M, det
+
+
+@pytest.mark.parametrize("n", range(1, 6))
+def test_inversa_entera_exacta(rnd, n):
+    for _ in range(10):
+        M, det = invertible(rnd, n)
+        inv, d = matrix_core.inversa_y_determinante(M)
+        assert d == det and isinstance(d, int)
+        referencia = [[x / det for x in fila] for fila in adjunta_cofactores(M)]
+        assert iguales(inv.a_listas(), referencia)
+
+
+@pytest.mark.parametrize("n", range(1, 6))
+def test_inversa_gauss_jordan_real(rnd, n):
+    for _ in range(10):
+        M = [[rnd.uniform(-5, 5) for _ in range(n)] for _ in range(n)]
+        det = determinante_leibniz(M)
+        inv, d = matrix_core.inversa_y_determinante(M)
+        assert cerca(d, float(det), 1e-8)
+        referencia = [[x / det for x in fila] for fila in adjunta_cofactores(M)]
+        assert iguales(inv.a_listas(), referencia, 1e-7)
+
+
+def test_gauss_jordan_con_pivoteo():
+    M = [[0.0, 2.0, 1.0], [1.0, 0.0, 0.0], [3.0, 1.0, 2.0]]
+    inv, det = matrix_core._gauss_jordan(M)
+    assert cerca(det, float(determinante_leibniz(M)))
+    assert iguales(matrix_core.producto_matriz(M, inv).a_listas(),
+                   [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+
+
+def test_inversa_singular():
+    for M in ([[1, 2], [2, 4]], [[1.5, 3.0], [0.5, 1.0]], [[0, 0], [0, 0]]):
+        with pytest.raises(ValueError):
+            matrix_core.inversa(M)
+
+
+@pytest.mark.parametrize("n", range(1, 6))
+def test_adjunta_entera(rnd, n):
+    for _ in range(10):
+        M = aleatoria_entera(rnd, n)
+        assert iguales(matrix_core.adjunta(M).a_listas(), adjunta_cofactores(M))
+
+
+def test_adjunta_real(rnd):
+    M = [[rnd.uniform(-5, 5) for _ in range(4)] for _ in range(4)]
+    assert iguales(matrix_core.adjunta(M).a_listas(), adjunta_cofactores(M), 1e-7)
+
+
+@pytest.mark.parametrize("M", [
+    [[1, 2, 3], [2, 4, 6], [1, 0, 1]],          # rango n-1
+    [[1, 2, 3], [2, 4, 6], [3, 6, 9]],          # rango 1: adjunta nula
+    [[1.5, 0.5, 2.0], [3.0, 1.0, 4.0], [0.25, 1.0, 0.5]],
+    [[0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1], [0, 0, 0, 0]],
+])
+def test_adjunta_singular(M):
+    assert iguales(matrix_core.adjunta(M).a_listas(), adjunta_cofactores(M))
+
+
+def test_adjunta_singular_fracciones():
+    M = [[Fraction(1, 3), Fraction(2, 3)], [Fraction(1, 2), Fraction(1)]]
+    assert matrix_core._adjunta_singular(M) == adjunta_cofactores(M)
+
+
+def test_actualizar_elemento_coincide_con_recalcular(rnd):
+    n = 5
+    M, det = invertible(rnd, n)
+    inv, d = matrix_core.inversa_y_determinante(M)
+    for _ in range(15):
+        i, j, delta = rnd.randrange(n), rnd.randrange(n), rnd.randint(-3, 3)
+        res = matrix_core.actualizar_elemento(inv, d, i, j, delta)
+        M[i][j] += delta
+        det = determinante_leibniz(M)
+        if res is None:
+            assert abs(det) < 1e-6 * max(1, abs(d))
+            inv, d = matrix_core.inversa_y_determinante(M)
+            continue
+        inv, d = res
+        assert d == det and isinstance(d, int)
+        referencia = [[x / det for x in fila] for fila in adjunta_cofactores(M)]
+        assert iguales(inv.a_listas(), referencia, 1e-6)
+
+
+def test_actualizar_elemento_real(rnd):
+    M = [[rnd.uniform(-5, 5) for _ in range(4)] for _ in range(4)]
+    inv, d = matrix_core.inversa_y_determinante(M)
+    inv, d = matrix_core.actualizar_elemento(inv, d, 2, 1, 0.75)
+    M[2][1] += 0.75
+    esperada, det = matrix_core.inversa_y_determinante(M)
+    assert cerca(d, det, 1e-8)
+    assert iguales(inv.a_listas(), esperada.a_listas(), 1e-7)
+
+
+def test_actualizar_elemento_a_singular():
+    inv, d = matrix_core.inversa_y_determinante([[1, 2], [3, 4]])
+    # 4 → 6 hace proporcionales las filas
+    assert matrix_core.actualizar_elemento(inv, d, 1, 1, 2) is None
@@ -0,0 +1,81 @@
+import pytest
+
+import matrix_core
+import matrix_io
+
+
+def test_binario_ida_y_vuelta(tmp_path, rnd):
+    M = matrix_core.Matrix.desde_listas([[rnd.uniform(-1e6, 1e6) for _ in range(7)] for _ in range(5)])
+    ruta = tmp_path / "m.matb"
+    matrix_io.guardar_binario(M, ruta)
+    assert matrix_io.cargar_binario(ruta) == M
+
+
+def test_binario_int64(tmp_path):
+    M = matrix_core.Matrix.desde_listas([[1, -2, 3], [2 ** 40, 0, -7]])
+    ruta = tmp_path / "m.matb"
+    matrix_io.guardar_binario(M, ruta, "int64")
+    assert matrix_io.cargar_binario(ruta) == M
+    with pytest.raises(ValueError):
+        matrix_io.guardar_binario([[0.5]], ruta, "int64")
+
+
+def test_binario_truncado(tmp_path):
+    ruta = tmp_path / "m.matb"
+    matrix_io.guardar_binario([[1.0, 2.0], [3.0, 4.0]], ruta)
+    ruta.write_bytes(ruta.read_bytes()[:-8])
+    with pytest.raises(ValueError):
+        matrix_io.cargar_binario(ruta)
+
+
+@pytest.mark.parametrize("forma_nueva", [(400, 400), (10, 10)])
+def test_sobrescribir_no_altera_matriz_mapeada(tmp_path, forma_nueva):
+    ruta = tmp_path / "m.matb"
+    matrix_io.guardar_binario(matrix_core.Matrix(300, 300, [1.0] * 90000), ruta)
+    cargada = matrix_io.cargar_binario(ruta)
+    filas, columnas = forma_nueva
+    matrix_io.guardar_binario(matrix_core.Matrix(filas, columnas, [7.0] * (filas * columnas)), ruta)
+    assert all(x == 1.0 for x in cargada.datos)
+    assert matrix_io.cargar_binario(ruta)[0, 0] == 7.0
+    assert not (tmp_path / "m.matb.tmp").exists()
+
+
+def test_texto_con_encabezado(tmp_path):
+    ruta = tmp_path / "m.csv"
+    ruta.write_text("a,b,c\n1,2,3\n4,5.5,6\n", encoding="utf-8")
+    M, enteras = matrix_io.cargar_texto(ruta)
+    assert M.a_listas() == [[1.0, 2.0, 3.0], [4.0, 5.5, 6.0]]
+    assert enteras == [0, 2]
+
+
+@pytest.mark.parametrize("contenido, mensaje", [
+    ("1,x,3\n4,5,6\n7,8,9\n", "Línea 1, columna 2"),
+    ("# comentario\n1;2\n3;abc\n", "Línea 3, columna 2"),
+    ("1 2\n3 inf\n", "Línea 2, columna 2"),
+])
+def test_texto_informa_primer_valor_invalido(tmp_path, contenido, mensaje):
+    ruta = tmp_path / "m.txt"
+    ruta.write_text(contenido, encoding="utf-8")
+    with pytest.raises(ValueError, match=mensaje):
+        matrix_io.cargar_texto(ruta)
+
+
+def test_espacio_ida_y_vuelta(tmp_path, rnd):
+    import matrix_exact
+    import matrix_sparse
+    from fractions import Fraction
+
+    densa = matrix_core.Matrix.desde_listas([[rnd.uniform(-9, 9) for _ in range(4)] for _ in range(3)])
+    dispersa = matrix_sparse.MatrizDispersa.desde_coo(1000, 800, [0, 999, 5], [3, 799, 5], [1.5, -2.0, 7.0])
+    exacta = matrix_exact.MatrizExacta([[Fraction(1, 3), 2], [Fraction(-7, 10), 10 ** 30]])
+    historial = ["suma A B", {"operacion": "inversa", "segundos": 0.5}]
+    ruta = tmp_path / "w.matw"
+    matrix_io.guardar_espacio({"A": densa, "D": dispersa, "E": exacta}, historial, ruta)
+    matrices, leido = matrix_io.cargar_espacio(ruta)
+    assert leido == historial
+    assert matrices["A"] == densa
+    assert matrix_core.es_dispersa(matrices["D"])
+    assert list(matrices["D"].tripletes()) == list(dispersa.tripletes())
+    assert matrix_core.es_exacta(matrices["E"])
+    assert matrices["E"].a_listas() == exacta.a_listas()
+    assert ruta.stat().st_size < 1000 * 800
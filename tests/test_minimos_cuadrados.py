@@ -0,0 +1,66 @@
+from fractions import Fraction
+
+import pytest
+
+import matrix_core
+from conftest import cerca
+
+
+def transpuesta(A):
+    return [list(c) for c in zip(*A)]
+
+
+def producto(A, B):
+    return [[sum(a * b for a, b in zip(fila, col)) for col in zip(*B)] for fila in A]
+
+
+def resolver_exacto(A, B):
+    """Gauss-Jordan con Fraction sobre [A | B], A cuadrada invertible."""
+    n = len(A)
+    M = [list(fa) + list(fb) for fa, fb in zip(A, B)]
+    for k in range(n):
+        p = next(i for i in range(k, n) if M[i][k] != 0)
+        M[k], M[p] = M[p], M[k]
+        M[k] = [x / M[k][k] for x in M[k]]
+        for i in range(n):
+            if i != k and M[i][k] != 0:
+                M[i] = [a - M[i][k] * b for a, b in zip(M[i], M[k])]
+    return [fila[n:] for fila in M]
+
+
+def referencia(A, B):
+    """Ecuaciones normales en aritmética exacta: (AᵀA)⁻¹AᵀB, o Aᵀ(AAᵀ)⁻¹B si hay menos ecuaciones."""
+    A = [[Fraction(x) for x in fila] for fila in A]
+    B = [[Fraction(x) for x in fila] for fila in B]
+    At = transpuesta(A)
+    if len(A) >= len(At):
+        return resolver_exacto(producto(At, A), producto(At, B))
+    return producto(At, resolver_exacto(producto(A, At), B))
+
+
+def aleatoria(rnd, filas, columnas):
+    return [[rnd.uniform(-3, 3) for _ in range(columnas)] for _ in range(filas)]
+
+
+@pytest.mark.parametrize("m, n, k", [(6, 3, 1), (8, 5, 2), (4, 4, 1), (3, 6, 2), (1, 4, 1)])
+def test_minimos_cuadrados_coincide_con_ecuaciones_normales(rnd, m, n, k):
+    for _ in range(5):
+        A, B = aleatoria(rnd, m, n), aleatoria(rnd, m, k)
+        X = matrix_core.minimos_cuadrados(A, B)
+        assert X.forma == (n, k)
+        esperado = referencia(A, B)
+        assert all(cerca(X[i, j], float(esperado[i][j]), 1e-8) for i in range(n) for j in range(k))
+
+
+def test_minimos_cuadrados_sistema_compatible():
+    A = [[1.0, 0.0], [0.0, 2.0], [1.0, 1.0]]
+    B = [[1.0], [4.0], [3.0]]
+    X = matrix_core.resolver(A, B)
+    assert cerca(X[0, 0], 1.0) and cerca(X[1, 0], 2.0)
+
+
+def test_minimos_cuadrados_rango_deficiente():
+    with pytest.raises(ValueError):
+        matrix_core.minimos_cuadrados([[1.0, 2.0], [2.0, 4.0], [3.0, 6.0]], [[1.0], [2.0], [3.0]])
+    with pytest.raises(ValueError):
+        matrix_core.minimos_cuadrados([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]], [[1.0], [2.0]])
@@ -0,0 +1,79 @@
+from array import array
+
+import pytest
+
+import matrix_core
+import matrix_io
+import matrix_stack
+from matrix_stack import PilaMatrices
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request):
+    if request.param not in matrix_core.BACKENDS:
+        pytest.skip("NumPy no está instalado.")
+    anterior = matrix_core.backend_activo()
+    matrix_core.seleccionar_backend(request.param)
+    yield request.param
+    matrix_core.seleccionar_backend(anterior)
+
+
+def aleatorias(rnd, k, filas, columnas):
+    return [matrix_core.Matrix.desde_listas([[rnd.uniform(-5, 5) for _ in range(columnas)] for _ in range(filas)])
+            for _ in range(k)]
+
+
+def iguales(X, Y, tolerancia=1e-8):
+    return X.forma == Y.forma and all(abs(a - b) <= tolerancia * max(1.0, abs(a)) for a, b in zip(X.datos, Y.datos))
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4, 5, 9])
+def test_operaciones_coinciden_con_matrix_core(rnd, backend, n):
+    Ms, Ns = aleatorias(rnd, 12, n, n), aleatorias(rnd, 12, n, n)
+    P, Q = PilaMatrices.desde_matrices(Ms), PilaMatrices.desde_matrices(Ns)
+    for nombre in ("suma", "resta", "producto_hadamard", "producto_matriz"):
+        operacion = getattr(matrix_core, nombre)
+        resultado = matrix_stack.OPERACIONES[nombre](P, Q)
+        assert all(iguales(R, operacion(a, b)) for R, a, b in zip(resultado, Ms, Ns))
+    assert all(iguales(R, matrix_core.producto_matriz(a, Ns[0])) for R, a in zip(matrix_stack.producto_matriz(P, Ns[0]), Ms))
+    assert all(iguales(R, matrix_core.producto_matriz(Ns[0], a)) for R, a in zip(matrix_stack.producto_matriz(Ns[0], P), Ms))
+    assert all(iguales(R, matrix_core.transpuesta(a)) for R, a in zip(matrix_stack.transpuesta(P), Ms))
+    dets = matrix_stack.determinante(P)
+    assert all(abs(d - matrix_core.determinante(a)) <= 1e-7 * max(1.0, abs(d)) for d, a in zip(dets, Ms))
+    inversas, dets = matrix_stack.inversa_y_determinante(P)
+    assert all(iguales(R, matrix_core.inversa(a), 1e-6) for R, a in zip(inversas, Ms))
+
+
+def test_producto_rectangular(rnd, backend):
+    A = PilaMatrices.desde_matrices(aleatorias(rnd, 5, 2, 3))
+    B = PilaMatrices.desde_matrices(aleatorias(rnd, 5, 3, 4))
+    R = matrix_stack.producto_matriz(A, B)
+    assert R.forma == (5, 2, 4)
+    assert all(iguales(X, matrix_core.producto_matriz(a, b)) for X, a, b in zip(R, A, B))
+    with pytest.raises(ValueError):
+        matrix_stack.producto_matriz(B, B)
+
+
+def test_inversa_singular_indica_la_matriz(backend):
+    P = PilaMatrices.desde_matrices([[[1, 2], [3, 4]], [[1, 2], [2, 4]]])
+    with pytest.raises(ValueError, match="matriz 1"):
+        matrix_stack.inversa(P)
+
+
+def test_pila_binaria_ida_y_vuelta(tmp_path, rnd):
+    P = PilaMatrices.desde_matrices(aleatorias(rnd, 7, 3, 4))
+    ruta = tmp_path / "p.mats"
+    matrix_io.guardar_pila(P, ruta)
+    cargada = matrix_io.cargar_pila(ruta)
+    assert cargada == P
+    # Sobrescribir el archivo no altera la pila mapeada que ya estaba cargada
+    matrix_io.guardar_pila(PilaMatrices(2, 1, 1, array("d", [7.0, 7.0])), ruta)
+    assert cargada == P
+    assert matrix_io.cargar_pila(ruta).forma == (2, 1, 1)
+
+
+def test_pila_texto_ida_y_vuelta(tmp_path, rnd):
+    P = PilaMatrices.desde_matrices(aleatorias(rnd, 4, 2, 3))
+    ruta = tmp_path / "p.txt"
+    matrix_io.guardar_pila(P, ruta)
+    assert matrix_io.cargar_pila(ruta) == P
@@ -0,0 +1,94 @@
+import asyncio
+import math
+from fractions import Fraction
+
+import pytest
+
+import matrix_core
+import matrix_exact
+from conftest import cerca
+from matrix_server import ClienteMatrices, ServidorMatrices
+
+
+def ejecutar(prueba, **opciones):
+    """Arranca un servidor en un puerto libre, conecta un cliente y ejecuta prueba(cliente, servidor)."""
+    async def principal():
+        async with ServidorMatrices(puerto=0, procesos=2, **opciones) as servidor:
+            async with ClienteMatrices(puerto=servidor.puerto) as cliente:
+                return await asyncio.wait_for(prueba(cliente, servidor), 60)
+    return asyncio.run(principal())
+
+
+def test_operaciones_y_estadisticas():
+    async def prueba(c, servidor):
+        A, B = [[4, 1], [2, 3]], [[1, 2], [3, 4]]
+        assert (await c.calcular("producto_matriz", A, B)).a_listas() == [[7.0, 12.0], [11.0, 16.0]]
+        assert await c.calcular("determinante", A) == 10
+        R = await c.expresion("inv(A) * B", {"A": A, "B": B})
+        esperado = matrix_core.producto_matriz(matrix_core.inversa(A), B)
+        assert all(cerca(a, b) for a, b in zip(R.datos, esperado.datos))
+        estadisticas = await c.estadisticas()
+        assert estadisticas["atendidas"] >= 3 and estadisticas["errores"] == 0
+        assert estadisticas["latencia_ms"]["p50"] is not None
+    ejecutar(prueba)
+
+
+def test_errores_no_afectan_a_la_conexion():
+    async def prueba(c, servidor):
+        for operacion, *argumentos in [("inversa", [[1, 2], [2, 4]]), ("desconocida", [[1]]),
+                                       ("suma", [[1, 2]]), ("suma", [[1]], [[1, 2]])]:
+            with pytest.raises(ValueError):
+                await c.calcular(operacion, *argumentos)
+        assert (await c.calcular("suma", [[1]], [[2]])).a_listas() == [[3.0]]
+        assert (await c.estadisticas())["errores"] == 4
+    ejecutar(prueba)
+
+
+def test_resultados_no_finitos():
+    async def prueba(c, servidor):
+        R = await c.calcular("division_elemento", [[1.0, 2.0, 0.0]], [[0.0, 1.0, 0.0]])
+        assert R[0, 0] == math.inf and R[0, 1] == 2.0
+        R = await c.expresion("A ./ B - A ./ B", {"A": [[1.0, 0.0]], "B": [[0.0, 0.0]]})
+        assert all(math.isnan(x) for x in R.datos)
+        assert (await c.calcular("suma", [[1]], [[2]])).a_listas() == [[3.0]]
+    ejecutar(prueba)
+
+
+def test_resultados_exactos():
+    async def prueba(c, servidor):
+        A = matrix_exact.MatrizExacta([[4, 1], [2, 3]])
+        inv = await c.calcular("inversa", A)
+        assert matrix_core.es_exacta(inv)
+        assert inv.a_listas() == [[Fraction(3, 10), Fraction(-1, 10)], [Fraction(-1, 5), Fraction(2, 5)]]
+        assert await c.calcular("determinante", [["1/2", "1/3"], ["1", "1"]]) == Fraction(1, 6)
+    ejecutar(prueba)
+
+
+def test_lotes_apilados(rnd):
+    async def prueba(c, servidor):
+        matrices = [matrix_core.Matrix.aleatoria(4, 4, -5, 5, rnd) for _ in range(40)]
+        matrices[7] = matrix_core.Matrix.desde_listas([[1, 2, 3, 4]] * 4)
+        inversas = await asyncio.gather(*(c.calcular("inversa", M) for M in matrices),
+                                        return_exceptions=True)
+        for k, (M, R) in enumerate(zip(matrices, inversas)):
+            if k == 7:
+                assert isinstance(R, ValueError)
+            else:
+                esperado = matrix_core.inversa(M)
+                assert all(cerca(a, b, 1e-7) for a, b in zip(R.datos, esperado.datos))
+        determinantes = await asyncio.gather(*(c.calcular("determinante", M) for M in matrices))
+        assert all(cerca(d, matrix_core.determinante(M), 1e-7) for d, M in zip(determinantes, matrices))
+        estadisticas = await c.estadisticas()
+        assert estadisticas["lotes"] < 2 * len(matrices)
+        assert estadisticas["lotes_apilados"] >= 1
+        assert estadisticas["peticiones_en_lote"] == 2 * len(matrices)
+    ejecutar(prueba, espera_lote=0.05)
+
+
+def test_resultado_en_fragmentos():
+    async def prueba(c, servidor):
+        G = matrix_core.Matrix.aleatoria(120, 90, -9, 9)
+        resultados = await asyncio.gather(c.calcular("transpuesta", G), c.calcular("escalar", G, 2))
+        assert resultados[0] == matrix_core.transpuesta(G)
+        assert resultados[1] == matrix_core.escalar(G, 2)
+    ejecutar(prueba, elementos_fragmento=1000)